@@ -0,0 +1,235 @@
+"""
+Chart of accounts: every line-item name maps to an integer code and an account type.
+
+    code = CHART.code('Rent')                         # dense integer code, stable for the process
+    CHART[code]                                       # Account(number=6000, name='Rent', type='opex')
+    CHART.type_of('Signage')                          # 'capex'
+
+Ledgers store these codes instead of the names, expense frames carry the names as a
+categorical over the accounts they use, and monthly totals by account or account type are a single
+bincount over integer keys. Names that are not in the chart are registered on first use,
+as revenue or operating expenses depending on the ledger they come from. Inside
+`with CHART.scoped():` (as every FinancialModel run is) they are dropped again on exit,
+so ad-hoc names neither pile up in a long-lived process nor fix the type later runs see.
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Account types, in income statement order; capex and deposits are balance sheet outlays
+ACCOUNT_TYPES = ('revenue', 'cogs', 'opex', 'depreciation', 'financing', 'tax', 'capex', 'deposit')
+
+# First account number of each type; new accounts are numbered upward from it
+NUMBER_RANGES = {
+    'deposit': 1400,
+    'capex': 1500,
+    'revenue': 4000,
+    'cogs': 5000,
+    'opex': 6000,
+    'depreciation': 7000,
+    'financing': 8000,
+    'tax': 9000,
+}
+
+
+@dataclass(frozen=True)
+class Account:
+    """
+    One line of the chart of accounts.
+
+    Attributes:
+    - number (int): General ledger account number, grouped by type (see NUMBER_RANGES).
+    - name (str): Line-item name as it appears in the ledgers.
+    - type (str): One of ACCOUNT_TYPES.
+    """
+    number: int
+    name: str
+    type: str
+
+
+DEFAULT_ACCOUNTS = (
+    Account(1400, 'Security Deposit', 'deposit'),
+    Account(1410, 'Utility Deposit', 'deposit'),
+    Account(1420, 'Insurance Deposit', 'deposit'),
+    Account(1500, 'Furniture & Equipment (partial)', 'capex'),
+    Account(1510, 'Computer Equipment (admin)', 'capex'),
+    Account(1520, 'Computer Equipment (instructional)', 'capex'),
+    Account(1530, 'Signage', 'capex'),
+    Account(4000, 'Enrollment Revenue', 'revenue'),
+    Account(4100, 'Birthday Party', 'revenue'),
+    Account(4110, 'Summer Camp', 'revenue'),
+    Account(5000, 'Labor Cost', 'cogs'),
+    Account(5010, 'Royalty Expense', 'cogs'),
+    Account(6000, 'Rent', 'opex'),
+    Account(6010, 'First Month Rent', 'opex'),
+    Account(6020, 'Utilities', 'opex'),
+    Account(6030, 'Internet', 'opex'),
+    Account(6040, 'Director Salary', 'opex'),
+    Account(6050, 'Coach Labor', 'opex'),
+    Account(6060, 'Salaries', 'opex'),
+    Account(6070, 'Payroll Tax', 'opex'),
+    Account(6100, 'CPA Fees', 'opex'),
+    Account(6110, 'LLC Fees', 'opex'),
+    Account(6120, 'Franchise Fee', 'opex'),
+    Account(6130, 'Training Travel Expenses', 'opex'),
+    Account(6140, 'Initial Marketing Expense', 'opex'),
+    Account(6150, 'Licensing', 'opex'),
+    Account(6160, 'Grand Opening Support', 'opex'),
+    Account(7000, 'Depreciation Expense', 'depreciation'),
+    Account(8000, 'Interest Payment', 'financing'),
+    Account(9000, 'Tax Expense', 'tax'),
+)
+
+
+class ChartOfAccounts:
+    """
+    Registry of accounts addressed by dense integer codes 0..len(chart) - 1.
+
+    Parameters:
+    - accounts (iterable): Initial Account entries, see DEFAULT_ACCOUNTS.
+    """
+
+    def __init__(self, accounts=DEFAULT_ACCOUNTS):
+        self.accounts = []
+        self._codes = {}
+        for account in accounts:
+            self.add(account)
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def __getitem__(self, code):
+        return self.accounts[code]
+
+    def __contains__(self, name):
+        return name in self._codes
+
+    def add(self, account):
+        """
+        Register an account and return its code.
+
+        Raises:
+        - ValueError: If the name is already registered or the type is unknown.
+        """
+        if account.type not in NUMBER_RANGES:
+            raise ValueError(f"Unknown account type '{account.type}'; choose from {', '.join(ACCOUNT_TYPES)}")
+        if account.name in self._codes:
+            raise ValueError(f"Account '{account.name}' is already in the chart")
+        code = self._codes[account.name] = len(self.accounts)
+        self.accounts.append(account)
+        return code
+
+    @contextmanager
+    def scoped(self):
+        """
+        Register new names only until the block exits. Codes of the accounts that were in
+        the chart before stay valid; frames made inside keep their names, as categoricals
+        carry their own categories.
+        """
+        mark = len(self.accounts)
+        try:
+            yield self
+        finally:
+            for account in self.accounts[mark:]:
+                del self._codes[account.name]
+            del self.accounts[mark:]
+
+    def code(self, name, type='opex'):
+        """
+        Integer code of a line-item name, registering it as a new account of `type` if
+        it is not in the chart yet.
+        """
+        code = self._codes.get(name)
+        if code is None:
+            if not isinstance(name, str):
+                raise ValueError(f"Line-item names must be strings, got {name!r}")
+            numbers = [a.number for a in self.accounts if a.type == type]
+            number = max(numbers) + 10 if numbers else NUMBER_RANGES.get(type, 0)
+            code = self.add(Account(number, name, type))
+        return code
+
+    def type_of(self, name, type='opex'):
+        """
+        Account type of a line-item name, see code().
+        """
+        return self.accounts[self.code(name, type)].type
+
+    def codes(self, names, type='opex'):
+        """
+        Integer codes of an array of names, looking up each distinct name once.
+        """
+        if isinstance(names, pd.Categorical) or isinstance(getattr(names, 'dtype', None), pd.CategoricalDtype):
+            names = pd.Categorical(names)
+            if (names.codes < 0).any():
+                raise ValueError("Line-item names must be strings, got a missing name")
+            lookup = np.array([self.code(name, type) for name in names.categories], dtype=np.int32)
+            return lookup[names.codes]
+        inverse, uniques = pd.factorize(np.asarray(names, dtype=object), use_na_sentinel=False)
+        return np.array([self.code(name, type) for name in uniques], dtype=np.int32)[inverse]
+
+    @property
+    def names(self):
+        return [a.name for a in self.accounts]
+
+    def categorical(self, codes):
+        """
+        Names of the codes as a categorical, so they become a frame column without
+        materializing a string per row. Its categories are only the accounts that occur,
+        so a groupby on it has no empty groups for the rest of the chart.
+        """
+        present, inverse = np.unique(np.asarray(codes, dtype=np.int32), return_inverse=True)
+        return pd.Categorical.from_codes(inverse, categories=[self.accounts[code].name for code in present])
+
+    @property
+    def type_codes(self):
+        """
+        Index into ACCOUNT_TYPES of every account, aligned with the codes.
+        """
+        return np.array([ACCOUNT_TYPES.index(a.type) for a in self.accounts], dtype=np.int32)
+
+    def monthly_totals(self, codes, offsets, amounts, n_months):
+        """
+        Sum amounts by account and month in one pass.
+
+        Parameters:
+        - codes (np.ndarray): Account code of each line item.
+        - offsets (np.ndarray): Month offset of each line item, see periods.Calendar.offset().
+        - amounts (np.ndarray): Amount of each line item.
+        - n_months (int): Number of months; items outside [0, n_months) are dropped.
+
+        Returns:
+        - np.ndarray: (len(chart) x n_months) totals.
+        """
+        inside = (offsets >= 0) & (offsets < n_months)
+        keys = codes[inside].astype(np.int64) * n_months + offsets[inside]
+        totals = np.bincount(keys, weights=np.asarray(amounts, dtype=float)[inside], minlength=len(self) * n_months)
+        return totals.reshape(len(self), n_months)
+
+    def type_totals(self, codes, offsets, amounts, n_months):
+        """
+        Sum amounts by account type and month in one pass, like by_type(monthly_totals(...))
+        without the (len(chart) x n_months) intermediate.
+
+        Returns:
+        - np.ndarray: (len(ACCOUNT_TYPES) x n_months) totals.
+        """
+        inside = (offsets >= 0) & (offsets < n_months)
+        keys = self.type_codes[codes[inside]].astype(np.int64) * n_months + offsets[inside]
+        totals = np.bincount(keys, weights=np.asarray(amounts, dtype=float)[inside],
+                             minlength=len(ACCOUNT_TYPES) * n_months)
+        return totals.reshape(len(ACCOUNT_TYPES), n_months)
+
+    def by_type(self, totals):
+        """
+        Collapse (accounts x months) totals into (len(ACCOUNT_TYPES) x months) totals.
+        """
+        out = np.zeros((len(ACCOUNT_TYPES), totals.shape[1]))
+        np.add.at(out, self.type_codes[:len(totals)], totals)
+        return out
+
+
+# The chart shared by every ledger in the process
+CHART = ChartOfAccounts()
+
@@ -0,0 +1,375 @@
+"""
+Actuals: bank and POS exports merged into the model as months close.
+
+    actuals = Actuals.load('actuals.pkl') if os.path.exists('actuals.pkl') else Actuals()
+    actuals.ingest('exports/bank.csv', fmt=ActualsFormat(date='Posted', name='Category', amount='Amount',
+                                                         signed=True, names={'AMZN': 'Utilities'}))
+    actuals.ingest('exports/pos.csv', fmt=ActualsFormat(default_type='revenue'))
+    actuals.close('2025-06')                          # months through June are actuals now
+    result = reforecast(Assumptions(), actuals, cache)  # a ModelResult: actuals, then the forecast
+    plan_vs_actual(FinancialModel().run(), actuals)   # variance per closed month and line item
+    actuals.save('actuals.pkl')
+
+Exports are read in chunks of CHUNK_ROWS rows and summed by day and line item as they
+are read, so memory is bounded by the days and line items of the export, however many
+transactions it holds. The daily totals are kept per source (one per export, the file
+name by default) and month. Ingesting a file again with the same size, modification time
+and format does nothing. Re-ingesting a source replaces only the months whose totals
+changed, so a corrected export never double counts.
+
+reforecast() takes the forecast from the model's stage cache and drops the closed months
+(through closed_through) that have actuals; closed months no export covers keep their
+forecast. It puts the actuals in their place and rebuilds the statements over the whole
+forecast, so the open months are re-forecast from the actual closing cash. The forecast stages are
+computed once per set of assumptions. Closing another month re-does only the splice and
+the statements, which take a few array passes.
+"""
+import dataclasses
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+from accounts import ACCOUNT_TYPES, CHART
+from compare import line_item_deltas
+from model import FinancialModel, build_cashflow, build_profit_loss, build_students
+from periods import Calendar
+from pipeline import digest
+from statements import build_statements
+from store import scenario_key
+
+# Rows of an export read (and summed) at a time
+CHUNK_ROWS = 100_000
+
+_COLUMNS = ['Date', 'Name', 'Amount']
+_REVENUE = ACCOUNT_TYPES.index('revenue')
+
+
+@dataclass
+class ActualsFormat:
+    """
+    How the columns of a CSV export map onto Date/Name/Amount line items.
+
+    Attributes:
+    - date, name, amount (str): Column holding each field.
+    - names (dict, optional): Export category -> line-item name, e.g. {'LANDLORD LLC': 'Rent'};
+      unmapped categories are line items of their own.
+    - signed (bool): Amounts are bank flows, inflows positive and outflows negative. Expenses
+      are booked as the outflow; refunds (inflows on expense lines) reduce them.
+    - default_type (str): Account type (see accounts.ACCOUNT_TYPES) of names not in the
+      chart. With signed amounts, new names whose flows over the export net to an inflow
+      are revenue. The type decides whether a name's rows are revenue or expenses; the
+      name is not added to the chart.
+    - date_format (str, optional): strftime format of the dates; inferred when None.
+    """
+    date: str = 'Date'
+    name: str = 'Name'
+    amount: str = 'Amount'
+    names: dict = None
+    signed: bool = False
+    default_type: str = 'opex'
+    date_format: str = None
+
+
+def _chunk_totals(chunk, fmt, index):
+    """
+    A chunk of export rows summed by (day, line item), as a Series keyed by
+    day << 32 | i with the amounts as exported, where i is the name's position in
+    `index` (a dict of the names read so far, extended with the chunk's new names).
+    """
+    names = chunk[fmt.name]
+    if names.isna().any():
+        raise ValueError(f"missing {fmt.name} in row {names.index[names.isna()][0] + 2}")
+    names = names.astype(str).str.strip()
+    if fmt.names:
+        names = names.map(fmt.names).fillna(names)
+
+    amounts = chunk[fmt.amount]
+    if amounts.dtype == object:
+        # '$1,234.50' and '(12.00)' as exported by spreadsheets
+        amounts = amounts.str.replace(r'[$,\s]', '', regex=True).str.replace(r'^\((.*)\)$', r'-\1', regex=True)
+    amounts = pd.to_numeric(amounts).to_numpy(dtype=float)
+    days = pd.to_datetime(chunk[fmt.date], format=fmt.date_format).to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+    inverse, uniques = pd.factorize(names.to_numpy(dtype=object))
+    positions = np.array([index.setdefault(name, len(index)) for name in uniques], dtype=np.int64)
+    return pd.Series(amounts).groupby(days << 32 | positions[inverse]).sum()
+
+
+def _account_codes(totals, names, fmt, chart):
+    """
+    Account code of each name read from an export. With signed amounts, names not in
+    the chart are revenue if they net to an inflow over the whole export, so a refund
+    that happens to come first does not turn an expense into revenue.
+    """
+    if not fmt.signed:
+        return chart.codes(names, fmt.default_type)
+    positions = totals.index.to_numpy(dtype=np.int64) & 0xFFFFFFFF
+    net = np.bincount(positions, weights=totals.to_numpy(dtype=float), minlength=len(names))
+    return np.array([chart.code(name, 'revenue' if name not in chart and flow > 0 else fmt.default_type)
+                     for name, flow in zip(names, net)], dtype=np.int32)
+
+
+def _frames(totals, codes, chart, signed):
+    # (day, name) totals back to revenue and expense Date/Name/Amount frames, by date and name
+    keys = totals.index.to_numpy(dtype=np.int64)
+    codes = codes[keys & 0xFFFFFFFF]
+    revenue = chart.type_codes[codes] == _REVENUE
+    amounts = totals.to_numpy(dtype=float)
+    df = pd.DataFrame({
+        'Date': (keys >> 32).astype('datetime64[D]').astype('datetime64[ns]'),
+        'Name': np.asarray(chart.names, dtype=object)[codes],
+        # Bank flows: expenses are booked as the outflow, so refunds reduce them
+        'Amount': np.where(revenue | (not signed), amounts, -amounts),
+    })
+    return (df[revenue].sort_values(_COLUMNS[:2], ignore_index=True),
+            df[~revenue].sort_values(_COLUMNS[:2], ignore_index=True))
+
+
+def read_actuals(path, fmt=None, chunksize=CHUNK_ROWS, chart=CHART):
+    """
+    Read a CSV export into daily revenue and expense totals per line item.
+
+    Parameters:
+    - path (str): CSV file.
+    - fmt (ActualsFormat, optional): Column mapping; Date/Name/Amount columns by default.
+    - chunksize (int): Rows read and summed at a time.
+    - chart (ChartOfAccounts): Chart classifying the line items as revenue or expenses.
+
+    Returns:
+    - tuple: (revenue_df, expenses_df) Date/Name/Amount frames, one row per day and line item.
+
+    Raises:
+    - ValueError: On missing columns, missing names, or unparseable dates or amounts.
+    """
+    fmt = fmt or ActualsFormat()
+    totals = pd.Series(dtype=float)
+    index = {}
+    try:
+        reader = pd.read_csv(path, usecols=[fmt.date, fmt.name, fmt.amount], chunksize=chunksize,
+                             dtype={fmt.name: object})
+        with reader:
+            for chunk in reader:
+                # Only the running totals and one chunk are held at a time
+                totals = pd.concat([totals, _chunk_totals(chunk, fmt, index)]).groupby(level=0).sum()
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+    # New names only decide which frame their rows go to; they are not kept in the chart
+    with chart.scoped():
+        codes = _account_codes(totals, np.array(list(index), dtype=object), fmt, chart)
+        return _frames(totals, codes, chart, fmt.signed)
+
+
+class Actuals:
+    """
+    Daily actuals per source and month, and the last closed month.
+
+    Parameters:
+    - closed_through (str or pd.Period, optional): Last month whose actuals replace the
+      forecast; see close().
+    """
+
+    def __init__(self, closed_through=None):
+        self.closed_through = None
+        self._partitions = {}  # (source, month) -> (revenue_df, expenses_df, content hash)
+        self._stamps = {}      # path -> (mtime_ns, size, format) when last ingested
+        self._merged = None    # (revenue_df, expenses_df) of the closed months
+        if closed_through is not None:
+            self.close(closed_through)
+
+    def __len__(self):
+        return len(self._partitions)
+
+    @property
+    def months(self):
+        """
+        Months with actuals from any source, closed or not, in order.
+        """
+        return sorted({month for _, month in self._partitions})
+
+    @property
+    def closed_months(self):
+        """
+        Closed months with actuals from any source, in order; these replace the forecast.
+        """
+        if self.closed_through is None:
+            return []
+        return [month for month in self.months if month <= self.closed_through]
+
+    def close(self, month):
+        """
+        Use the actuals of every month through `month` instead of the forecast.
+        """
+        self.closed_through = pd.Period(month, freq='M')
+        self._merged = None
+
+    def ingest(self, path, source=None, fmt=None, chunksize=CHUNK_ROWS):
+        """
+        Read an export and replace the months of its source that changed.
+
+        Parameters:
+        - path (str): CSV file.
+        - source (str, optional): Name of the export; the file name without extension by
+          default. A source's months are replaced by its next export that covers them.
+        - fmt (ActualsFormat, optional): Column mapping, see read_actuals().
+        - chunksize (int): Rows read at a time.
+
+        Returns:
+        - list: Months (pd.Period) whose totals changed; empty when the file is unchanged.
+        """
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size, repr(fmt or ActualsFormat()))
+        if self._stamps.get(path) == stamp:
+            return []
+        source = source or os.path.splitext(os.path.basename(path))[0]
+        revenue_df, expenses_df = read_actuals(path, fmt, chunksize)
+
+        changed = []
+        by_month = [df.groupby(df['Date'].dt.to_period('M')) for df in (revenue_df, expenses_df)]
+        empty = pd.DataFrame({'Date': pd.Series(dtype='datetime64[ns]'), 'Name': pd.Series(dtype=object),
+                              'Amount': pd.Series(dtype=float)})
+        for month in sorted(set(by_month[0].groups) | set(by_month[1].groups)):
+            frames = [group.get_group(month).reset_index(drop=True) if month in group.groups else empty
+                      for group in by_month]
+            content = digest(*(str(pd.util.hash_pandas_object(df, index=False).sum()) for df in frames))
+            if self._partitions.get((source, month), (None, None, None))[2] != content:
+                self._partitions[source, month] = (*frames, content)
+                changed.append(month)
+        self._stamps[path] = stamp
+        if changed:
+            self._merged = None
+        return changed
+
+    def frames(self):
+        """
+        Revenue and expense Date/Name/Amount frames of the closed months, by date.
+
+        Returns:
+        - tuple: (revenue_df, expenses_df); empty before any month is closed.
+        """
+        if self._merged is None:
+            closed = [key for key in sorted(self._partitions, key=lambda key: (key[1], key[0]))
+                      if self.closed_through is not None and key[1] <= self.closed_through]
+            self._merged = tuple(
+                pd.concat([self._partitions[key][i] for key in closed], ignore_index=True)
+                .sort_values('Date', kind='stable', ignore_index=True)
+                if closed else pd.DataFrame(columns=_COLUMNS)
+                for i in (0, 1))
+        return self._merged
+
+    @property
+    def key(self):
+        """
+        Hash of the closed actuals; changes whenever reforecast() would give another result.
+        """
+        closed = sorted((str(month), source, partition[2]) for (source, month), partition in self._partitions.items()
+                        if self.closed_through is not None and month <= self.closed_through)
+        return digest(str(self.closed_through), *('/'.join(entry) for entry in closed))
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def __getstate__(self):
+        # The merged frames are rebuilt from the partitions on demand
+        return {**self.__dict__, '_merged': None}
+
+
+def _in_months(df, months):
+    """
+    Mask of the rows of a Date/Name/Amount frame dated in one of `months` (pd.Periods).
+    """
+    month_of = np.asarray(df['Date'], dtype='datetime64[ns]').astype('datetime64[M]')
+    return np.isin(month_of, np.array([str(month) for month in months], dtype='datetime64[M]'))
+
+
+def reforecast(assumptions, actuals, cache=None):
+    """
+    Run the model with the closed months taken from the actuals.
+
+    Ledger rows of the closed months with actuals come from `actuals`, the rest from the
+    forecast (closed months that no export covers keep their forecast), and the
+    statements, profit/loss, cash and student frames are rebuilt from the merged ledgers
+    over every month of the forecast. The HELOC schedule and the intermediate frames (base, operating and
+    recurring revenue) are the forecast's.
+
+    Parameters:
+    - assumptions (Assumptions): The plan.
+    - actuals (Actuals): Actuals and the last closed month.
+    - cache (pipeline.StageCache, optional): Holds the forecast stages and the merged
+      result, so a re-run only redoes what the actuals changed.
+
+    Returns:
+    - ModelResult: The merged run; the plain forecast when no month is closed.
+    """
+    model = FinancialModel(assumptions, cache)
+    forecast = model.run()
+    if actuals.closed_through is None:
+        return forecast
+
+    key = digest('reforecast', scenario_key(model.assumptions), actuals.key)
+    if cache is not None:
+        hit, result = cache.get(key)
+        if hit:
+            return result
+
+    a = model.assumptions
+    replaced = actuals.closed_months
+    revenue_actual, expenses_actual = actuals.frames()
+    all_revenue_df, all_expenses_df = (
+        pd.concat([actual_df, planned_df[~_in_months(planned_df, replaced)]], ignore_index=True)
+        .sort_values('Date', kind='stable', ignore_index=True)
+        for actual_df, planned_df in ((revenue_actual, forecast.all_revenue_df),
+                                      (expenses_actual, forecast.all_expenses_df)))
+
+    calendar = Calendar.covering(forecast.calendar.month_starts[[0, -1]], all_revenue_df['Date'], all_expenses_df['Date'])
+    months = calendar.span(forecast.all_revenue_df['Date'], forecast.all_expenses_df['Date'],
+                           all_revenue_df['Date'], all_expenses_df['Date'])
+    with CHART.scoped():
+        statements = build_statements(all_revenue_df, all_expenses_df, forecast.debt_schedule_df, calendar,
+                                      a.starting_liquid, months=months)
+    profit_loss_df = build_profit_loss(statements)
+    result = dataclasses.replace(
+        forecast,
+        calendar=calendar,
+        all_revenue_df=all_revenue_df,
+        all_expenses_df=all_expenses_df,
+        statements=statements,
+        profit_loss_df=profit_loss_df,
+        students_df=build_students(calendar, forecast.recurring_revenue_df, profit_loss_df),
+        cashflow_df=build_cashflow(a, statements),
+    )
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+def plan_vs_actual(forecast, actuals):
+    """
+    Plan and actual of every line item in every closed month with actuals.
+
+    Parameters:
+    - forecast (ModelResult): The plan, e.g. FinancialModel(assumptions).run().
+    - actuals (Actuals): Actuals and the last closed month.
+
+    Returns:
+    - pd.DataFrame: 'Period', 'Ledger' ('Revenue' or 'Expenses'), 'Name', 'Plan', 'Actual'
+      and 'Variance' (actual less plan).
+    """
+    columns = {'Base': 'Plan', 'Other': 'Actual', 'Delta': 'Variance'}
+    if actuals.closed_through is None:
+        return pd.DataFrame(columns=['Period', 'Ledger', 'Name', *columns.values()])
+    frames = []
+    for ledger, plan_df, actual_df in (('Revenue', forecast.all_revenue_df, actuals.frames()[0]),
+                                       ('Expenses', forecast.all_expenses_df, actuals.frames()[1])):
+        plan_df = plan_df[_in_months(plan_df, actuals.closed_months)]
+        frames.append(line_item_deltas(plan_df, actual_df, changed_only=False).rename(columns=columns)
+                      .assign(Ledger=ledger))
+    variance_df = pd.concat(frames, ignore_index=True)
+    return variance_df[['Period', 'Ledger', 'Name', *columns.values()]]
@@ -0,0 +1,283 @@
+"""
+Benchmark suite for the model pipeline stages.
+
+Times every stage on synthetic ledgers scaled from 36 months/20 rows up to
+600 months/1M rows, reporting throughput, peak memory and the scaling exponent
+(slope of log time vs. log rows). Results can be saved as a local baseline, and
+later runs fail when a stage gets slower than the baseline by more than the
+tolerance.
+
+    python benchmark.py --save          # record a baseline
+    python benchmark.py                 # compare against it, exit 1 on regression
+    python benchmark.py --quick --stages combine_expenses add_interest_payments
+    python benchmark.py --cold-start    # process start-up of the codewiz.py commands
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from expenses import (combine_expenses, add_interest_payments, add_labor_costs_df, add_tax_and_royalty, add_depreciation_expense,
+                      add_asset_depreciation)
+from periods import Calendar
+from revenue import revenue_growth_df
+from schedules import AssetRegister
+
+# (months, ledger rows)
+SIZES = [(36, 20), (60, 1_000), (120, 10_000), (360, 100_000), (600, 1_000_000)]
+QUICK_SIZES = SIZES[:3]
+CHART_MAX_MONTHS = 120  # rendering cost depends on months only; larger charts are unreadable anyway
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.benchmarks', 'baseline.json')
+START = pd.Timestamp(2024, 1, 1)
+
+
+def synthetic_inputs(months, rows, seed=0):
+    """
+    Synthetic Date/Name/Amount ledgers with `rows` line items spread over `months`.
+    """
+    rng = np.random.default_rng(seed)
+    end = START + pd.DateOffset(months=months) - pd.Timedelta(days=1)
+    dates = START + pd.to_timedelta(rng.integers(0, (end - START).days + 1, rows), unit='D')
+    names = np.array([f'Item {i}' for i in range(50)], dtype=object)
+
+    ledger = pd.DataFrame({'Date': dates, 'Name': names[rng.integers(0, 50, rows)], 'Amount': rng.uniform(10, 1000, rows)})
+    n_recurring = max(1, rows // months)
+    recurring = pd.DataFrame({'Name': [f'Recurring {i}' for i in range(n_recurring)], 'Amount': rng.uniform(10, 1000, n_recurring)})
+    recurring_revenue = revenue_growth_df(50, 225, 0.05, 384, START.to_pydatetime(), end.to_pydatetime())
+
+    # One asset per 100 line items, with mixed lives and methods
+    n_assets = max(1, rows // 100)
+    assets = AssetRegister.from_records(ledger.iloc[:n_assets].assign(
+        Useful_Life=rng.integers(12, 121, n_assets),
+        Method=np.where(rng.random(n_assets) < 0.5, 'straight_line', 'declining_balance')))
+
+    periods = pd.period_range(START, end, freq='M').strftime('%m-%Y')
+    profit_loss = pd.DataFrame({'Period': periods, 'Profit Loss': rng.normal(0, 10000, len(periods))})
+    return {
+        'months': months,
+        'rows': rows,
+        'end': end,
+        'ledger': ledger,
+        'assets': assets,
+        'calendar': Calendar(START, end),
+        'recurring': recurring,
+        'recurring_revenue': recurring_revenue,
+        'profit_loss': profit_loss,
+        'cashflow': pd.DataFrame({'Period': periods, 'Cash On Hand': 100000 + profit_loss['Profit Loss'].cumsum()}),
+        'students': recurring_revenue.assign(Period=recurring_revenue['Date'].dt.strftime('%m-%Y'))[['Period', 'Student_Count']],
+    }
+
+
+def _chart(save):
+    def run(d):
+        with tempfile.TemporaryDirectory() as tmp:
+            save(d, os.path.join(tmp, 'chart.png'))
+    return run
+
+
+def _charts():
+    import visualize
+    return {
+        'save_profit_loss': _chart(lambda d, path: visualize.save_profit_loss(d['profit_loss'], path)),
+        'save_cashflow': _chart(lambda d, path: visualize.save_cashflow(d['cashflow'], path)),
+        'save_profit_loss_with_students': _chart(lambda d, path: visualize.save_profit_loss_with_students(d['profit_loss'], d['students'], path)),
+        'save_cashflow_with_students': _chart(lambda d, path: visualize.save_cashflow_with_students(d['cashflow'], d['students'], path)),
+    }
+
+
+# Stage name -> callable taking the synthetic inputs
+STAGES = {
+    'revenue_growth_df': lambda d: revenue_growth_df(50, 225, 0.05, 384, START.to_pydatetime(), d['end'].to_pydatetime()),
+    'combine_expenses': lambda d: combine_expenses(d['recurring'], d['ledger'], START, d['end']),
+    'add_interest_payments': lambda d: add_interest_payments(d['ledger'], 9),
+    'add_labor_costs_df': lambda d: add_labor_costs_df(d['ledger'], d['recurring_revenue'], 30),
+    'add_tax_and_royalty': lambda d: add_tax_and_royalty(d['ledger'], d['ledger']),
+    'add_depreciation_expense': lambda d: add_depreciation_expense(d['ledger'], d['months'], 17500, START, d['end']),
+    'add_asset_depreciation': lambda d: add_asset_depreciation(d['ledger'], d['assets'], d['calendar'], d['end']),
+    'monthly_resample': lambda d: d['ledger'].resample('M', on='Date').sum(numeric_only=True),
+}
+CHART_STAGES = ('save_profit_loss', 'save_cashflow', 'save_profit_loss_with_students', 'save_cashflow_with_students')
+
+# Stages whose cost is driven by the number of months rather than ledger rows
+MONTH_SCALED = ('revenue_growth_df',) + CHART_STAGES
+
+
+def time_stage(func, inputs, min_time=0.2, min_repeats=3):
+    """
+    Best-of-N wall time in seconds; repeats until min_time has been spent.
+    """
+    times = []
+    started = time.perf_counter()
+    while len(times) < min_repeats or time.perf_counter() - started < min_time:
+        t0 = time.perf_counter()
+        func(inputs)
+        times.append(time.perf_counter() - t0)
+        if len(times) >= 100:
+            break
+    return min(times)
+
+
+def peak_memory(func, inputs):
+    """
+    Peak bytes allocated by Python while running func once.
+    """
+    tracemalloc.start()
+    try:
+        func(inputs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(sizes, stages):
+    """
+    Time every stage at every size.
+
+    Returns:
+    - DataFrame: One row per stage and size with 'Stage', 'Months', 'Rows', 'Seconds',
+      'Items/s' (months or rows per second, whichever drives the stage) and 'Peak MB'.
+    """
+    funcs = dict(STAGES)
+    if any(stage in CHART_STAGES for stage in stages):
+        funcs.update(_charts())
+
+    records = []
+    for months, rows in sizes:
+        inputs = synthetic_inputs(months, rows)
+        for stage in stages:
+            if stage in CHART_STAGES and months > CHART_MAX_MONTHS:
+                continue
+            seconds = time_stage(funcs[stage], inputs)
+            records.append({
+                'Stage': stage,
+                'Months': months,
+                'Rows': rows,
+                'Seconds': seconds,
+                'Items/s': (months if stage in MONTH_SCALED else rows) / seconds,
+                'Peak MB': peak_memory(funcs[stage], inputs) / 2**20,
+            })
+            print(f"{stage:32s} {months:4d} months {rows:>9,d} rows  {seconds * 1000:10.2f} ms", file=sys.stderr)
+    return pd.DataFrame(records)
+
+
+# Command -> codewiz.py arguments, timed in fresh processes by cold_start()
+COLD_START = {
+    'python': None,
+    'help': ['--help'],
+    'run': ['run'],
+    'run --charts': ['run', '--charts', 'all'],
+}
+
+
+def cold_start(repeats=3):
+    """
+    Best-of-N wall time of each COLD_START command in a fresh interpreter, imports
+    included; 'python' is the bare interpreter for reference.
+
+    Returns:
+    - DataFrame: One row per command with 'Command' and 'Seconds'.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    records = []
+    for command, args in COLD_START.items():
+        argv = [sys.executable, '-c', 'pass'] if args is None else [sys.executable, os.path.join(here, 'codewiz.py'), *args]
+        times = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                subprocess.run(argv, cwd=tmp, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                times.append(time.perf_counter() - t0)
+        records.append({'Command': command, 'Seconds': min(times)})
+        print(f"{command:32s} {min(times) * 1000:10.2f} ms", file=sys.stderr)
+    return pd.DataFrame(records)
+
+
+def scaling_exponents(results):
+    """
+    Slope of log(seconds) vs. log(size) per stage, where size is months or rows as in
+    MONTH_SCALED: ~1 is linear, ~2 quadratic.
+    """
+    exponents = {}
+    for stage, group in results.groupby('Stage'):
+        if len(group) > 1:
+            size = group['Months'] if stage in MONTH_SCALED else group['Rows']
+            exponents[stage] = np.polyfit(np.log(size), np.log(group['Seconds']), 1)[0]
+    return pd.Series(exponents, name='Exponent')
+
+
+def _key(record):
+    return f"{record['Stage']}@{record['Months']}x{record['Rows']}"
+
+
+def compare(results, baseline, tolerance):
+    """
+    Rows of `results` slower than the baseline by more than `tolerance` (a fraction).
+    """
+    slower = []
+    for record in results.to_dict('records'):
+        reference = baseline.get(_key(record))
+        if reference is not None and record['Seconds'] > reference * (1 + tolerance):
+            slower.append({**record, 'Baseline': reference, 'Ratio': record['Seconds'] / reference})
+    return pd.DataFrame(slower)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='only the small sizes')
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES) + list(CHART_STAGES), help='stages to run (default: all)')
+    parser.add_argument('--skip-charts', action='store_true', help='skip the visualize.py stages')
+    parser.add_argument('--save', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline file (default: %(default)s)')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown vs. baseline (default: %(default)s)')
+    parser.add_argument('--json', help='also write the raw results to this file')
+    parser.add_argument('--cold-start', action='store_true', help='only time process start-up of the codewiz.py commands')
+    args = parser.parse_args(argv)
+
+    if args.cold_start:
+        print(cold_start().to_string(index=False, float_format='{:,.3f}'.format))
+        return 0
+
+    stages = args.stages or list(STAGES) + ([] if args.skip_charts else list(CHART_STAGES))
+    results = run_benchmarks(QUICK_SIZES if args.quick else SIZES, stages)
+
+    print(results.to_string(index=False, float_format='{:,.4g}'.format))
+    print()
+    print(scaling_exponents(results).to_string(float_format='{:.2f}'.format))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results.to_dict('records'), f, indent=2)
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update({_key(record): record['Seconds'] for record in results.to_dict('records')})
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            slower = compare(results, json.load(f), args.tolerance)
+        if len(slower):
+            print(f"\nSlower than baseline by more than {args.tolerance:.0%}:")
+            print(slower[['Stage', 'Months', 'Rows', 'Seconds', 'Baseline', 'Ratio']].to_string(index=False, float_format='{:,.4g}'.format))
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,324 @@
+"""
+Command line entry point.
+
+    python codewiz.py run --set growth_rate=0.08 --charts all --output out/
+    python codewiz.py report --scenario sites/denver.toml --statement balance
+    python codewiz.py sweep monthly_student_price=175:275:21 growth_rate=0.05:0.15:11 --heatmap heatmap.png
+    python codewiz.py mc --scenarios 10000 --range growth_rate=0.05:0.15 --range hourly_rate=25:35 --seed 1
+    python codewiz.py compare --scenario plan_v1.toml --other plan_v2.toml --output diff/
+    python codewiz.py --timings run           # import and compute times on stderr
+
+Only the standard library is imported up front. pandas and the model are imported by the
+command that needs them, and matplotlib only when a chart is rendered, so `--help` and
+argument errors return at once and runs without charts never load matplotlib.
+"""
+import argparse
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+STARTED = time.perf_counter()
+
+
+class Timings:
+    """
+    Wall time of the phases of one command, reported with --timings.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+
+    @contextmanager
+    def __call__(self, label):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[label] = self.seconds.get(label, 0.0) + time.perf_counter() - start
+
+    def report(self, file=sys.stderr):
+        for label, seconds in self.seconds.items():
+            print(f"{label:>10}: {seconds * 1000:8.1f} ms", file=file)
+        print(f"{'total':>10}: {(time.perf_counter() - STARTED) * 1000:8.1f} ms", file=file)
+
+
+def _value(text):
+    # Numbers, booleans and JSON lists/tables as such; anything else (dates, names) as a string
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _pairs(items, what):
+    pairs = {}
+    for item in items or ():
+        name, sep, value = item.partition('=')
+        if not sep:
+            raise SystemExit(f"error: expected {what} as NAME=VALUE, got '{item}'")
+        pairs[name.strip()] = value.strip()
+    return pairs
+
+
+def _floats(text, count, name):
+    parts = text.split(':')
+    try:
+        values = [float(part) for part in parts]
+    except ValueError:
+        values = []
+    if len(values) != count:
+        form = 'LOW:HIGH' if count == 2 else 'START:STOP:NUM'
+        raise SystemExit(f"error: expected {name}={form}, got '{name}={text}'")
+    return values
+
+
+def load_assumptions(args, timings):
+    """
+    Assumptions of --scenario (or the defaults) with the --set overrides applied.
+    """
+    with timings('import'):
+        import dataclasses
+        from model import Assumptions
+    overrides = {name: _value(value) for name, value in _pairs(args.set, '--set').items()}
+    with timings('load'):
+        if args.scenario:
+            from scenario_files import load_scenario
+            assumptions = load_scenario(args.scenario)
+        else:
+            assumptions = Assumptions()
+        if overrides:
+            changed = Assumptions.from_dict(overrides)
+            assumptions = dataclasses.replace(assumptions, **{name: getattr(changed, name) for name in overrides})
+    return assumptions
+
+
+@contextmanager
+def _display():
+    # Scoped display options, so nothing global changes for importers of this module
+    import pandas as pd
+    with pd.option_context('display.max_rows', None, 'display.max_columns', None, 'display.width', 1000,
+                           'display.float_format', '{:,.0f}'.format):
+        yield
+
+
+def _write(df, path):
+    import os
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    df.to_csv(path, index=False)
+    print(f"Wrote {path}", file=sys.stderr)
+
+
+def cmd_run(args, timings):
+    """
+    Run one scenario; print the monthly profit/loss and cash, optionally write CSVs and charts.
+    """
+    assumptions = load_assumptions(args, timings)
+    with timings('import'):
+        import os
+        from model import CHARTS, FinancialModel, render
+    with timings('model'):
+        result = FinancialModel(assumptions).run()
+    summary = result.profit_loss_df.merge(result.cashflow_df, on='Period')
+
+    if args.output:
+        for name in ('profit_loss_df', 'cashflow_df', 'students_df', 'all_expenses_df', 'all_revenue_df'):
+            _write(getattr(result, name), os.path.join(args.output, f"{name[:-3]}.csv"))
+    if args.charts:
+        charts = list(CHARTS) if 'all' in args.charts else args.charts
+        with timings('charts'):
+            paths = render(result, args.output or '.', charts=charts, dpi=args.dpi, fmt=args.format)
+        for path in paths:
+            print(f"Wrote {path}", file=sys.stderr)
+    with _display():
+        print(summary.to_string(index=False))
+    return 0
+
+
+def cmd_report(args, timings):
+    """
+    Print (or write) the income statement, balance sheet and cashflow statement.
+    """
+    assumptions = load_assumptions(args, timings)
+    with timings('import'):
+        import os
+        from model import FinancialModel
+    with timings('model'):
+        statements = FinancialModel(assumptions).run().statements
+    frames = {
+        'income': statements.income_statement,
+        'balance': statements.balance_sheet,
+        'cashflow': statements.cashflow_statement,
+    }
+    names = list(frames) if args.statement == 'all' else [args.statement]
+    for name in names:
+        if args.output:
+            _write(frames[name], os.path.join(args.output, f"{name}_statement.csv"))
+            continue
+        with _display():
+            print(frames[name].to_string(index=False))
+            print()
+    return 0
+
+
+def cmd_sweep(args, timings):
+    """
+    Evaluate the headline metrics over a grid of parameter values.
+    """
+    assumptions = load_assumptions(args, timings)
+    grid = {name: _floats(text, 3, name) for name, text in _pairs(args.params, 'a sweep axis').items()}
+    with timings('import'):
+        import numpy as np
+        from sweep import sweep
+    grid = {name: np.linspace(start, stop, int(num)) for name, (start, stop, num) in grid.items()}
+    with timings('sweep'):
+        sweep_df = sweep(grid, assumptions)
+    if args.heatmap:
+        if len(grid) != 2:
+            raise SystemExit("error: --heatmap needs exactly two swept parameters")
+        with timings('charts'):
+            from visualize import save_heatmap
+            x, y = grid
+            save_heatmap(sweep_df, x, y, args.metric, args.heatmap, dpi=args.dpi)
+        print(f"Wrote {args.heatmap}", file=sys.stderr)
+    if args.output:
+        _write(sweep_df, args.output)
+    else:
+        print(sweep_df.sort_values(args.metric, ascending=False).head(args.top).to_string(index=False))
+    return 0
+
+
+def cmd_mc(args, timings):
+    """
+    Monte Carlo over uniformly drawn parameters; print percentile bands per month.
+    Scenarios the vector engine does not model are rejected, see sweep.vector_engine_applies().
+    """
+    assumptions = load_assumptions(args, timings)
+    ranges = {name: tuple(_floats(text, 2, name)) for name, text in _pairs(args.range, '--range').items()}
+    with timings('import'):
+        from model import FinancialModel
+        from monte_carlo import SCENARIO_PARAMS, run_monte_carlo, sample_uniform
+        from sweep import vector_engine_applies
+    model = FinancialModel(assumptions)
+    unknown = set(ranges) - set(SCENARIO_PARAMS)
+    if unknown:
+        raise SystemExit(f"error: cannot vary {', '.join(sorted(unknown))}; choose from {', '.join(SCENARIO_PARAMS)}")
+    if not vector_engine_applies(model.assumptions):
+        raise SystemExit("error: mc models an up-front, interest-only HELOC at a fixed rate; "
+                         "unset heloc_draws, amortization_months and interest_rate_schedule")
+
+    with timings('inputs'):
+        inputs = model.scenario_inputs()
+        a = model.assumptions
+        params = sample_uniform(args.scenarios, {**{name: float(getattr(a, name)) for name in SCENARIO_PARAMS}, **ranges},
+                                seed=args.seed)
+        event_revenue = None
+        if args.events:
+            from events import event_revenue as draw_events
+            from periods import Calendar
+            calendar = Calendar(inputs.months[0], inputs.months[-1])
+            event_revenue = draw_events(a.events, a.grand_opening, a.period_end, calendar, args.scenarios, args.seed)
+    with timings('simulate'):
+        bands = run_monte_carlo(inputs, params, event_revenue=event_revenue)[args.metric]
+    if args.output:
+        _write(bands, args.output)
+    else:
+        with _display():
+            print(bands.to_string(index=False))
+    return 0
+
+
+def cmd_compare(args, timings):
+    """
+    Compare two scenarios: metric changes, their attribution to the changed inputs, and
+    the line items that moved.
+    """
+    base = load_assumptions(args, timings)
+    other = load_assumptions(argparse.Namespace(scenario=args.other, set=args.other_set), timings)
+    with timings('import'):
+        import os
+        from compare import compare
+    with timings('compare'):
+        comparison = compare(base, other, metrics=args.metric, seed=args.seed)
+    frames = {
+        'metrics': comparison.metrics_df,
+        'attribution': comparison.attribution_df,
+        'expenses_delta': comparison.expenses_delta_df,
+        'revenue_delta': comparison.revenue_delta_df,
+    }
+    if args.output:
+        for name, df in frames.items():
+            _write(df, os.path.join(args.output, f"{name}.csv"))
+        return 0
+    with _display():
+        print(frames['metrics'].to_string(index=False))
+        print()
+        # Input values as given, not in the money format
+        print(frames['attribution'].astype({'Base Value': str, 'Other Value': str}).to_string(index=False))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='codewiz', description="Code Wiz franchise financial model")
+    parser.add_argument('--timings', action='store_true', help='print import and compute times to stderr')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def command(name, func, help):
+        sub = commands.add_parser(name, help=help, description=help)
+        sub.set_defaults(func=func)
+        sub.add_argument('--scenario', help='TOML/YAML scenario file (see scenario_files.py)')
+        sub.add_argument('--set', action='append', metavar='NAME=VALUE', help='override an assumption (repeatable)')
+        return sub
+
+    run = command('run', cmd_run, "run one scenario")
+    run.add_argument('--output', help='directory for the CSV files and charts')
+    run.add_argument('--charts', nargs='+', metavar='CHART', help="charts to render: 'all' or names from model.CHARTS")
+    run.add_argument('--dpi', type=int, default=300)
+    run.add_argument('--format', default='png', help='chart file format (default: %(default)s)')
+
+    report = command('report', cmd_report, "print the financial statements")
+    report.add_argument('--statement', choices=('income', 'balance', 'cashflow', 'all'), default='all')
+    report.add_argument('--output', help='directory for the CSV files instead of printing')
+
+    sweep = command('sweep', cmd_sweep, "sweep parameters over a grid")
+    sweep.add_argument('params', nargs='+', metavar='NAME=START:STOP:NUM', help='swept parameter and its values')
+    sweep.add_argument('--metric', choices=('min_cash', 'breakeven_month', 'cumulative_profit'), default='min_cash')
+    sweep.add_argument('--top', type=int, default=20, help='rows to print, best first (default: %(default)s)')
+    sweep.add_argument('--output', help='CSV file for the full grid instead of printing')
+    sweep.add_argument('--heatmap', help='chart file for a two-parameter sweep')
+    sweep.add_argument('--dpi', type=int, default=150)
+
+    mc = command('mc', cmd_mc, "Monte Carlo percentile bands")
+    mc.add_argument('--scenarios', type=int, default=10000)
+    mc.add_argument('--range', action='append', metavar='NAME=LOW:HIGH', help='uniformly drawn parameter (repeatable)')
+    mc.add_argument('--seed', type=int)
+    mc.add_argument('--events', action='store_true', help='draw the random events (birthday parties) per scenario')
+    mc.add_argument('--metric', choices=('cash', 'profit_loss'), default='cash')
+    mc.add_argument('--output', help='CSV file instead of printing')
+
+    diff = command('compare', cmd_compare, "compare two scenarios and attribute the differences")
+    diff.add_argument('--other', help='scenario file to compare against (default: the defaults)')
+    diff.add_argument('--other-set', action='append', metavar='NAME=VALUE', help='override an assumption of the other scenario (repeatable)')
+    diff.add_argument('--metric', nargs='+', choices=('min_cash', 'breakeven_month', 'cumulative_profit'),
+                      default=['min_cash', 'cumulative_profit'], help='metrics to attribute')
+    diff.add_argument('--seed', type=int, help='seed of the sampled Shapley orders (many changed inputs)')
+    diff.add_argument('--output', help='directory for the CSV files instead of printing')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    timings = Timings()
+    try:
+        return args.func(args, timings)
+    except ValueError as e:
+        # Invalid assumptions or scenario files
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if args.timings:
+            timings.report()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Compare two model runs: line-item deltas, and which changed input moved the headline numbers.
+
+    comparison = compare(Assumptions(), Assumptions(sq_ft=1800, growth_rate=0.08, hourly_rate=32))
+    comparison.metrics_df          # min_cash / cumulative_profit of each run and the change
+    comparison.expenses_delta_df   # Period/Name/Base/Other/Delta of every line item that moved
+    comparison.attribution_df      # per changed input: its one-at-a-time effect and Shapley share
+
+The change in each metric is attributed to the inputs that differ between the two
+assumption sets. One-at-a-time (OAT) effects apply each change alone to the base case.
+Shapley values average an input's effect over every order of applying the changes, so
+they add up to the total change, interactions included. Exact Shapley values need every
+subset of the changed inputs, i.e. 2^k evaluations. Above SHAPLEY_EXACT_MAX inputs they
+are estimated from sampled orders.
+
+The subsets are evaluated in batches. Inputs the vector engine varies per scenario
+(growth_rate, monthly_student_price, hourly_rate, interest_rate, sq_ft) are laid out as
+rows of one monte_carlo.simulate() pass. Only the other inputs need their own
+ScenarioInputs, once per combination of them. When the vector engine does not model the
+runs (HELOC draws, amortization or a variable interest rate), each subset is a full model
+run instead, and the runs share a pipeline.StageCache so unchanged stages are reused.
+"""
+import dataclasses
+import math
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+from model import Assumptions, FinancialModel, ModelResult
+from monte_carlo import SCENARIO_PARAMS
+from periods import Calendar
+from pipeline import StageCache, fingerprint
+from sweep import METRICS, evaluate_points, result_metrics, vector_engine_applies
+
+# Inputs laid out as rows of one simulate() pass; the others need their own ScenarioInputs
+VECTOR_FIELDS = tuple(name for name in SCENARIO_PARAMS if name in {f.name for f in dataclasses.fields(Assumptions)})
+# Changed inputs attributed exactly (2^k evaluations); more are estimated from sampled orders
+SHAPLEY_EXACT_MAX = 10
+
+
+@dataclass
+class Comparison:
+    """
+    Result of compare().
+
+    Attributes:
+    - base, other (ModelResult): The two runs.
+    - metrics_df (pd.DataFrame): 'Metric', 'Base', 'Other' and 'Delta' of the full runs.
+    - expenses_delta_df, revenue_delta_df (pd.DataFrame): Changed line items per month,
+      see line_item_deltas().
+    - attribution_df (pd.DataFrame): Per changed input, see attribute().
+    """
+    base: ModelResult
+    other: ModelResult
+    metrics_df: pd.DataFrame
+    expenses_delta_df: pd.DataFrame
+    revenue_delta_df: pd.DataFrame
+    attribution_df: pd.DataFrame
+
+
+def changed_inputs(base, other):
+    """
+    Names of the Assumptions fields that differ between two assumption sets.
+
+    Fields are compared as given, so a change to e.g. sq_ft is one input even though it
+    also changes the derived rent line items. A field left None on one side (to be
+    derived) and set to the derived value on the other does not count as changed.
+    """
+    resolved_base, resolved_other = base.resolved(), other.resolved()
+    changed = []
+    for field in dataclasses.fields(Assumptions):
+        name = field.name
+        if fingerprint(getattr(base, name)) == fingerprint(getattr(other, name)):
+            continue
+        if fingerprint(getattr(resolved_base, name)) == fingerprint(getattr(resolved_other, name)):
+            continue
+        changed.append(name)
+    return changed
+
+
+def line_item_deltas(base_df, other_df, changed_only=True):
+    """
+    Monthly totals of every line item in two Date/Name/Amount frames and their difference.
+
+    Parameters:
+    - base_df, other_df (pd.DataFrame): Ledgers such as all_expenses_df of two runs.
+    - changed_only (bool): Keep only the line items and months whose total changed.
+
+    Returns:
+    - pd.DataFrame: 'Period', 'Name', 'Base', 'Other' and 'Delta', by month then name.
+    """
+    dates = np.concatenate([np.asarray(base_df['Date'], dtype='datetime64[ns]'),
+                            np.asarray(other_df['Date'], dtype='datetime64[ns]')])
+    names = np.concatenate([np.asarray(base_df['Name'], dtype=object), np.asarray(other_df['Name'], dtype=object)])
+    amounts = np.concatenate([base_df['Amount'].to_numpy(dtype=float), other_df['Amount'].to_numpy(dtype=float)])
+    if not len(dates):
+        return pd.DataFrame(columns=['Period', 'Name', 'Base', 'Other', 'Delta'])
+
+    # One bincount per run over (month, line item) cells
+    calendar = Calendar.covering(dates)
+    codes, uniques = pd.factorize(names, sort=True)
+    cells = calendar.offset(dates) * len(uniques) + codes
+    size = len(calendar) * len(uniques)
+    split = len(base_df)
+    base = np.bincount(cells[:split], weights=amounts[:split], minlength=size)
+    other = np.bincount(cells[split:], weights=amounts[split:], minlength=size)
+
+    delta = other - base
+    keep = np.flatnonzero(np.abs(delta) > 1e-9 if changed_only else (base != 0) | (other != 0))
+    return pd.DataFrame({
+        'Period': calendar.labels[keep // len(uniques)],
+        'Name': np.asarray(uniques, dtype=object)[keep % len(uniques)],
+        'Base': base[keep],
+        'Other': other[keep],
+        'Delta': delta[keep],
+    })
+
+
+def _apply(base, other, names, mask):
+    # base with the changes of the inputs whose bits are set in mask
+    return dataclasses.replace(base, **{name: getattr(other, name) for i, name in enumerate(names) if mask >> i & 1})
+
+
+def evaluate_subsets(base, other, names, masks, metrics=('min_cash', 'cumulative_profit'), cache=None):
+    """
+    Metrics of the base case with subsets of the changes applied.
+
+    Parameters:
+    - base, other (Assumptions): The two assumption sets.
+    - names (list): Changed inputs; bit i of a mask stands for names[i].
+    - masks (array-like): Subsets to evaluate, as integer bitmasks.
+    - metrics (tuple): Names from sweep.METRICS.
+    - cache (pipeline.StageCache, optional): Shared by the full model runs.
+
+    Returns:
+    - np.ndarray: (len(masks) x len(metrics)) values.
+    """
+    masks = np.asarray(masks, dtype=np.int64)
+    values = np.empty((len(masks), len(metrics)))
+    vector = [name for name in names if name in VECTOR_FIELDS] if vector_engine_applies(base) and vector_engine_applies(other) else []
+    structural = sum(1 << i for i, name in enumerate(names) if name not in vector)
+
+    for group in np.unique(masks & structural):
+        rows = np.flatnonzero((masks & structural) == group)
+        if vector:
+            # Every subset of the vector inputs is a row of one batch on this group's inputs
+            assumptions = _apply(base, other, names, int(group))
+            points = {name: np.where(masks[rows] >> names.index(name) & 1, getattr(other, name), getattr(base, name))
+                      for name in vector}
+            batch = evaluate_points(points, assumptions)
+            values[rows] = np.column_stack([batch[metric] for metric in metrics])
+            continue
+        for row in rows:
+            model = FinancialModel(_apply(base, other, names, int(masks[row])), cache)
+            computed = result_metrics(model.run(), model.assumptions)
+            values[row] = [computed[metric] for metric in metrics]
+    return values
+
+
+def _shapley_weights(k):
+    # Weight of a coalition of each size s in an input's exact Shapley value: s! (k - s - 1)! / k!
+    return np.array([math.factorial(s) * math.factorial(k - s - 1) / math.factorial(k) for s in range(k)])
+
+
+def attribute(base, other, names=None, metrics=('min_cash', 'cumulative_profit'), cache=None,
+              permutations=200, seed=None):
+    """
+    Attribute the change in each metric to the changed inputs.
+
+    Parameters:
+    - base, other (Assumptions): The two assumption sets.
+    - names (list, optional): Inputs to attribute to; every changed input by default.
+    - metrics (tuple): Names from sweep.METRICS. A breakeven_month that is NaN in some
+      subset gives NaN attributions.
+    - cache (pipeline.StageCache, optional): Shared by full model runs, see evaluate_subsets().
+    - permutations (int): Sampled orders when there are more than SHAPLEY_EXACT_MAX inputs.
+    - seed (int, optional): Seed of the sampled orders.
+
+    Returns:
+    - pd.DataFrame: One row per input with 'Input', 'Base Value' and 'Other Value', then
+      '<metric> OAT' and '<metric> Shapley' for each metric. The Shapley values add up to
+      the change between the two runs (exactly, or on average when sampled).
+
+    Raises:
+    - ValueError: On an unknown metric.
+    """
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics {', '.join(sorted(unknown))}; choose from {', '.join(METRICS)}")
+    names = list(changed_inputs(base, other) if names is None else names)
+    k = len(names)
+    singles = 1 << np.arange(k, dtype=np.int64)
+
+    if k <= SHAPLEY_EXACT_MAX:
+        # Every subset: phi_i = sum over S without i of w(|S|) * (v(S + i) - v(S))
+        masks = np.arange(1 << k, dtype=np.int64)
+        values = evaluate_subsets(base, other, names, masks, metrics, cache)
+        sizes = np.array([bin(mask).count('1') for mask in range(1 << k)])
+        weights = _shapley_weights(k) if k else np.empty(0)
+        shapley = np.empty((k, len(metrics)))
+        for i in range(k):
+            without = masks[(masks & singles[i]) == 0]
+            shapley[i] = weights[sizes[without]] @ (values[without | singles[i]] - values[without])
+        oat = values[singles] - values[0] if k else np.empty((0, len(metrics)))
+    else:
+        # Sampled orders: each input's mean marginal effect when it joins the inputs before it
+        rng = np.random.default_rng(seed)
+        orders = np.array([rng.permutation(k) for _ in range(permutations)])
+        prefixes = np.zeros((permutations, k + 1), dtype=np.int64)
+        prefixes[:, 1:] = np.cumsum(singles[orders], axis=1)
+        masks, inverse = np.unique(np.concatenate([[0], singles, prefixes.ravel()]), return_inverse=True)
+        values = evaluate_subsets(base, other, names, masks, metrics, cache)[inverse]
+        oat = values[1:k + 1] - values[0]
+        marginal = np.diff(values[k + 1:].reshape(permutations, k + 1, len(metrics)), axis=1)
+        shapley = np.zeros((k, len(metrics)))
+        np.add.at(shapley, orders.ravel(), marginal.reshape(-1, len(metrics)))
+        shapley /= permutations
+
+    attribution_df = pd.DataFrame({
+        'Input': names,
+        'Base Value': pd.Series([getattr(base, name) for name in names], dtype=object),
+        'Other Value': pd.Series([getattr(other, name) for name in names], dtype=object),
+    })
+    for j, metric in enumerate(metrics):
+        attribution_df[f'{metric} OAT'] = oat[:, j]
+        attribution_df[f'{metric} Shapley'] = shapley[:, j]
+    return attribution_df
+
+
+def compare(base, other, metrics=('min_cash', 'cumulative_profit'), cache=None, permutations=200, seed=None):
+    """
+    Run two assumption sets and explain the difference.
+
+    Parameters:
+    - base, other (Assumptions): The plan versions to compare. Pass them unresolved, so
+      that derived line items follow the inputs they are derived from.
+    - metrics (tuple): Metrics to attribute, see attribute().
+    - cache (pipeline.StageCache, optional): Shared by every run; a new one by default, so
+      the second run reuses the stages the changes do not touch.
+    - permutations, seed: Sampling of the Shapley values, see attribute().
+
+    Returns:
+    - Comparison: Both runs, their metrics, line-item deltas and the attribution.
+    """
+    cache = StageCache() if cache is None else cache
+    base_model, other_model = FinancialModel(base, cache), FinancialModel(other, cache)
+    base_result, other_result = base_model.run(), other_model.run()
+
+    base_metrics = result_metrics(base_result, base_model.assumptions)
+    other_metrics = result_metrics(other_result, other_model.assumptions)
+    metrics_df = pd.DataFrame({
+        'Metric': list(METRICS),
+        'Base': [base_metrics[name] for name in METRICS],
+        'Other': [other_metrics[name] for name in METRICS],
+    })
+    metrics_df['Delta'] = metrics_df['Other'] - metrics_df['Base']
+
+    return Comparison(
+        base=base_result,
+        other=other_result,
+        metrics_df=metrics_df,
+        expenses_delta_df=line_item_deltas(base_result.all_expenses_df, other_result.all_expenses_df),
+        revenue_delta_df=line_item_deltas(base_result.all_revenue_df, other_result.all_revenue_df),
+        attribution_df=attribute(base, other, metrics=metrics, cache=cache, permutations=permutations, seed=seed),
+    )
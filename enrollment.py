@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+from labor import StaffingConfig
+
+# Calendar-month multipliers, January first: fewer sign-ups and more drop-outs over the summer
+ACQUISITION_SEASONALITY = (1.2, 1.1, 1.0, 1.0, 0.9, 0.6, 0.5, 0.7, 1.4, 1.2, 1.0, 0.8)
+CHURN_SEASONALITY = (1.0, 1.0, 1.0, 1.0, 1.1, 1.6, 1.6, 1.3, 0.8, 0.9, 1.0, 1.2)
+
+
+@dataclass
+class EnrollmentConfig:
+    """
+    Parameters of the stochastic enrollment model.
+
+    Every month each enrolled student leaves with probability churn_rate (scaled by the
+    calendar month's churn multiplier), then a Poisson number of new students with mean
+    acquisition (scaled by the acquisition multiplier) signs up. Sign-ups beyond the
+    capacity are turned away; the capacity comes from the same StaffingConfig the labor
+    engine costs, see labor.StaffingConfig.capacity().
+
+    Attributes:
+    - initial_students (float): Students enrolled in the grand opening month.
+    - acquisition (float): Mean new students per month.
+    - churn_rate (float): Monthly probability that a student leaves.
+    - acquisition_seasonality (tuple): 12 calendar-month multipliers of acquisition.
+    - churn_seasonality (tuple): 12 calendar-month multipliers of churn_rate.
+    - staffing (StaffingConfig, optional): Seats, schedule and sessions per student;
+      StaffingConfig() defaults when None, as in Assumptions.
+    - teachers_per_session (int, optional): Teachers available per session; defaults to
+      enough to fill every seat.
+    """
+    initial_students: float = 50
+    acquisition: float = 12
+    churn_rate: float = 0.03
+    acquisition_seasonality: tuple = ACQUISITION_SEASONALITY
+    churn_seasonality: tuple = CHURN_SEASONALITY
+    staffing: StaffingConfig = None
+    teachers_per_session: int = None
+
+    @property
+    def capacity(self):
+        """
+        Most students that can be enrolled at once, see StaffingConfig.capacity().
+        """
+        return (self.staffing or StaffingConfig()).capacity(self.teachers_per_session)
+
+
+def simulate_enrollment(config, months, open_offset=0, n_paths=1000, seed=None):
+    """
+    Draw enrollment paths, all paths advancing one month per vectorized step.
+
+    Parameters:
+    - config (EnrollmentConfig): Model parameters.
+    - months (pd.DatetimeIndex): Month grid, e.g. ScenarioInputs.months; sets the calendar
+      month of each step for seasonality.
+    - open_offset (int): Index of the grand opening month; enrollment is zero before it.
+    - n_paths (int): Number of independent paths.
+    - seed (int or np.random.SeedSequence, optional): Seed for the NumPy Generator.
+
+    Returns:
+    - np.ndarray: (n_paths x n_months) student counts.
+    """
+    rng = np.random.default_rng(seed)
+    calendar = np.asarray(months.month) - 1
+    acquisition = config.acquisition * np.asarray(config.acquisition_seasonality, dtype=float)[calendar]
+    churn = np.clip(config.churn_rate * np.asarray(config.churn_seasonality, dtype=float)[calendar], 0, 1)
+    capacity = config.capacity
+
+    students = np.zeros((n_paths, len(months)))
+    if open_offset >= len(months):
+        return students
+    current = np.full(n_paths, min(config.initial_students, capacity), dtype=np.int64)
+    students[:, open_offset] = current
+    for t in range(open_offset + 1, len(months)):
+        current = current - rng.binomial(current, churn[t]) + rng.poisson(acquisition[t], n_paths)
+        current = np.minimum(current, capacity)
+        students[:, t] = current
+    return students
+
+
+def enrollment_revenue(students, monthly_student_price):
+    """
+    Enrollment revenue per month for student counts of any shape.
+    """
+    return np.asarray(students, dtype=float) * monthly_student_price
+
+
+def revenue_frame(students, months, monthly_student_price, open_offset=0, billing_day=1):
+    """
+    One enrollment path as a recurring revenue frame shaped like revenue_growth_df(), so
+    it can feed add_labor_costs_df() and add_tax_and_royalty().
+
+    Parameters:
+    - students (np.ndarray): Student counts of one path, aligned with `months`.
+    - months (pd.DatetimeIndex): Month grid.
+    - monthly_student_price (float): Revenue per student per month.
+    - open_offset (int): Index of the grand opening month; earlier months are dropped.
+    - billing_day (int): Day of the month revenue is billed on.
+
+    Returns:
+    - DataFrame: 'Date', 'Name', 'Amount' and 'Student_Count' columns.
+    """
+    students = np.asarray(students, dtype=float)[open_offset:]
+    dates = months[open_offset:].to_period('M').to_timestamp(how='start') + pd.Timedelta(days=billing_day - 1)
+    return pd.DataFrame({
+        'Date': dates,
+        'Name': "Enrollment Revenue",
+        'Amount': enrollment_revenue(students, monthly_student_price),
+        'Student_Count': students,
+    })
@@ -0,0 +1,198 @@
+"""
+Recurring random events (birthday parties, camps) drawn in bulk from seeded NumPy generators.
+
+    parties = Event('Birthday Party', amount=300, rate=0.2)                   # 0.2 parties a month
+    camps = Event('Summer Camp', amount=4500, rate=1, months=(6, 8), day=1, poisson=False)
+    df = event_frame([parties, camps], opening, end, seed=1)                 # Date/Name/Amount rows
+    revenue = event_revenue([parties, camps], opening, end, calendar, scenarios=10000, seed=1)
+
+The number of occurrences of an event in a month is Poisson distributed with mean `rate`,
+scaled by the part of the month inside [start, end]. Scenarios are drawn in fixed blocks of
+SCENARIO_BLOCK: block b is one draw from the b-th child of SeedSequence(seed), so a
+100,000-scenario draw seeds a few hundred generators rather than one per scenario. Blocks
+are always drawn whole and the rows not asked for are dropped, so the events of a scenario
+do not depend on how many scenarios are drawn, in which chunks, or by which worker:
+
+    event_revenue(events, opening, end, calendar, scenarios=range(5000, 10000), seed=1)
+    # equals rows 5000-9999 of the 10000-scenario draw above
+"""
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+from periods import Calendar
+
+# Scenarios whose event counts are drawn from one generator, see event_counts()
+SCENARIO_BLOCK = 256
+
+
+@dataclass(frozen=True)
+class Event:
+    """
+    A kind of revenue event that recurs over the timeline.
+
+    Attributes:
+    - name (str): Line-item name of each occurrence.
+    - amount (float): Revenue of each occurrence.
+    - rate (float): Mean occurrences per month.
+    - months (tuple, optional): Calendar months (1-12) the event can fall in; every month
+      when None.
+    - day (int, optional): Day of the month of every occurrence, clipped to the month's
+      length; a uniformly random day when None.
+    - poisson (bool): Draw the count of each month; when False the count is the mean,
+      rounded, so e.g. one camp every June and August.
+    """
+    name: str
+    amount: float
+    rate: float
+    months: tuple = None
+    day: int = None
+    poisson: bool = True
+
+
+def _root(seed):
+    return seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+
+def _child(seed, *key):
+    # Child of the root sequence at spawn key `key`, without spawning its siblings
+    root = _root(seed)
+    return np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + tuple(int(k) for k in key),
+                                  pool_size=root.pool_size)
+
+
+def block_seed(seed, block):
+    """
+    SeedSequence the event counts of scenario block `block` are drawn from: child `block`
+    of SeedSequence(seed), the sequence SeedSequence(seed).spawn(block + 1)[block] gives.
+
+    Parameters:
+    - seed (int, np.random.SeedSequence or None): Root seed; None draws fresh entropy once.
+    - block (int): Block index; scenario i is in block i // SCENARIO_BLOCK.
+    """
+    return _child(seed, block)
+
+
+def scenario_rng(seed, scenario=0):
+    """
+    Generator of the random days of one scenario's events: child i % SCENARIO_BLOCK of its
+    block's sequence.
+    """
+    block, row = divmod(int(scenario), SCENARIO_BLOCK)
+    return np.random.default_rng(_child(seed, block, row))
+
+
+def _schedule(events, start, end):
+    """
+    Mean monthly counts of the events over the months of [start, end].
+
+    Returns:
+    - tuple: (Calendar of the months, (events x months) means, (events x months) fixed
+      dates or NaT, first day of each month inside the window, number of days inside it).
+    """
+    calendar = Calendar(start, end)
+    start = np.datetime64(pd.Timestamp(start).normalize(), 'D')
+    end = np.datetime64(pd.Timestamp(end).normalize(), 'D')
+    month_starts = calendar.month_starts.values.astype('datetime64[D]')
+    first = np.maximum(month_starts, start)
+    days = (np.minimum(calendar.month_ends.values.astype('datetime64[D]'), end) - first).astype(np.int64) + 1
+    calendar_months = np.asarray(calendar.month_starts.month)
+
+    means = np.zeros((len(events), len(calendar)))
+    fixed = np.full((len(events), len(calendar)), np.datetime64('NaT'), dtype='datetime64[D]')
+    for i, event in enumerate(events):
+        allowed = np.ones(len(calendar), dtype=bool) if event.months is None else np.isin(calendar_months, event.months)
+        if event.day is None:
+            inside = days / calendar.days_in_month
+        else:
+            fixed[i] = month_starts + np.minimum(event.day, calendar.days_in_month) - 1
+            inside = (fixed[i] >= first) & (fixed[i] < first + days)
+        means[i] = event.rate * allowed * inside
+    return calendar, means, fixed, first, days
+
+
+def _draw(rng, events, means, n):
+    # Counts of n scenarios, (n x events x months)
+    counts = np.repeat(np.rint(means).astype(np.int64)[None], n, axis=0)
+    drawn = np.array([event.poisson for event in events], dtype=bool)
+    if drawn.any():
+        counts[:, drawn] = rng.poisson(means[drawn], size=(n, *means[drawn].shape))
+    return counts
+
+
+def _counts(events, means, scenarios, seed):
+    # Counts of the given scenarios, drawing each block they fall in whole
+    seed = _root(seed)
+    scenarios = np.arange(scenarios) if isinstance(scenarios, (int, np.integer)) else np.fromiter(scenarios, np.int64)
+    blocks, rows = np.divmod(scenarios, SCENARIO_BLOCK)
+    counts = np.zeros((len(scenarios), *means.shape), dtype=np.int64)
+    for block in np.unique(blocks):
+        picked = blocks == block
+        drawn = _draw(np.random.default_rng(block_seed(seed, block)), events, means, SCENARIO_BLOCK)
+        counts[picked] = drawn[rows[picked]]
+    return counts
+
+
+def event_counts(events, start, end, scenarios=1, seed=None):
+    """
+    Occurrences of every event in every month of [start, end], per scenario.
+
+    Parameters:
+    - events (list): Event entries.
+    - start, end (datetime): First and last day events can fall on.
+    - scenarios (int or iterable): Number of scenarios, or the indices of the scenarios
+      to draw. Scenario i is row i % SCENARIO_BLOCK of block i // SCENARIO_BLOCK, see
+      block_seed(); the cost grows with the number of blocks touched.
+    - seed (int or np.random.SeedSequence, optional): Root seed. With None, fresh entropy
+      is drawn per call, so pass a SeedSequence to draw chunks of one run separately.
+
+    Returns:
+    - tuple: (periods.Calendar of the months of [start, end],
+      (n_scenarios x n_events x n_months) counts).
+    """
+    calendar, means, _, _, _ = _schedule(events, start, end)
+    return calendar, _counts(events, means, scenarios, seed)
+
+
+def event_revenue(events, start, end, calendar, scenarios=1, seed=None):
+    """
+    Revenue of the events per scenario and month of `calendar`; see event_counts().
+
+    Returns:
+    - np.ndarray: (n_scenarios x len(calendar)) revenue; months of [start, end] outside
+      the calendar are dropped.
+    """
+    window, counts = event_counts(events, start, end, scenarios, seed)
+    amounts = np.array([event.amount for event in events], dtype=float)
+    revenue = np.zeros((len(counts), len(calendar)))
+    offsets = calendar.offset(window.month_starts)
+    inside = (offsets >= 0) & (offsets < len(calendar))
+    revenue[:, offsets[inside]] = np.einsum('sem,e->sm', counts, amounts)[:, inside]
+    return revenue
+
+
+def event_frame(events, start, end, seed=None, scenario=0):
+    """
+    The occurrences of one scenario as Date/Name/Amount revenue rows. Their monthly totals
+    match row `scenario` of event_revenue() with the same seed.
+
+    Returns:
+    - DataFrame: One row per occurrence, sorted by date.
+    """
+    _, means, fixed, first, days = _schedule(events, start, end)
+    seed = _root(seed)
+    counts = _counts(events, means, [scenario], seed)[0]
+    rng = scenario_rng(seed, scenario)
+
+    event, month = np.nonzero(counts)
+    repeats = counts[event, month]
+    event, month = np.repeat(event, repeats), np.repeat(month, repeats)
+    random_dates = first[month] + rng.integers(0, days[month])
+    dates = np.where(np.isnat(fixed[event, month]), random_dates, fixed[event, month])
+
+    order = np.argsort(dates, kind='stable')
+    return pd.DataFrame({
+        'Date': pd.DatetimeIndex(dates[order].astype('datetime64[ns]')),
+        'Name': np.array([e.name for e in events], dtype=object)[event[order]],
+        'Amount': np.array([e.amount for e in events], dtype=float)[event[order]],
+    })
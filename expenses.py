@@ -1,29 +1,39 @@
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
 
+from labor import labor_costs
+from ledger import append_item, as_ledger, same_kind
+from periods import Calendar
+from profiling import profiled
+from schedules import monthly_depreciation, depreciation_months, rate_table, tax_and_royalty
+
+# Staffing constants, configurable through labor.StaffingConfig
+from labor import (MAX_STUDENTS_PER_TEACHER, MAX_STUDENTS_PER_SESSION, SESSIONS_PER_NIGHT, NIGHTS_PER_WEEK,
+                   WEEKS_PER_MONTH, SESSIONS_PER_STUDENT_WEEKLY)
+
+TAX_RATE = 0.029  # 2.9% tax
+ROYALTY_RATE = 0.09  # 9% royalty
+
+@profiled
 def add_expense(df, name, date, amount):
     """
     Add a unique expense to the dataframe.
     
     Args:
-    - df (pd.DataFrame): The dataframe to which the expense should be added.
+    - df (pd.DataFrame or Ledger): The expenses to which the expense should be added.
+      A Ledger is appended to in place.
     - name (str): Name of the expense.
     - date (str or datetime): Date of the expense.
     - amount (float): Amount of the expense.
     
     Returns:
-    - pd.DataFrame: Updated dataframe with the new expense.
+    - pd.DataFrame or Ledger: Updated expenses with the new expense.
     """
-    new_expense = pd.DataFrame({
-        'Name': [name],
-        'Date': [date],
-        'Amount': [amount]
-    })
-    return pd.concat([df, new_expense], ignore_index=True)
+    return append_item(df, date, name, amount)
 
 
-def combine_expenses(recurring_expenses, unique_expenses, start_date, end_date):
+@profiled
+def combine_expenses(recurring_expenses, unique_expenses, start_date, end_date, calendar=None):
     """
     Processes recurring expenses to create monthly copies of them for each month, 
     starting from the given start date and going for 3 years. 
@@ -33,17 +43,19 @@ def combine_expenses(recurring_expenses, unique_expenses, start_date, end_date):
     - recurring_expenses (DataFrame): Contains all recurring expenses.
     - unique_expenses (DataFrame): Contains unique expenses.
     - start_date (str): Start date in 'YYYY-MM-DD' format.
+    - end_date (str): End date in 'YYYY-MM-DD' format.
+    - calendar (periods.Calendar, optional): The run's calendar; built from the dates if not given.
 
     Returns:
     - DataFrame: Combined dataframe of processed expenses.
     """
-    all_dates = pd.date_range(start=start_date, end=end_date, freq='M')
-    
-    # Generate a dataframe for each month's recurring expenses
-    monthly_expenses = [recurring_expenses.assign(Date=date.strftime('%Y-%m-%d')) for date in all_dates]
+    calendar = calendar or Calendar(start_date, end_date)
+    all_dates = calendar.month_ends[calendar.month_end_offsets(start_date, end_date)]
 
-    # Combine all monthly dataframes
-    recurring_expenses_df = pd.concat(monthly_expenses, ignore_index=True)
+    # One copy of the recurring expenses per month, dated at the month end
+    rows = np.tile(np.arange(len(recurring_expenses)), len(all_dates))
+    recurring_expenses_df = recurring_expenses.iloc[rows].reset_index(drop=True)
+    recurring_expenses_df['Date'] = np.repeat(all_dates.values, len(recurring_expenses))
 
     # Combine recurring expenses with unique expenses
     all_expenses = pd.concat([recurring_expenses_df, unique_expenses], ignore_index=True)
@@ -60,197 +72,237 @@ def interest_payment(total_debt, interest_rate):
     return total_debt * (interest_rate / 100) / 12 # Divided by 12 to get the monthly interest amount
 
 
-def add_interest_payments(all_expenses, interest_rate):
-    """
-    Processes all expenses, accrues debt, and calculates interest payment.
-    
-    Parameters:
-    - all_expenses (DataFrame): Contains all recurring and unique expenses.
-    - interest_rate (float): The annual interest rate in percentage (e.g., 5 for 5%).
-    
-    Returns:
-    - DataFrame: Updated all_expenses dataframe with interest payments added.
+@profiled
+def debt_schedule(all_expenses, interest_rate, amortization_months=None, cash_flows=None, starting_cash=0,
+                  calendar=None, limit=None):
     """
-    all_expenses.sort_values(by='Date', inplace=True)
+    Month-by-month debt balance and the interest it accrues.
 
-    accrued_debt = 0
-    processed_months = set()
-    interest_payments = []
+    By default every expense is financed and never repaid (interest-only HELOC), so the
+    balance is the cumulative sum of monthly expenses.
 
-    for row in all_expenses.itertuples(index=False):
-        date = row.Date
-        next_month_date = (date.replace(day=1) + timedelta(days=32)).replace(day=1)
-        
-        accrued_debt += row.Amount
+    Parameters:
+    - all_expenses (DataFrame or Ledger): Expenses that are financed.
+    - interest_rate (float or pd.Series): Annual rate in percentage, or a variable-rate
+      schedule indexed by date (see schedules.rate_table()).
+    - amortization_months (int, optional): Repay each month's draw in equal principal
+      installments over this many months, so interest accrues on the declining balance.
+    - cash_flows (pd.Series, optional): Net cash flow per month (revenue minus expenses,
+      before interest), indexed by date. When given, the HELOC is drawn only when cash on
+      hand would go negative and paid down from any surplus; all_expenses then only sets
+      the months covered.
+    - starting_cash (float): Cash on hand before the first month, used with cash_flows.
+    - calendar (periods.Calendar, optional): The run's calendar; must cover the expenses.
+    - limit (float, optional): Credit line. Draws stop once the balance reaches it, and
+      whatever is left is paid from cash.
 
-        if date.month not in processed_months:
-            payment = interest_payment(accrued_debt, interest_rate)
-            
-            interest_payments.append({
-                'Date': next_month_date.strftime('%Y-%m-%d'),
-                'Name': 'Interest Payment',
-                'Amount': payment
-            })
-            
-            processed_months.add(date.month)
+    Returns:
+    - DataFrame: Indexed by month-end date, with 'Balance' at the end of the month, the
+      'Rate' in effect and the 'Interest' accrued on the balance (paid the next month).
+    """
+    ledger = as_ledger(all_expenses)
+    calendar = calendar or Calendar(ledger.dates.min(), ledger.dates.max())
+    offsets = calendar.offset(ledger.dates)
+    first, last = offsets.min(), offsets.max()
+    months = calendar.months[first:last + 1]
+    offsets = offsets - first
+    draws = np.bincount(offsets, weights=ledger.amounts, minlength=len(months))
+    rates = rate_table(interest_rate, calendar)[first:last + 1]
+    limit = np.inf if limit is None else limit
+
+    if cash_flows is not None:
+        flows = cash_flows.groupby(pd.DatetimeIndex(cash_flows.index).to_period('M')).sum()
+        flows = flows.reindex(months, fill_value=0).values
+        balance = np.empty(len(months))
+        cash, owed, interest_due = starting_cash, 0.0, 0.0
+        for t in range(len(months)):
+            cash += flows[t] - interest_due
+            if cash < 0:
+                draw = min(-cash, max(limit - owed, 0.0))
+                owed += draw
+                cash += draw
+            else:
+                paydown = min(cash, owed)
+                owed -= paydown
+                cash -= paydown
+            balance[t] = owed
+            interest_due = interest_payment(owed, rates[t])
+    elif amortization_months:
+        # Each draw's outstanding share after k months is 1 - k/N, floored at zero
+        remaining = np.clip(1 - np.arange(len(months)) / amortization_months, 0, None)
+        if np.isfinite(limit):
+            # Each month draws at most what the repayments so far have freed up
+            for t in range(len(months)):
+                outstanding = draws[:t] @ remaining[t:0:-1]
+                draws[t] = min(draws[t], max(limit - outstanding, 0.0))
+        balance = np.convolve(draws, remaining)[:len(months)]
+    else:
+        balance = np.minimum(np.cumsum(draws), limit)
+
+    return pd.DataFrame({
+        'Balance': balance,
+        'Rate': rates,
+        'Interest': interest_payment(balance, rates),
+    }, index=calendar.month_ends[first:last + 1])
+
+
+@profiled
+def add_interest_payments(all_expenses, interest_rate, amortization_months=None, cash_flows=None,
+                          starting_cash=0, schedule=None):
+    """
+    Accrues debt month by month and adds one interest payment per calendar month.
 
-    interest_payments_df = pd.DataFrame(interest_payments)
+    Interest accrued on the balance at the end of a month is paid on the first day of the
+    next month. Payments that would fall after the last expense are not added.
 
-    all_expenses = pd.concat([all_expenses, interest_payments_df], ignore_index=True)
+    Parameters:
+    - all_expenses (DataFrame or Ledger): Contains all recurring and unique expenses.
+      A Ledger is appended to in place.
+    - interest_rate (float or pd.Series): The annual interest rate in percentage (e.g., 5 for 5%),
+      or a variable-rate schedule indexed by date.
+    - amortization_months, cash_flows, starting_cash: See debt_schedule().
+    - schedule (DataFrame, optional): A precomputed debt_schedule(); when given, the
+      payments come from it instead of from all_expenses.
 
-    # Ensure the 'Date' column is of type Timestamp
-    all_expenses['Date'] = pd.to_datetime(all_expenses['Date']) 
+    Returns:
+    - DataFrame or Ledger: Updated expenses with interest payments added.
+    """
+    ledger = as_ledger(all_expenses)
+    if schedule is None:
+        schedule = debt_schedule(ledger, interest_rate, amortization_months, cash_flows, starting_cash)
 
-    return all_expenses.sort_values(by='Date')
+    payment_dates = (schedule.index.to_period('M') + 1).to_timestamp(how='start')
+    keep = (payment_dates <= ledger.dates.max()) & (schedule['Interest'].values != 0)
+    ledger.extend(payment_dates[keep], 'Interest Payment', schedule['Interest'].values[keep])
+    return same_kind(all_expenses, ledger)
 
 
-def calculate_teachers_per_month(student_count):
+def calculate_teachers_per_month(student_count, staffing=None):
     """
     Calculate the number of teachers required for a given student count per month.
     
     Parameters:
-    - student_count (int): Number of students enrolled in a month.
+    - student_count (int or np.ndarray): Number of students enrolled in a month.
+      Arrays (e.g. a scenarios x months matrix) are handled element-wise.
+    - staffing (StaffingConfig, optional): Staffing constants, see labor.labor_costs().
 
     Returns:
-    - int: Number of teachers required.
+    - int or np.ndarray: Teachers staffing each session.
     """
-    # Constants  ## FIXME
-    MAX_STUDENTS_PER_TEACHER = 4
-    MAX_STUDENTS_PER_SESSION = 16
-    SESSIONS_PER_NIGHT = 3
-    NIGHTS_PER_WEEK = 5
-    WEEKS_PER_MONTH = 4
-    SESSIONS_PER_STUDENT_WEEKLY = 2
-
-    # Calculate total sessions a student attends per month
-    sessions_per_student_monthly = SESSIONS_PER_STUDENT_WEEKLY * WEEKS_PER_MONTH
-    
-    # Total sessions for all students
-    total_sessions_monthly = student_count * sessions_per_student_monthly
-    
-    # Teachers required for each session
-    teachers_per_session = MAX_STUDENTS_PER_SESSION / MAX_STUDENTS_PER_TEACHER
-    
-    # Total teacher sessions required monthly
-    total_teacher_sessions_monthly = teachers_per_session * total_sessions_monthly
-    
-    # Given there are multiple sessions per night and multiple nights per week,
-    # calculate the number of sessions a single teacher can conduct in a month
-    sessions_per_teacher_monthly = SESSIONS_PER_NIGHT * NIGHTS_PER_WEEK * WEEKS_PER_MONTH
-
-    # Calculate total number of teachers needed monthly
-    num_teachers = total_teacher_sessions_monthly / sessions_per_teacher_monthly
-
-    return int(num_teachers)
+    teachers = labor_costs(student_count, 0, staffing).teachers
+    if isinstance(student_count, np.ndarray):
+        return teachers
+    return int(teachers)
 
 
-
-def add_labor_costs_df(all_expenses_df, recurring_revenue_df, hourly_rate):
+@profiled
+def add_labor_costs_df(all_expenses_df, recurring_revenue_df, hourly_rate, staffing=None):
     """
     Adds labor costs to the all_expenses_df based on recurring_revenue_df and teacher hourly rates.
+
+    Teachers are paid for every hour they staff a session (see labor.labor_costs()), and
+    employer payroll tax is booked alongside.
     
     Parameters:
-    - all_expenses_df (DataFrame): The existing dataframe of all expenses.
+    - all_expenses_df (DataFrame or Ledger): The existing expenses. A Ledger is appended to in place.
     - recurring_revenue_df (DataFrame): The dataframe of recurring revenues with student counts.
     - hourly_rate (float): Hourly rate of each teacher.
+    - staffing (StaffingConfig, optional): Staffing constants; defaults to StaffingConfig().
 
     Returns:
-    - DataFrame: Updated all_expenses_df with labor costs added.
+    - DataFrame or Ledger: Updated expenses with labor costs added.
     """
-    labor_costs = []
-
-    for _, row in recurring_revenue_df.iterrows():
-        student_count = row['Student_Count']
-        num_teachers = calculate_teachers_per_month(student_count)
-        
-        total_labor_cost = num_teachers * hourly_rate
-        
-        labor_costs.append({
-            'Date': row['Date'],
-            'Name': 'Labor Cost',
-            'Amount': total_labor_cost
-        })
-
-    labor_costs_df = pd.DataFrame(labor_costs)
-
-    # Combine labor costs with existing expenses
-    combined_expenses = pd.concat([all_expenses_df, labor_costs_df], ignore_index=True)
-    
-    # Sort by date for better organization
-    return combined_expenses.sort_values(by='Date')
+    costs = labor_costs(recurring_revenue_df['Student_Count'].values, hourly_rate, staffing)
+    dates = recurring_revenue_df['Date'].values
+
+    ledger = as_ledger(all_expenses_df).extend(dates, 'Labor Cost', costs.wages)
+    if costs.salaries.any():
+        ledger.extend(dates, 'Salaries', costs.salaries)
+    if costs.payroll_tax.any():
+        ledger.extend(dates, 'Payroll Tax', costs.payroll_tax)
+    return same_kind(all_expenses_df, ledger)
 
 
-def add_tax_and_royalty(all_expenses_df, all_revenue_df):
+@profiled
+def add_tax_and_royalty(all_expenses_df, all_revenue_df, tax_rate=TAX_RATE, royalty_rate=ROYALTY_RATE, calendar=None):
     """
     Adds tax and royalty expenses to the all_expenses_df based on the revenue.
 
     Parameters:
-    - all_expenses_df (pd.DataFrame): The dataframe containing all the expenses.
+    - all_expenses_df (pd.DataFrame or Ledger): The expenses. A Ledger is appended to in place.
     - all_revenue_df (pd.DataFrame): The dataframe containing all the revenues.
+    - tax_rate (float, dict or pd.Series): Tax on revenue, fixed or a {date: rate} table, see
+      schedules.rate_table().
+    - royalty_rate (float, dict or pd.Series): Royalty on revenue net of tax, likewise.
+    - calendar (periods.Calendar, optional): The run's calendar; must cover the revenue.
 
     Returns:
-    - pd.DataFrame: Updated all_expenses_df with tax and royalty expenses added.
+    - pd.DataFrame or Ledger: Updated expenses with tax and royalty expenses added.
     """
-    TAX_RATE = 0.029  # 2.9% tax
-    ROYALTY_RATE = 0.09  # 9% royalty
+    ledger = as_ledger(all_expenses_df)
+    if not len(all_revenue_df):
+        return same_kind(all_expenses_df, ledger)
 
-    # Group the revenues by Date and calculate the sum for each date.
-    grouped_revenues = all_revenue_df.groupby('Date').sum(numeric_only=True)
+    # Sum the revenues of each date
+    dates, inverse = np.unique(np.asarray(all_revenue_df['Date'], dtype='datetime64[ns]'), return_inverse=True)
+    revenue = np.bincount(inverse, weights=all_revenue_df['Amount'].to_numpy(dtype=float))
 
-    # Calculate tax and royalty based on the grouped revenues.
-    grouped_revenues['Tax'] = grouped_revenues['Amount'] * TAX_RATE
-    grouped_revenues['Royalty'] = (grouped_revenues['Amount'] - grouped_revenues['Tax']) * ROYALTY_RATE
+    # Rates of each date's month
+    calendar = calendar or Calendar.covering(dates)
+    months = calendar.offset(dates)
+    tax, royalty = tax_and_royalty(revenue, rate_table(tax_rate, calendar)[months],
+                                   rate_table(royalty_rate, calendar)[months])
 
-    # Create separate DataFrames for tax and royalty expenses to merge with all_expenses_df.
-    tax_df = grouped_revenues[['Tax']].reset_index()
-    tax_df.columns = ['Date', 'Amount']
-    tax_df['Name'] = 'Tax Expense'
+    ledger.extend(dates, 'Tax Expense', tax)
+    ledger.extend(dates, 'Royalty Expense', royalty)
+    return same_kind(all_expenses_df, ledger)
 
-    royalty_df = grouped_revenues[['Royalty']].reset_index()
-    royalty_df.columns = ['Date', 'Amount']
-    royalty_df['Name'] = 'Royalty Expense'
 
-    # Combine the tax and royalty dataframes and then concatenate with all_expenses_df.
-    tax_and_royalty_df = pd.concat([tax_df, royalty_df], ignore_index=True)
-    all_expenses_df = pd.concat([all_expenses_df, tax_and_royalty_df], ignore_index=True)
-
-    return all_expenses_df.sort_values(by='Date')
-
-
-def add_depreciation_expense(all_expenses_df, USEFUL_LIFE, INST_COMP_COST, start_date, end_date):
+@profiled
+def add_depreciation_expense(all_expenses_df, USEFUL_LIFE, INST_COMP_COST, start_date, end_date, calendar=None):
     """
     Adds monthly straight-line depreciation expenses to the all_expenses_df.
 
     Parameters:
-    - all_expenses_df (pd.DataFrame): The dataframe containing all the expenses.
+    - all_expenses_df (pd.DataFrame or Ledger): The expenses. A Ledger is appended to in place.
     - USEFUL_LIFE (int): The number of months over which the asset is to be depreciated.
     - INST_COMP_COST (float): The total cost of the instrument/component to be depreciated.
     - start_date (str or datetime): The starting date for the depreciation expense.
     - end_date (str or datetime): The ending date for the depreciation expense.
+    - calendar (periods.Calendar, optional): The run's calendar; built from the dates if not given.
 
     Returns:
-    - pd.DataFrame: Updated all_expenses_df with depreciation expenses added.
+    - pd.DataFrame or Ledger: Updated expenses with depreciation expenses added.
     """
-    # Convert start_date and end_date to datetime if they're not already
-    if isinstance(start_date, str):
-        start_date = pd.to_datetime(start_date)
-    if isinstance(end_date, str):
-        end_date = pd.to_datetime(end_date)
+    calendar = calendar or Calendar(start_date, end_date)
 
     # Calculate monthly depreciation amount
     monthly_depreciation = INST_COMP_COST / USEFUL_LIFE
 
-    # Create a date range for the specified depreciation period
-    date_range = pd.date_range(start=start_date, end=end_date, freq='M')
+    # Month ends of the depreciation period, not exceeding USEFUL_LIFE
+    date_range = calendar.month_ends[calendar.month_end_offsets(start_date, end_date)[:USEFUL_LIFE]]
 
-    # Create a DataFrame for the depreciation expenses
-    depreciation_df = pd.DataFrame({
-        'Date': date_range,
-        'Name': 'Depreciation Expense',
-        'Amount': [monthly_depreciation for _ in range(min(len(date_range), USEFUL_LIFE))]  # Ensure we don't exceed USEFUL_LIFE
-    })
+    ledger = as_ledger(all_expenses_df).extend(date_range, 'Depreciation Expense', monthly_depreciation)
+    return same_kind(all_expenses_df, ledger)
 
-    # Concatenate the depreciation dataframe with all_expenses_df
-    all_expenses_df = pd.concat([all_expenses_df, depreciation_df], ignore_index=True)
 
-    return all_expenses_df.sort_values(by='Date')
+@profiled
+def add_asset_depreciation(all_expenses_df, register, calendar, end_date=None):
+    """
+    Adds the monthly depreciation of an asset register to the all_expenses_df, one
+    'Depreciation Expense' per month any asset is depreciated in.
+
+    Parameters:
+    - all_expenses_df (pd.DataFrame or Ledger): The expenses. A Ledger is appended to in place.
+    - register (schedules.AssetRegister): The assets, with their in-service dates, lives
+      and depreciation methods.
+    - calendar (periods.Calendar): The run's calendar.
+    - end_date (str or datetime, optional): The last day depreciation is booked through.
+
+    Returns:
+    - pd.DataFrame or Ledger: Updated expenses with depreciation expenses added.
+    """
+    months = depreciation_months(register, calendar, end_date)
+    amounts = monthly_depreciation(register, calendar, end_date)[months]
+    ledger = as_ledger(all_expenses_df).extend(calendar.month_ends[months], 'Depreciation Expense', amounts)
+    return same_kind(all_expenses_df, ledger)
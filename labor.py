@@ -0,0 +1,131 @@
+import numpy as np
+from dataclasses import dataclass
+
+# Staffing constants
+MAX_STUDENTS_PER_TEACHER = 4
+MAX_STUDENTS_PER_SESSION = 16
+SESSIONS_PER_NIGHT = 3
+NIGHTS_PER_WEEK = 5
+WEEKS_PER_MONTH = 4
+SESSIONS_PER_STUDENT_WEEKLY = 2
+
+PAYROLL_TAX_RATE = 0.0765  # employer Social Security + Medicare
+# Recurring expense lines that are payroll, so payroll tax is due on them too
+SALARY_LINES = ('Director Salary', 'Coach Labor', 'Salaries')
+
+
+@dataclass
+class StaffingConfig:
+    """
+    How students translate into teaching staff and payroll.
+
+    Attributes:
+    - max_students_per_teacher (int): Students one teacher can teach at once.
+    - max_students_per_session (int): Seats per session.
+    - sessions_per_night (int), nights_per_week (int): Sessions that can be scheduled.
+    - weeks_per_month (float): Weeks billed per month.
+    - sessions_per_student_weekly (int): Sessions each student attends per week.
+    - session_hours (float): Paid hours per teacher per session.
+    - prep_hours_per_session (float): Extra paid hours per teacher per session.
+    - director_salary (float): Monthly salary paid through the labor engine.
+    - coach_salary (float): Monthly salary paid through the labor engine.
+    - payroll_tax_rate (float): Employer payroll tax on wages and salaries.
+    """
+    max_students_per_teacher: int = MAX_STUDENTS_PER_TEACHER
+    max_students_per_session: int = MAX_STUDENTS_PER_SESSION
+    sessions_per_night: int = SESSIONS_PER_NIGHT
+    nights_per_week: int = NIGHTS_PER_WEEK
+    weeks_per_month: float = WEEKS_PER_MONTH
+    sessions_per_student_weekly: int = SESSIONS_PER_STUDENT_WEEKLY
+    session_hours: float = 1.0
+    prep_hours_per_session: float = 0.0
+    director_salary: float = 0.0  # the model books the director as a recurring expense, see SALARY_LINES
+    coach_salary: float = 0.0  # the model books the coach as a recurring expense, see SALARY_LINES
+    payroll_tax_rate: float = PAYROLL_TAX_RATE
+
+    def capacity(self, teachers_per_session=None):
+        """
+        Most students that can be enrolled at once. The same students attend every week,
+        so this is the weekly seat count of every session that can be scheduled divided
+        by the sessions each student takes.
+
+        Parameters:
+        - teachers_per_session (int, optional): Teachers available per session; a session
+          then seats only the students they can teach. Enough for every seat by default.
+        """
+        seats = self.max_students_per_session
+        if teachers_per_session is not None:
+            seats = min(seats, teachers_per_session * self.max_students_per_teacher)
+        return seats * self.sessions_per_night * self.nights_per_week // self.sessions_per_student_weekly
+
+
+@dataclass
+class LaborCosts:
+    """
+    Output of labor_costs(); every attribute has the shape of the student counts.
+
+    Attributes:
+    - sessions (np.ndarray): Sessions held per week.
+    - teachers (np.ndarray): Teachers staffing each session (headcount).
+    - hours (np.ndarray): Paid teacher hours per month, all teachers together.
+    - wages (np.ndarray): Hourly teacher pay per month.
+    - salaries (np.ndarray): Director and coach salaries per month.
+    - payroll_tax (np.ndarray): Employer payroll tax on wages and salaries.
+    - total (np.ndarray): wages + salaries + payroll_tax.
+    """
+    sessions: np.ndarray
+    teachers: np.ndarray
+    hours: np.ndarray
+    wages: np.ndarray
+    salaries: np.ndarray
+    payroll_tax: np.ndarray
+    total: np.ndarray
+
+
+def labor_costs(student_count, hourly_rate, config=None):
+    """
+    Teacher headcount, hours and payroll for student counts of any shape.
+
+    Students are spread evenly over as few sessions as the seats allow (capped at the
+    sessions that can be scheduled), each session gets enough teachers for its students,
+    and every teacher is paid for each session they staff.
+
+    Parameters:
+    - student_count (float or np.ndarray): Students per month, e.g. a months series or a
+      scenarios x months matrix.
+    - hourly_rate (float or np.ndarray): Teacher hourly rate; broadcast against student_count.
+    - config (StaffingConfig, optional): Staffing constants; defaults to StaffingConfig().
+
+    Returns:
+    - LaborCosts: Arrays shaped like the broadcast inputs.
+    """
+    c = config or StaffingConfig()
+    students = np.asarray(student_count, dtype=float)
+
+    weekly_seats_needed = students * c.sessions_per_student_weekly
+    sessions = np.minimum(np.ceil(weekly_seats_needed / c.max_students_per_session),
+                          c.sessions_per_night * c.nights_per_week)
+    students_per_session = np.divide(weekly_seats_needed, sessions, out=np.zeros_like(students), where=sessions > 0)
+    teachers = np.ceil(np.minimum(students_per_session, c.max_students_per_session) / c.max_students_per_teacher)
+
+    hours = sessions * teachers * (c.session_hours + c.prep_hours_per_session) * c.weeks_per_month
+    wages = hours * hourly_rate
+    salaries = np.where(students > 0, c.director_salary + c.coach_salary, 0.0)
+    payroll_tax = (wages + salaries) * c.payroll_tax_rate
+    return LaborCosts(sessions=sessions, teachers=teachers, hours=hours, wages=wages, salaries=salaries,
+                      payroll_tax=payroll_tax, total=wages + salaries + payroll_tax)
+
+
+def salary_payroll_tax(recurring_expenses, config=None):
+    """
+    Monthly employer payroll tax on the recurring salary lines (SALARY_LINES).
+
+    Parameters:
+    - recurring_expenses (list): Name/Amount dicts of the monthly operating expenses.
+    - config (StaffingConfig, optional): Staffing constants; defaults to StaffingConfig().
+
+    Returns:
+    - float: Payroll tax per month.
+    """
+    c = config or StaffingConfig()
+    return sum(e['Amount'] for e in recurring_expenses if e['Name'] in SALARY_LINES) * c.payroll_tax_rate
@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+from accounts import CHART
+
+
+class Ledger:
+    """
+    Append-only, columnar store of Date/Name/Amount line items.
+
+    Rows live in preallocated NumPy arrays that double in size when full, so append()
+    is O(1) amortized and extend() copies each batch once. Names are stored as account
+    codes of the chart of accounts (see accounts.py), so ledgers share one code space.
+    Nothing is sorted until to_frame() materializes the DataFrame.
+
+    Parameters:
+    - capacity (int): Rows to preallocate.
+    - chart (accounts.ChartOfAccounts): Chart the codes index into.
+    - account_type (str): Type of the accounts registered for names not in the chart.
+    """
+
+    def __init__(self, capacity=64, chart=CHART, account_type='opex'):
+        self._dates = np.empty(capacity, dtype='datetime64[ns]')
+        self._codes = np.empty(capacity, dtype=np.int32)
+        self._amounts = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+        self.chart = chart
+        self.account_type = account_type
+
+    def __len__(self):
+        return self._size
+
+    @classmethod
+    def from_frame(cls, df, chart=CHART, account_type='opex'):
+        """
+        Create a ledger holding the Date/Name/Amount rows of a DataFrame.
+        """
+        ledger = cls(capacity=max(len(df), 64), chart=chart, account_type=account_type)
+        if len(df):
+            ledger.extend(pd.to_datetime(df['Date']).values, df['Name'], df['Amount'].values)
+        return ledger
+
+    def copy(self):
+        ledger = Ledger(capacity=max(self._size, 64), chart=self.chart, account_type=self.account_type)
+        ledger._dates[:self._size] = self.dates
+        ledger._codes[:self._size] = self.codes
+        ledger._amounts[:self._size] = self.amounts
+        ledger._size = self._size
+        return ledger
+
+    @property
+    def dates(self):
+        return self._dates[:self._size]
+
+    @property
+    def codes(self):
+        return self._codes[:self._size]
+
+    @property
+    def amounts(self):
+        return self._amounts[:self._size]
+
+    @property
+    def names(self):
+        return self.chart.names
+
+    def code(self, name):
+        """
+        Return the account code of a line-item name, registering it if new.
+        """
+        return self.chart.code(name, self.account_type)
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        capacity = len(self._amounts)
+        if needed <= capacity:
+            return
+        capacity = max(capacity, 1)
+        while capacity < needed:
+            capacity *= 2
+        for attr in ('_dates', '_codes', '_amounts'):
+            old = getattr(self, attr)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, attr, new)
+
+    def append(self, date, name, amount):
+        """
+        Append a single line item.
+        """
+        self._reserve(1)
+        i = self._size
+        self._dates[i] = np.datetime64(date, 'ns')
+        self._codes[i] = self.code(name)
+        self._amounts[i] = amount
+        self._size += 1
+        return self
+
+    def extend(self, dates, names, amounts):
+        """
+        Append a batch of line items.
+
+        Parameters:
+        - dates (array-like): Dates of the line items.
+        - names (str or array-like): One name for the whole batch, or one per item.
+        - amounts (float or array-like): One amount for the whole batch, or one per item.
+        """
+        dates = np.asarray(pd.to_datetime(dates), dtype='datetime64[ns]')
+        n = len(dates)
+        self._reserve(n)
+        if isinstance(names, str):
+            codes = self.code(names)
+        else:
+            codes = self.chart.codes(names, self.account_type)
+        start, stop = self._size, self._size + n
+        self._dates[start:stop] = dates
+        self._codes[start:stop] = codes
+        self._amounts[start:stop] = amounts
+        self._size = stop
+        return self
+
+    def to_frame(self, sort=True):
+        """
+        Materialize the ledger as a Date/Name/Amount DataFrame, sorted by date once.
+        'Name' is a categorical over the accounts that occur in it.
+        """
+        order = np.argsort(self.dates, kind='stable') if sort else slice(None)
+        return pd.DataFrame({
+            'Date': self.dates[order],
+            'Name': self.chart.categorical(self.codes[order]),
+            'Amount': self.amounts[order],
+        })
+
+    def monthly_totals(self, calendar):
+        """
+        (accounts x months) totals of the line items over a periods.Calendar.
+        """
+        return self.chart.monthly_totals(self.codes, calendar.offset(self.dates), self.amounts, len(calendar))
+
+
+def as_ledger(data, account_type='opex'):
+    """
+    Return `data` if it already is a Ledger, otherwise a new Ledger built from its rows,
+    registering names not in the chart as accounts of `account_type`.
+    """
+    return data if isinstance(data, Ledger) else Ledger.from_frame(data, account_type=account_type)
+
+
+def same_kind(data, ledger):
+    """
+    Hand a ledger back in the form the caller passed in: the Ledger itself,
+    or a sorted DataFrame if the caller passed a DataFrame.
+    """
+    return ledger if isinstance(data, Ledger) else ledger.to_frame()
+
+
+def append_item(data, date, name, amount):
+    """
+    Add one line item to a Ledger in place, or to a copy of a Date/Name/Amount DataFrame.
+
+    A DataFrame cannot grow in place, so its rows are copied once with the new item
+    inserted at its place in date order (after items of the same date, as to_frame()
+    sorts), instead of being re-coded and re-sorted through a Ledger on every call.
+    Loops that add many items should pass a Ledger.
+
+    Returns:
+    - Ledger or pd.DataFrame: `data` itself, or the new frame sorted by date.
+    """
+    if isinstance(data, Ledger):
+        return data.append(date, name, amount)
+    dates = data['Date'] if pd.api.types.is_datetime64_dtype(data['Date']) else pd.to_datetime(data['Date'])
+    dates = np.asarray(dates, dtype='datetime64[ns]')
+    names = np.asarray(data['Name'], dtype=object)
+    amounts = np.asarray(data['Amount'], dtype=np.float64)
+    if not (dates[1:] >= dates[:-1]).all():
+        order = np.argsort(dates, kind='stable')
+        dates, names, amounts = dates[order], names[order], amounts[order]
+    date = np.datetime64(pd.Timestamp(date), 'ns')
+    i = np.searchsorted(dates, date, side='right')
+    return pd.DataFrame({
+        'Date': np.insert(dates, i, date),
+        'Name': np.insert(names, i, name),
+        'Amount': np.insert(amounts, i, amount),
+    })
@@ -0,0 +1,580 @@
+import dataclasses
+import os
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from dateutil.relativedelta import relativedelta
+
+from accounts import CHART
+from events import Event, event_frame
+from expenses import (combine_expenses, debt_schedule, add_interest_payments, add_labor_costs_df, add_tax_and_royalty,
+                      add_asset_depreciation, TAX_RATE, ROYALTY_RATE)
+from labor import StaffingConfig, salary_payroll_tax
+from ledger import Ledger
+from periods import Calendar
+from pipeline import Pipeline, Stage
+from revenue import revenue_growth_df, combine_revenue, pad_revenues
+from schedules import AssetRegister
+from statements import Statements, build_statements, operating_cash_flow
+import monte_carlo
+
+# Chart name -> default output file, see render()
+CHARTS = {
+    'profit_loss': "Profit_Loss.png",
+    'profit_loss_students': "profit_loss_students.png",
+    'cashflow': "Cash_Flow.png",
+    'cashflow_students': "cashflow_students.png",
+}
+
+
+# Milestone -> (milestone it is relative to, offset); the defaults of Assumptions.resolved(),
+# in resolution order
+TIMELINE = {
+    'sign_lease': ('fran_start_date', relativedelta(months=2)),
+    'buildout_complete': ('sign_lease', relativedelta(weeks=10)),
+    'grand_opening': ('buildout_complete', relativedelta(weeks=3)),
+    'training_start': ('fran_start_date', relativedelta()),
+    'training_complete': ('training_start', relativedelta(weeks=8)),
+    'director_hired': ('grand_opening', relativedelta(weeks=-8)),
+    'staff_hiring_start': ('grand_opening', relativedelta(weeks=-6)),
+}
+# Calendar months with a summer camp, see default_unique_revenue()
+CAMP_MONTHS = (6, 8)
+# Share of max_students enrollment levels off at, unless ss_student_count is given
+STEADY_STATE_SHARE = 0.8
+
+
+@dataclass
+class Assumptions:
+    """
+    Every constant the model depends on. Defaults reproduce the README assumptions.
+
+    Timeline milestones, ss_student_count and line-item lists left as None are derived
+    from the other fields when the model runs (see resolved()), so e.g. changing
+    fran_start_date moves the whole timeline, changing max_students the steady-state
+    enrollment and changing sq_ft every rent line item.
+    """
+    # Timeline Definition
+    fran_start_date: datetime = datetime(2024, 1, 15)
+    sign_lease: datetime = None          # FRAN_START_DATE + 2 months
+    buildout_complete: datetime = None   # SIGN_LEASE + 10 weeks
+    grand_opening: datetime = None       # BUILDOUT_COMPLETE + 3 weeks
+    training_start: datetime = None      # FRAN_START_DATE
+    training_complete: datetime = None   # TRAINING_START + 8 weeks
+    director_hired: datetime = None      # GRAND_OPENING - 8 weeks
+    staff_hiring_start: datetime = None  # GRAND_OPENING - 6 weeks
+    period_end: datetime = datetime(2026, 12, 31)
+
+    # Revenue Variables
+    go_student_count: int = 50
+    growth_rate: float = 0.1  # 10% is a guess
+    ss_student_count: int = None  # steady-state cap; None -> STEADY_STATE_SHARE of max_students
+    max_students: int = 480
+    monthly_student_price: float = 225  # Dollars, 2x classes per week
+    camp_revenue: float = 300 * 15  # 15 kids at $300 # FIXME
+    birthday_parties: int = 5  # on average, between the grand opening and the period end
+    birthday_party_value: float = 300  # $300 for a party?  FIXME
+
+    # Expense Variables
+    sq_ft: int = 1500
+    lease_rate: float = 28  # yearly, per sq ft
+    nnn_rate: float = 10  # yearly, per sq ft
+    dir_salary: float = 65000 / 12  # FIXME
+    hourly_rate: float = 30
+    staffing: StaffingConfig = None  # None -> StaffingConfig() defaults
+    interest_rate: float = 9
+    interest_rate_schedule: dict = None  # {date: annual %} variable rate, overrides interest_rate
+    amortization_months: int = None  # None -> interest-only HELOC
+    heloc_draws: bool = False  # draw the HELOC only when cash runs out instead of up front
+    inst_comp_cost: float = 17500
+    useful_life: int = 36  # 36 Months, 3 years; of assets that do not set their own
+    tax_rate: float = TAX_RATE
+    tax_rate_schedule: dict = None  # {date: rate} from the month of each date on, overrides tax_rate
+    royalty_rate: float = ROYALTY_RATE
+    royalty_rate_schedule: dict = None  # {date: rate}, overrides royalty_rate
+
+    # CASHFLOW
+    starting_liquid: float = 50000
+    starting_heloc: float = 115000
+
+    # Line items as lists of {'Date', 'Name', 'Amount'} dicts (recurring items have no Date)
+    recurring_expenses: list = None
+    unique_expenses: list = None
+    unique_revenue: list = None
+    # Depreciable assets as {'Date', 'Name', 'Amount'} dicts with optional 'Useful_Life', 'Method',
+    # 'Salvage', 'Factor' and 'Group', see schedules.AssetRegister; None -> the capex line items,
+    # in service from the grand opening
+    assets: list = None
+    # Random recurring revenue, see events.Event; None -> Poisson-distributed birthday parties
+    events: list = None
+    seed: int = 0  # seed of the event draws
+    @property
+    def lease(self):
+        return self.lease_rate * self.sq_ft
+
+    @property
+    def nnn(self):
+        return self.nnn_rate * self.sq_ft
+
+    @property
+    def rent(self):
+        return (self.lease + self.nnn) / 12
+
+    @property
+    def starting_cash(self):
+        return self.starting_liquid + self.starting_heloc
+
+    @property
+    def capital_cost(self):
+        """
+        Unique expenses booked to capex accounts (see accounts.py), which are capitalized
+        and, unless assets says otherwise, depreciated over useful_life. Requires resolved
+        assumptions.
+        """
+        return sum(e['Amount'] for e in self.unique_expenses if CHART.type_of(e['Name']) == 'capex')
+
+    @property
+    def recurring_line_items(self):
+        """
+        The recurring expenses plus the employer payroll tax on their salary lines, as
+        every engine books them. Requires resolved assumptions.
+        """
+        payroll_tax = salary_payroll_tax(self.recurring_expenses, self.staffing)
+        if not payroll_tax:
+            return list(self.recurring_expenses)
+        return [*self.recurring_expenses, {'Name': 'Payroll Tax', 'Amount': payroll_tax}]
+
+    @property
+    def tax_rates(self):
+        # Rate table for schedules.rate_table()
+        return self.tax_rate if self.tax_rate_schedule is None else self.tax_rate_schedule
+
+    @property
+    def royalty_rates(self):
+        return self.royalty_rate if self.royalty_rate_schedule is None else self.royalty_rate_schedule
+
+    @property
+    def asset_register(self):
+        """
+        The assets as a schedules.AssetRegister. Requires resolved assumptions.
+
+        Raises:
+        - ValueError: If the assets do not add up to the capex line items name by name.
+          Fixed Assets on the balance sheet are the capex outlays while depreciation comes
+          from the register, so the two must describe the same purchases.
+        """
+        register = AssetRegister.from_records(self.assets, useful_life=self.useful_life)
+        capex = {}
+        for e in self.unique_expenses:
+            if CHART.type_of(e['Name']) == 'capex':
+                capex[e['Name']] = capex.get(e['Name'], 0) + e['Amount']
+        assets = pd.Series(register.cost, index=register.names, dtype=float).groupby(level=0).sum()
+        outlays = pd.Series(capex, dtype=float)
+        assets, outlays = assets.align(outlays, fill_value=0.0)
+        mismatched = ~np.isclose(assets, outlays)
+        if mismatched.any():
+            raise ValueError("Assets do not match the capex line items: " + ', '.join(
+                f"{name} (assets {assets[name]:,.2f}, capex {outlays[name]:,.2f})" for name in assets.index[mismatched]))
+        return register
+
+    def replace(self, **changes):
+        """
+        Return a copy with the given fields changed.
+        """
+        return dataclasses.replace(self, **changes)
+
+    @classmethod
+    def from_dict(cls, values):
+        """
+        Build Assumptions from a mapping of field names (e.g. a row of a sites table).
+        Missing or NaN values keep their defaults; dates may be strings or Timestamps.
+
+        Raises:
+        - ValueError: If a key is not an Assumptions field.
+        """
+        fields = {f.name: f for f in dataclasses.fields(cls)}
+        unknown = set(values) - set(fields)
+        if unknown:
+            raise ValueError(f"Unknown assumptions: {', '.join(sorted(unknown))}")
+
+        kwargs = {}
+        for name, value in values.items():
+            if name == 'events' and isinstance(value, list):
+                value = [Event(**e) if isinstance(e, dict) else e for e in value]
+            if isinstance(value, list):
+                kwargs[name] = value
+                continue
+            if name == 'staffing' and isinstance(value, dict):
+                value = StaffingConfig(**value)
+            if isinstance(value, (dict, StaffingConfig)):
+                kwargs[name] = value
+                continue
+            if value is None or pd.isna(value):
+                continue
+            if fields[name].type is datetime:
+                value = pd.Timestamp(value).to_pydatetime()
+            kwargs[name] = value
+        return cls(**kwargs)
+
+    def resolved(self):
+        """
+        Return a copy with every derived milestone and line-item list filled in.
+        """
+        a = dataclasses.replace(self)
+        for name, (base, offset) in TIMELINE.items():
+            if getattr(a, name) is None:
+                setattr(a, name, getattr(a, base) + offset)
+        if a.ss_student_count is None:
+            a.ss_student_count = round(a.max_students * STEADY_STATE_SHARE)
+        if a.recurring_expenses is None:
+            a.recurring_expenses = default_recurring_expenses(a)
+        if a.unique_expenses is None:
+            a.unique_expenses = default_unique_expenses(a)
+        if a.unique_revenue is None:
+            a.unique_revenue = default_unique_revenue(a)
+        if a.events is None:
+            a.events = default_events(a)
+        if a.assets is None:
+            a.assets = default_assets(a)
+        return a
+
+
+def default_recurring_expenses(a):
+    return [
+        {'Name': 'Rent'            , 'Amount': a.rent},
+        {'Name': 'Utilities'       , 'Amount': 150},  # FIXME
+        {'Name': 'Internet'        , 'Amount': 150},  # FIXME
+        {'Name': 'Director Salary' , 'Amount': a.dir_salary},
+        {'Name': 'Coach Labor'     , 'Amount': a.dir_salary}, # FIXME
+    ]
+
+
+def default_unique_expenses(a):
+    return [
+        {'Date': a.fran_start_date - timedelta(weeks=2) , 'Name': 'CPA Fees'                          , 'Amount':              500 },
+        {'Date': a.fran_start_date - timedelta(weeks=1) , 'Name': 'LLC Fees'                          , 'Amount':              500 },
+        {'Date': a.fran_start_date                      , 'Name': 'Franchise Fee'                     , 'Amount':             4500 },
+        {'Date': a.training_start                       , 'Name': 'Training Travel Expenses'          , 'Amount':             3000 },
+        {'Date': a.sign_lease                           , 'Name': 'First Month Rent'                  , 'Amount':           a.rent },
+        {'Date': a.sign_lease                           , 'Name': 'Security Deposit'                  , 'Amount':             5000 },
+        {'Date': a.sign_lease                           , 'Name': 'Utility Deposit'                   , 'Amount':              800 },
+        {'Date': a.sign_lease + timedelta(weeks=1)      , 'Name': 'Furniture & Equipment (partial)'   , 'Amount':            15000 },
+        {'Date': a.sign_lease + timedelta(weeks=2)      , 'Name': 'Furniture & Equipment (partial)'   , 'Amount':            15000 },
+        {'Date': a.sign_lease + timedelta(weeks=2)      , 'Name': 'Computer Equipment (admin)'        , 'Amount':             1500 },
+        {'Date': a.sign_lease + timedelta(weeks=2)      , 'Name': 'Computer Equipment (instructional)', 'Amount': a.inst_comp_cost },
+        {'Date': a.grand_opening - timedelta(weeks=4)   , 'Name': 'Initial Marketing Expense'         , 'Amount':            12500 },
+        {'Date': a.grand_opening - timedelta(weeks=2)   , 'Name': 'Signage'                           , 'Amount':            12500 },
+        {'Date': a.grand_opening - timedelta(weeks=1)   , 'Name': 'Insurance Deposit'                 , 'Amount':             1500 },
+        {'Date': a.grand_opening - timedelta(weeks=1)   , 'Name': 'Licensing'                         , 'Amount':             1500 },
+        {'Date': a.grand_opening                        , 'Name': 'Grand Opening Support'             , 'Amount':            12500 },
+    ]
+
+
+def default_unique_revenue(a):
+    # A summer camp on the 1st of each CAMP_MONTHS month between the grand opening and the
+    # period end, laid out like the events
+    camps = Event('Summer Camp', amount=a.camp_revenue, rate=1, months=CAMP_MONTHS, day=1, poisson=False)
+    return [{'Date': row.Date.to_pydatetime(), 'Name': row.Name, 'Amount': row.Amount}
+            for row in event_frame([camps], a.grand_opening, a.period_end).itertuples()]
+
+
+def default_events(a):
+    # birthday_parties over the whole horizon on average, so the monthly rate is spread over its months
+    months = (a.period_end - a.grand_opening).days / (365.25 / 12)
+    return [
+        Event('Birthday Party', amount=a.birthday_party_value, rate=a.birthday_parties / months if months > 0 else 0),
+    ]
+
+
+def default_assets(a):
+    # Capex is capitalized and depreciated from the grand opening, over useful_life
+    return [{'Date': a.grand_opening, 'Name': e['Name'], 'Amount': e['Amount']}
+            for e in a.unique_expenses if CHART.type_of(e['Name']) == 'capex']
+
+
+@dataclass
+class ModelResult:
+    """
+    Frames produced by FinancialModel.run().
+
+    base_expenses_df holds the startup and recurring expenses financed by the HELOC;
+    operating_expenses_df adds labor, tax/royalty and depreciation, and all_expenses_df
+    adds interest on top. debt_schedule_df is the month-end HELOC balance and accrued
+    interest, see expenses.debt_schedule(). calendar holds the months every stage indexes
+    into, see periods.Calendar. statements holds the income statement, balance sheet and
+    cashflow statement, see statements.build_statements(); profit_loss_df is its net income.
+    """
+    calendar: Calendar
+    base_expenses_df: pd.DataFrame
+    operating_expenses_df: pd.DataFrame
+    debt_schedule_df: pd.DataFrame
+    all_expenses_df: pd.DataFrame
+    all_revenue_df: pd.DataFrame
+    recurring_revenue_df: pd.DataFrame
+    students_df: pd.DataFrame
+    statements: Statements
+    profit_loss_df: pd.DataFrame
+    cashflow_df: pd.DataFrame
+
+    @property
+    def income_statement_df(self):
+        return self.statements.income_statement
+
+    @property
+    def balance_sheet_df(self):
+        return self.statements.balance_sheet
+
+    @property
+    def cashflow_statement_df(self):
+        return self.statements.cashflow_statement
+
+
+class FinancialModel:
+    """
+    Side-effect-free evaluation of one scenario.
+
+    Usage:
+        result = FinancialModel(Assumptions(growth_rate=0.08)).run()
+        render(result)  # optional, writes the PNG charts
+
+    Pass a pipeline.StageCache shared between models to recompute only the stages
+    downstream of the assumptions that changed. Frames in a cached result are shared
+    with the cache and must be copied before being modified.
+    """
+
+    def __init__(self, assumptions=None, cache=None):
+        self.assumptions = (assumptions or Assumptions()).resolved()
+        self.cache = cache
+
+    def run(self, computed=None):
+        """
+        Build the expense and revenue ledgers, then the profit/loss and cashflow frames.
+
+        Parameters:
+        - computed (list, optional): Receives the names of the stages that were recomputed.
+
+        Returns:
+        - ModelResult: All intermediate and final frames of the run.
+        """
+        # Line items not in the chart are accounts of this run only
+        with CHART.scoped():
+            return ModelResult(**PIPELINE.run(self.assumptions, self.cache, computed))
+
+    def scenario_inputs(self):
+        """
+        Scenario-independent inputs for monte_carlo.simulate(), built from these assumptions.
+        """
+        a = self.assumptions
+        # Only the rent priced from sq_ft follows it; a rent line given explicitly stays as given
+        rent_names = tuple({e['Name'] for e in a.recurring_expenses + a.unique_expenses
+                            if e['Name'] in monte_carlo.RENT_NAMES and np.isclose(e['Amount'], a.rent)})
+        with CHART.scoped():
+            return monte_carlo.build_inputs(
+                pd.DataFrame(a.recurring_line_items), pd.DataFrame(a.unique_expenses), pd.DataFrame(a.unique_revenue),
+                a.grand_opening, a.period_end, a.go_student_count, a.ss_student_count,
+                a.asset_register, a.starting_cash,
+                rent_per_sq_ft=(a.lease_rate + a.nnn_rate) / 12, rent_names=rent_names, staffing=a.staffing,
+                events=a.events, seed=a.seed,
+                tax_rate=a.tax_rates, royalty_rate=a.royalty_rates, heloc_limit=a.starting_heloc)
+
+
+#######################################
+##           S T A G E S             ##
+#######################################
+def build_calendar(a):
+    # Every month from the first dated line item or the grand opening to the period end
+    dates = [row['Date'] for row in a.unique_expenses + a.unique_revenue]
+    return Calendar.covering(a.grand_opening, a.period_end, *dates)
+
+
+def build_base_expenses(a, calendar):
+    # Add recurring, monthly operating expenses to unique startup expenses
+    all_expenses_df = combine_expenses(pd.DataFrame(a.recurring_line_items), pd.DataFrame(a.unique_expenses),
+                                       a.grand_opening, a.period_end, calendar)
+    return all_expenses_df[['Date', 'Name', 'Amount']]
+
+
+def build_recurring_revenue(a, calendar):
+    # Model revenue growth through enrollment growth
+    return revenue_growth_df(a.go_student_count, a.monthly_student_price, a.growth_rate, a.ss_student_count,
+                             a.grand_opening, a.period_end, calendar)
+
+
+def build_revenue(a, base_expenses_df, recurring_revenue_df):
+    # Listed revenue plus the seeded random events (birthday parties)
+    unique_revenue_df = pd.concat([pd.DataFrame(a.unique_revenue, columns=['Date', 'Name', 'Amount']),
+                                   event_frame(a.events, a.grand_opening, a.period_end, a.seed)], ignore_index=True)
+
+    # Combine with unique revenue occurances
+    all_revenue_df = combine_revenue(recurring_revenue_df, unique_revenue_df)
+    # Fill with leading zeros before we start making money
+    all_revenue_df = pad_revenues(base_expenses_df, all_revenue_df)
+    return all_revenue_df[['Date', 'Name', 'Amount']]
+
+
+def build_operating_expenses(a, calendar, base_expenses_df, recurring_revenue_df):
+    # Add more expenses now that we have some revenue information, appending to one
+    # ledger and sorting only when it is materialized
+    ledger = Ledger.from_frame(base_expenses_df)
+    add_labor_costs_df(ledger, recurring_revenue_df, a.hourly_rate, a.staffing)
+    add_tax_and_royalty(ledger, recurring_revenue_df, a.tax_rates, a.royalty_rates, calendar)
+    # Capex is capitalized and depreciated over each asset's life
+    add_asset_depreciation(ledger, a.asset_register, calendar, a.period_end)
+    return ledger.to_frame()
+
+
+def build_debt_schedule(a, calendar, base_expenses_df, all_revenue_df, operating_expenses_df):
+    rate = a.interest_rate if a.interest_rate_schedule is None else pd.Series(a.interest_rate_schedule)
+    if not a.heloc_draws:
+        # The HELOC finances the startup and recurring expenses, up to the credit line
+        return debt_schedule(base_expenses_df, rate, a.amortization_months, calendar=calendar, limit=a.starting_heloc)
+
+    # Draw on the HELOC only when the cash flow (depreciation excluded) runs the liquid cash out
+    cash_flows = pd.Series(operating_cash_flow(all_revenue_df, operating_expenses_df, calendar),
+                           index=calendar.month_ends)
+    return debt_schedule(operating_expenses_df, rate, cash_flows=cash_flows, starting_cash=a.starting_liquid,
+                         calendar=calendar, limit=a.starting_heloc)
+
+
+def build_interest(operating_expenses_df, debt_schedule_df):
+    # Account for interest payments toward the HELOC
+    return add_interest_payments(operating_expenses_df, None, schedule=debt_schedule_df)
+
+
+def build_profit_loss(statements):
+    # Profit-loss is the net income: capex is capitalized, depreciation is expensed
+    return pd.DataFrame({
+        'Period': statements.income_statement['Period'],
+        'Profit Loss': statements.income_statement['Net Income'],
+    })
+
+
+def build_students(calendar, recurring_revenue_df, profit_loss_df):
+    # Extract student count curve from revenue growth df
+    students_df = pd.DataFrame({
+        'Period': calendar.labels[calendar.offset(recurring_revenue_df['Date'])],
+        'Student_Count': recurring_revenue_df['Student_Count'],
+    })
+
+    # Pad with zero students for the months before the grand opening
+    length_diff = len(profit_loss_df) - len(students_df)
+    if length_diff > 0:
+        filler_df = pd.DataFrame({
+            'Period': profit_loss_df['Period'].head(length_diff).values,
+            'Student_Count': [0] * length_diff
+        })
+        students_df = pd.concat([filler_df, students_df], axis=0)
+    return students_df.reset_index(drop=True)
+
+
+def build_cashflow(a, statements):
+    # Balance sheet cash: the liquid cash plus the cash flows and whatever has been drawn
+    balance_sheet = statements.balance_sheet
+    cash_on_hand = balance_sheet['Cash']
+    if not a.heloc_draws:
+        # The whole HELOC is available up front, so the undrawn part counts as cash on hand
+        cash_on_hand = cash_on_hand + a.starting_heloc - balance_sheet['HELOC Balance']
+    return pd.DataFrame({
+        'Period': balance_sheet['Period'],
+        'Cash On Hand': cash_on_hand,
+    })
+
+
+# Stage outputs are named after the ModelResult fields they fill
+PIPELINE = Pipeline([
+    Stage('calendar', build_calendar,
+          fields=('unique_expenses', 'unique_revenue', 'grand_opening', 'period_end')),
+    Stage('base_expenses_df', build_base_expenses,
+          fields=('recurring_expenses', 'staffing', 'unique_expenses', 'grand_opening', 'period_end'),
+          deps=('calendar',)),
+    Stage('recurring_revenue_df', build_recurring_revenue,
+          fields=('go_student_count', 'monthly_student_price', 'growth_rate', 'ss_student_count', 'grand_opening', 'period_end'),
+          deps=('calendar',)),
+    Stage('all_revenue_df', build_revenue,
+          fields=('unique_revenue', 'events', 'seed', 'grand_opening', 'period_end'),
+          deps=('base_expenses_df', 'recurring_revenue_df')),
+    Stage('operating_expenses_df', build_operating_expenses,
+          fields=('hourly_rate', 'staffing', 'useful_life', 'assets', 'period_end',
+                  'tax_rate', 'tax_rate_schedule', 'royalty_rate', 'royalty_rate_schedule'),
+          deps=('calendar', 'base_expenses_df', 'recurring_revenue_df')),
+    Stage('debt_schedule_df', build_debt_schedule,
+          fields=('interest_rate', 'interest_rate_schedule', 'amortization_months', 'heloc_draws', 'starting_liquid',
+                  'starting_heloc'),
+          deps=('calendar', 'base_expenses_df', 'all_revenue_df', 'operating_expenses_df')),
+    Stage('all_expenses_df', lambda a, operating_expenses_df, debt_schedule_df: build_interest(operating_expenses_df, debt_schedule_df),
+          deps=('operating_expenses_df', 'debt_schedule_df')),
+    Stage('statements', lambda a, all_revenue_df, all_expenses_df, debt_schedule_df, calendar: build_statements(all_revenue_df, all_expenses_df, debt_schedule_df, calendar, a.starting_liquid),
+          fields=('starting_liquid',),
+          deps=('all_revenue_df', 'all_expenses_df', 'debt_schedule_df', 'calendar')),
+    Stage('profit_loss_df', lambda a, statements: build_profit_loss(statements),
+          deps=('statements',)),
+    Stage('students_df', lambda a, calendar, recurring_revenue_df, profit_loss_df: build_students(calendar, recurring_revenue_df, profit_loss_df),
+          deps=('calendar', 'recurring_revenue_df', 'profit_loss_df')),
+    Stage('cashflow_df', build_cashflow,
+          fields=('starting_heloc', 'heloc_draws'),
+          deps=('statements',)),
+])
+
+
+def chart_files(output_dir=".", charts=None, fmt="png"):
+    """
+    Output path of each requested chart, with the extension matching `fmt`.
+    """
+    return {name: os.path.join(output_dir, os.path.splitext(CHARTS[name])[0] + '.' + fmt)
+            for name in (CHARTS if charts is None else charts)}
+
+
+def render(result, output_dir=".", charts=None, dpi=300, fmt="png", renderer=None):
+    """
+    Write the charts for a ModelResult. Matplotlib is only imported here.
+
+    Parameters:
+    - result (ModelResult): Output of FinancialModel.run().
+    - output_dir (str): Directory the charts are written to.
+    - charts (iterable, optional): Subset of CHARTS keys to render; all by default,
+      none if empty.
+    - dpi (int): Resolution of raster output.
+    - fmt (str): Output format, e.g. 'png' or 'svg'.
+    - renderer (visualize.ChartRenderer, optional): Renderer to reuse across calls;
+      overrides dpi and fmt.
+
+    Returns:
+    - list: Paths of the written files.
+    """
+    files = chart_files(output_dir, charts, fmt)
+    if not files:
+        return []
+
+    import visualize
+
+    if renderer is None:
+        renderer = visualize.ChartRenderer(dpi=dpi, fmt=fmt)
+    return visualize.render_charts(renderer, files, result.profit_loss_df, result.cashflow_df, result.students_df)
+
+
+def render_batch(results, output_dir=".", charts=None, dpi=300, fmt="png", max_workers=None):
+    """
+    Write the charts for many ModelResults across a process pool.
+
+    Parameters:
+    - results (dict): Scenario name -> ModelResult. Each scenario's charts go to
+      output_dir/<name>/.
+    - output_dir, charts, dpi, fmt: See render().
+    - max_workers (int, optional): Worker processes; 1 renders in-process.
+
+    Returns:
+    - dict: Scenario name -> list of written paths.
+    """
+    if charts is not None and not charts:
+        return {name: [] for name in results}
+
+    import visualize
+
+    jobs = []
+    for name, result in results.items():
+        scenario_dir = os.path.join(output_dir, str(name))
+        os.makedirs(scenario_dir, exist_ok=True)
+        jobs.append((chart_files(scenario_dir, charts, fmt), result.profit_loss_df, result.cashflow_df, result.students_df))
+    paths = visualize.render_batch(jobs, dpi=dpi, fmt=fmt, max_workers=max_workers)
+    return dict(zip(results, paths))
@@ -0,0 +1,328 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+from accounts import ACCOUNT_TYPES, CHART
+from events import event_revenue
+from expenses import combine_expenses, TAX_RATE, ROYALTY_RATE
+from labor import StaffingConfig, labor_costs
+from periods import Calendar
+from schedules import AssetRegister, monthly_depreciation, rate_table, tax_and_royalty
+
+# Assumptions that can vary per scenario in simulate()
+SCENARIO_PARAMS = ('growth_rate', 'monthly_student_price', 'hourly_rate', 'interest_rate', 'sq_ft', 'starting_cash')
+# Line items that are rent, see build_inputs()
+RENT_NAMES = ('Rent', 'First Month Rent')
+
+
+@dataclass
+class ScenarioInputs:
+    """
+    Scenario-independent inputs to the vectorized engine, laid out on a monthly grid.
+
+    Attributes:
+    - months (pd.DatetimeIndex): Month-end dates covered by the model.
+    - fixed_expenses (np.ndarray): Recurring + unique expenses per month, all financed by
+      the HELOC.
+    - capital_outlays (np.ndarray): The capex and deposit part of fixed_expenses per month,
+      which is capitalized instead of expensed.
+    - other_revenue (np.ndarray): Unique revenue (camps) per month.
+    - depreciation (np.ndarray): Depreciation expense per month.
+    - open_offset (int): Index of the grand opening month in `months`.
+    - initial_students (float): Student count in the grand opening month.
+    - max_students (float): Cap on the student count.
+    - starting_cash (float): Cash on hand before the first month.
+    - rent_expenses (np.ndarray): The rent part of fixed_expenses per month.
+    - rent_months (np.ndarray): Number of rent charges per month.
+    - rent_per_sq_ft (float, optional): Monthly rent per square foot; required to vary sq_ft.
+    - staffing (StaffingConfig, optional): Staffing constants for the labor engine.
+    - event_revenue (np.ndarray, optional): Revenue of the random events (birthday parties)
+      per month, as drawn for the base case; simulate() can replace it per scenario.
+    - tax_rates (np.ndarray, optional): Tax rate per month; TAX_RATE when None.
+    - royalty_rates (np.ndarray, optional): Royalty rate per month; ROYALTY_RATE when None.
+    - heloc_limit (float): Credit line; interest accrues on at most this much of the
+      financed expenses.
+    """
+    months: pd.DatetimeIndex
+    fixed_expenses: np.ndarray
+    other_revenue: np.ndarray
+    depreciation: np.ndarray
+    open_offset: int
+    initial_students: float
+    max_students: float
+    starting_cash: float
+    rent_expenses: np.ndarray = None
+    rent_months: np.ndarray = None
+    rent_per_sq_ft: float = None
+    staffing: StaffingConfig = None
+    capital_outlays: np.ndarray = None
+    event_revenue: np.ndarray = None
+    tax_rates: np.ndarray = None
+    royalty_rates: np.ndarray = None
+    heloc_limit: float = np.inf
+
+
+def month_grid(start_date, end_date):
+    """
+    Month-end dates for every calendar month touched by [start_date, end_date].
+    """
+    return pd.period_range(start_date, end_date, freq='M').to_timestamp(how='end').normalize()
+
+
+def monthly_amounts(df, months):
+    """
+    Sum the 'Amount' column of a Date/Name/Amount frame into the given monthly grid.
+    Rows falling outside the grid are dropped.
+
+    Parameters:
+    - df (pd.DataFrame): Ledger with 'Date' and 'Amount' columns.
+    - months (pd.DatetimeIndex): Month-end grid, as returned by month_grid().
+
+    Returns:
+    - np.ndarray: Amount per month, aligned with `months`.
+    """
+    if df is None or len(df) == 0:
+        return np.zeros(len(months))
+    dates = pd.to_datetime(df['Date'])
+    offsets = (dates.dt.year.values * 12 + dates.dt.month.values) - (months[0].year * 12 + months[0].month)
+    inside = (offsets >= 0) & (offsets < len(months))
+    return np.bincount(offsets[inside], weights=df['Amount'].values[inside].astype(float), minlength=len(months))
+
+
+def build_inputs(recurring_expenses_df, unique_expenses_df, unique_revenue_df, grand_opening, period_end,
+                 initial_students, max_students, assets, starting_cash,
+                 rent_per_sq_ft=None, rent_names=RENT_NAMES, staffing=None, events=(), seed=None,
+                 tax_rate=TAX_RATE, royalty_rate=ROYALTY_RATE, heloc_limit=np.inf):
+    """
+    Lay out everything that does not change between scenarios on a monthly grid, once.
+
+    Parameters:
+    - recurring_expenses_df (DataFrame): Name/Amount of the monthly operating expenses.
+    - unique_expenses_df (DataFrame): Date/Name/Amount of one-off expenses.
+    - unique_revenue_df (DataFrame): Date/Name/Amount of one-off revenue.
+    - grand_opening (datetime): First month of recurring expenses and enrollment revenue.
+    - period_end (datetime): Last day of the model.
+    - initial_students (int): Grand opening student count.
+    - max_students (int): Cap on the student count.
+    - assets (schedules.AssetRegister or list): Depreciable assets, or their register rows,
+      see Assumptions.assets.
+    - starting_cash (float): Cash on hand before the first month.
+    - rent_per_sq_ft (float, optional): Monthly rent per square foot, so simulate() can vary sq_ft.
+    - rent_names (tuple): Line items that are rent and scale with sq_ft; the others are
+      fixed whatever sq_ft simulate() is given.
+    - staffing (StaffingConfig, optional): Staffing constants for the labor engine.
+    - events (list): events.Event entries between the grand opening and period_end.
+    - seed (int, optional): Seed of the event draw; scenario 0 of it is the base case,
+      the same draw FinancialModel makes.
+    - tax_rate, royalty_rate (float, dict or pd.Series): Fixed rates or {date: rate}
+      tables, see schedules.rate_table().
+    - heloc_limit (float): Credit line financing the fixed expenses; unlimited by default.
+
+    Returns:
+    - ScenarioInputs: Inputs for simulate().
+    """
+    calendar = Calendar.covering(grand_opening, period_end, unique_expenses_df['Date'])
+    expenses = combine_expenses(recurring_expenses_df, unique_expenses_df, grand_opening, period_end, calendar)
+    months = calendar.month_ends
+    open_offset = calendar.offset_of(grand_opening)
+
+    if not isinstance(assets, AssetRegister):
+        assets = AssetRegister.from_records(assets)
+    depreciation = monthly_depreciation(assets, calendar, period_end)
+
+    rent = expenses[expenses['Name'].isin(rent_names)]
+    codes = CHART.codes(expenses['Name'])  # registers new names before the types are looked up
+    types = CHART.type_codes[codes]
+    capital = expenses[np.isin(types, [ACCOUNT_TYPES.index('capex'), ACCOUNT_TYPES.index('deposit')])]
+
+    return ScenarioInputs(
+        months=months,
+        fixed_expenses=monthly_amounts(expenses, months),
+        other_revenue=monthly_amounts(unique_revenue_df, months),
+        depreciation=depreciation,
+        open_offset=open_offset,
+        initial_students=initial_students,
+        max_students=max_students,
+        starting_cash=starting_cash,
+        rent_expenses=monthly_amounts(rent, months),
+        rent_months=monthly_amounts(rent.assign(Amount=1.0), months),
+        rent_per_sq_ft=rent_per_sq_ft,
+        staffing=staffing,
+        capital_outlays=monthly_amounts(capital, months),
+        event_revenue=event_revenue(events, grand_opening, period_end, calendar, seed=seed)[0],
+        tax_rates=rate_table(tax_rate, calendar),
+        royalty_rates=rate_table(royalty_rate, calendar),
+        heloc_limit=heloc_limit,
+    )
+
+
+def _column(value):
+    return np.atleast_1d(np.asarray(value, dtype=float))[:, None]
+
+
+def simulate(inputs, growth_rate, monthly_student_price, hourly_rate, interest_rate, sq_ft=None, students=None,
+             starting_cash=None, event_revenue=None, heloc_limit=None):
+    """
+    Evaluate every scenario in one vectorized pass.
+
+    Each parameter is a scalar or a 1-D array; they are broadcast against each other
+    to give n_scenarios rows. All outputs are (n_scenarios x n_months) matrices.
+
+    Interest is charged monthly on the cumulative fixed expenses through the previous month,
+    up to the credit line; expenses beyond it are paid from cash.
+    Capital outlays are capitalized rather than expensed, and depreciation is expensed but
+    not paid, so cash on hand moves by profit_loss + depreciation - capital outlays.
+
+    Parameters:
+    - inputs (ScenarioInputs): Scenario-independent inputs from build_inputs().
+    - growth_rate (float or array): Month-to-month enrollment growth rate.
+    - monthly_student_price (float or array): Revenue per student per month.
+    - hourly_rate (float or array): Hourly rate of each teacher.
+    - interest_rate (float or array): Annual interest rate in percentage (e.g., 9 for 9%).
+    - sq_ft (float or array, optional): Facility size; rescales the rent line items named
+      in build_inputs(). The rent in inputs is used when omitted.
+    - students (np.ndarray, optional): (n_scenarios x n_months) student counts, e.g. from
+      enrollment.simulate_enrollment(). Replaces the compound growth curve, so growth_rate
+      is ignored.
+    - starting_cash (float or array, optional): Cash on hand before the first month; the
+      value in inputs is used when omitted.
+    - event_revenue (np.ndarray, optional): (n_scenarios x n_months) random event revenue,
+      e.g. from events.event_revenue(); the base-case draw in inputs is used when omitted.
+    - heloc_limit (float or array, optional): Credit line; the value in inputs is used
+      when omitted. It does not change starting_cash.
+
+    Returns:
+    - dict: Matrices keyed by 'students', 'revenue', 'labor', 'tax', 'royalty', 'interest',
+      'depreciation', 'expenses', 'profit_loss' and 'cash'.
+    """
+    growth_rate, monthly_student_price, hourly_rate, interest_rate, sq_ft_column = np.broadcast_arrays(
+        _column(growth_rate), _column(monthly_student_price), _column(hourly_rate), _column(interest_rate),
+        _column(np.nan if sq_ft is None else sq_ft))
+    n_months = len(inputs.months)
+
+    fixed_expenses = inputs.fixed_expenses
+    if sq_ft is not None:
+        if inputs.rent_per_sq_ft is None:
+            raise ValueError("inputs were built without rent_per_sq_ft, so sq_ft cannot vary")
+        fixed_expenses = (inputs.fixed_expenses - inputs.rent_expenses
+                          + sq_ft_column * inputs.rent_per_sq_ft * inputs.rent_months)
+
+    if students is None:
+        # Compound growth capped at max_students, zero before the grand opening
+        elapsed = np.arange(n_months) - inputs.open_offset
+        students = np.minimum(inputs.initial_students * (1 + growth_rate) ** np.maximum(elapsed, 0), inputs.max_students)
+        students[:, elapsed == 0] = inputs.initial_students
+        students[:, elapsed < 0] = 0
+    else:
+        students = np.asarray(students, dtype=float)
+        students = np.broadcast_to(students, np.broadcast_shapes(students.shape, (len(growth_rate), n_months)))
+
+    enrollment_revenue = students * monthly_student_price
+    labor = labor_costs(students, hourly_rate, inputs.staffing).total
+    tax, royalty = tax_and_royalty(enrollment_revenue,
+                                   TAX_RATE if inputs.tax_rates is None else inputs.tax_rates,
+                                   ROYALTY_RATE if inputs.royalty_rates is None else inputs.royalty_rates)
+
+    # Interest on the debt accrued through last month
+    accrued_debt = np.zeros(np.shape(fixed_expenses))
+    accrued_debt[..., 1:] = np.cumsum(fixed_expenses, axis=-1)[..., :-1]
+    accrued_debt = np.minimum(accrued_debt, inputs.heloc_limit if heloc_limit is None else _column(heloc_limit))
+    interest = accrued_debt * (interest_rate / 100) / 12
+
+    capital_outlays = np.zeros(n_months) if inputs.capital_outlays is None else inputs.capital_outlays
+    if event_revenue is None:
+        event_revenue = np.zeros(n_months) if inputs.event_revenue is None else inputs.event_revenue
+    revenue = enrollment_revenue + inputs.other_revenue + event_revenue
+    expenses = fixed_expenses - capital_outlays + labor + tax + royalty + interest + inputs.depreciation
+    profit_loss = revenue - expenses
+    cash_flow = profit_loss + inputs.depreciation - capital_outlays
+
+    return {
+        'students': students,
+        'revenue': revenue,
+        'labor': labor,
+        'tax': tax,
+        'royalty': royalty,
+        'interest': interest,
+        'depreciation': np.broadcast_to(inputs.depreciation, students.shape),
+        'expenses': expenses,
+        'profit_loss': profit_loss,
+        'cash': (inputs.starting_cash if starting_cash is None else _column(starting_cash)) + np.cumsum(cash_flow, axis=1),
+    }
+
+
+def scenario_metrics(results, inputs):
+    """
+    Reduce simulate() output to one row of headline numbers per scenario.
+
+    Returns:
+    - dict: Arrays of length n_scenarios:
+      'min_cash' (lowest month-end cash on hand),
+      'breakeven_month' (months from grand opening to the first month with a non-negative
+      profit/loss, NaN if it never happens) and
+      'cumulative_profit' (profit/loss summed over the horizon).
+    """
+    operating = results['profit_loss'][:, inputs.open_offset:] >= 0
+    breakeven_month = np.where(operating.any(axis=1), operating.argmax(axis=1), np.nan)
+    return {
+        'min_cash': results['cash'].min(axis=1),
+        'breakeven_month': breakeven_month,
+        'cumulative_profit': results['profit_loss'].sum(axis=1),
+    }
+
+
+def sample_uniform(n_scenarios, ranges, seed=None):
+    """
+    Draw scenario parameters uniformly from (low, high) ranges.
+
+    Parameters:
+    - n_scenarios (int): Number of scenarios to draw.
+    - ranges (dict): Maps a parameter name to a (low, high) tuple or a fixed value.
+    - seed (int, optional): Seed for the NumPy Generator.
+
+    Returns:
+    - dict: Parameter name -> array of length n_scenarios.
+    """
+    rng = np.random.default_rng(seed)
+    params = {}
+    for name, value in ranges.items():
+        if isinstance(value, tuple):
+            params[name] = rng.uniform(value[0], value[1], n_scenarios)
+        else:
+            params[name] = np.full(n_scenarios, value, dtype=float)
+    return params
+
+
+def percentile_bands(matrix, months, percentiles=(5, 25, 50, 75, 95)):
+    """
+    Collapse a (n_scenarios x n_months) matrix into per-month percentile bands.
+
+    Returns:
+    - DataFrame: One row per month with a 'Period' column and one 'P<q>' column per percentile.
+    """
+    bands = np.percentile(matrix, percentiles, axis=0)
+    bands_df = pd.DataFrame(bands.T, columns=[f'P{q:g}' for q in percentiles])
+    bands_df.insert(0, 'Period', months.strftime('%m-%Y'))
+    return bands_df
+
+
+def run_monte_carlo(inputs, params, percentiles=(5, 25, 50, 75, 95), students=None, event_revenue=None):
+    """
+    Simulate all scenarios and summarize them as percentile bands.
+
+    Parameters:
+    - inputs (ScenarioInputs): Scenario-independent inputs from build_inputs().
+    - params (dict): Arrays (or scalars) for the names in SCENARIO_PARAMS; sq_ft and starting_cash are optional.
+    - percentiles (tuple): Percentiles to report.
+    - students (np.ndarray, optional): Stochastic enrollment paths, see simulate().
+    - event_revenue (np.ndarray, optional): Random event revenue per scenario, see simulate().
+
+    Returns:
+    - dict: {'profit_loss': DataFrame, 'cash': DataFrame} of percentile bands.
+    """
+    results = simulate(inputs, **{name: params[name] for name in SCENARIO_PARAMS if name in params}, students=students,
+                       event_revenue=event_revenue)
+    return {
+        'profit_loss': percentile_bands(results['profit_loss'], inputs.months, percentiles),
+        'cash': percentile_bands(results['cash'], inputs.months, percentiles),
+    }
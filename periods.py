@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+from functools import cached_property
+
+
+def _month_number(dates):
+    """
+    Months since 1970-01 for datetime-like values.
+    """
+    return np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[M]').astype(np.int64)
+
+
+class Calendar:
+    """
+    The months of one model run, built once and shared by every stage.
+
+    Stages address months by integer offset into the calendar, so dates are converted to
+    offsets with integer arithmetic and month boundaries and 'MM-YYYY' labels are looked
+    up instead of being regenerated with date_range() and strftime().
+
+    Parameters:
+    - start, end (str or datetime): Any dates in the first and last month.
+    """
+
+    def __init__(self, start, end):
+        first, last = _month_number([pd.Timestamp(start), pd.Timestamp(end)])
+        self._first = first
+        self._months = np.arange(first, last + 1).astype('datetime64[M]')
+
+    def __len__(self):
+        return len(self._months)
+
+    def __repr__(self):
+        return f"Calendar({self.months[0]} to {self.months[-1]}, {len(self)} months)"
+
+    @classmethod
+    def covering(cls, *dates):
+        """
+        Calendar spanning the months of every given date (scalars or arrays).
+        """
+        numbers = np.concatenate([_month_number(np.atleast_1d(pd.to_datetime(d))) for d in dates])
+        first, last = np.array([numbers.min(), numbers.max()]).astype('datetime64[M]')
+        return cls(str(first), str(last))
+
+    @cached_property
+    def months(self):
+        return pd.PeriodIndex(self.month_starts, freq='M')
+
+    @cached_property
+    def month_starts(self):
+        return pd.DatetimeIndex(self._months.astype('datetime64[ns]'))
+
+    @cached_property
+    def month_ends(self):
+        return pd.DatetimeIndex(((self._months + 1).astype('datetime64[D]') - 1).astype('datetime64[ns]'))
+
+    @cached_property
+    def labels(self):
+        """
+        'MM-YYYY' label of each month, as used in the Period columns.
+        """
+        years, months = np.divmod(self._months.astype(np.int64), 12)
+        return np.array([f"{m + 1:02d}-{y + 1970}" for y, m in zip(years.tolist(), months.tolist())], dtype=object)
+
+    @cached_property
+    def days_in_month(self):
+        return ((self._months + 1).astype('datetime64[D]') - self._months.astype('datetime64[D]')).astype(np.int64)
+
+    def offset(self, dates):
+        """
+        Month offset of each date; dates outside the calendar give offsets < 0 or >= len().
+        """
+        return _month_number(dates) - self._first
+
+    def offset_of(self, date):
+        return int(self.offset([pd.Timestamp(date)])[0])
+
+    def span(self, *dates):
+        """
+        Slice of the months from the earliest to the latest of the given date arrays.
+        """
+        offsets = np.concatenate([self.offset(d) for d in dates])
+        return slice(int(offsets.min()), int(offsets.max()) + 1)
+
+    def month_end_offsets(self, start, end):
+        """
+        Offsets of the months whose last day falls within [start, end], i.e. the months
+        pd.date_range(start, end, freq='M') would produce.
+        """
+        first = self.offset_of(start)
+        last = self.offset_of(end)
+        if self.month_ends[min(max(last, 0), len(self) - 1)] > pd.Timestamp(end):
+            last -= 1
+        return np.arange(max(first, 0), min(last + 1, len(self)))
+
+    def monthly_dates(self, start, end):
+        """
+        The dates reached from `start` by repeatedly adding relativedelta(months=1), while
+        on or before `end`. As with relativedelta, the day of the month is clipped to the
+        month's length, and stays clipped in the months after.
+
+        Returns:
+        - tuple: (offsets, pd.DatetimeIndex of the dates).
+        """
+        start = pd.Timestamp(start)
+        offsets = np.arange(max(self.offset_of(start), 0), len(self))
+        days = np.minimum.accumulate(np.minimum(start.day, self.days_in_month[offsets])) - 1
+        dates = (self._months[offsets].astype('datetime64[D]') + days).astype('datetime64[ns]')
+        dates = dates + (start - start.normalize()).to_timedelta64()
+        keep = dates <= np.datetime64(pd.Timestamp(end), 'ns')
+        return offsets[keep], pd.DatetimeIndex(dates[keep])
+
+    def monthly_sum(self, dates, amounts):
+        """
+        Sum amounts into the calendar's months; amounts dated outside it are dropped.
+        """
+        offsets = self.offset(dates)
+        inside = (offsets >= 0) & (offsets < len(self))
+        return np.bincount(offsets[inside], weights=np.asarray(amounts, dtype=float)[inside], minlength=len(self))
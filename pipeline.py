@@ -0,0 +1,141 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, date
+
+import numpy as np
+import pandas as pd
+
+
+def fingerprint(value):
+    """
+    Stable, hashable text form of an assumption value (scalars, dates, lists, dicts, Series).
+    Equal values give equal fingerprints across processes and runs.
+    """
+    if isinstance(value, dict):
+        return '{' + ','.join(f'{fingerprint(k)}:{fingerprint(v)}' for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(fingerprint(v) for v in value) + ']'
+    if isinstance(value, pd.Series):
+        return fingerprint(value.to_dict())
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return repr(value)
+
+
+def digest(*parts):
+    return hashlib.sha1('\x1f'.join(parts).encode()).hexdigest()
+
+
+@dataclass
+class Stage:
+    """
+    One node of a Pipeline.
+
+    Attributes:
+    - name (str): Stage name; also the key of its output.
+    - func (callable): Called as func(assumptions, *outputs of deps). Must not mutate its
+      inputs, since they may be cached and shared with other runs.
+    - fields (tuple): Assumptions fields the stage reads.
+    - deps (tuple): Names of upstream stages whose outputs are passed to func.
+    """
+    name: str
+    func: object
+    fields: tuple = ()
+    deps: tuple = ()
+
+
+class StageCache:
+    """
+    Size-bounded LRU memo of stage outputs keyed by input hash.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, self._entries[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+class Pipeline:
+    """
+    A DAG of stages evaluated in dependency order.
+
+    A stage's key hashes its name, the values of the assumption fields it reads and the
+    keys of its upstream stages. Changing one assumption therefore changes the keys of
+    the stages that read it and of everything downstream of them, and only those are
+    recomputed when a StageCache is supplied.
+    """
+
+    def __init__(self, stages):
+        self.stages = {}
+        for stage in stages:
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on undefined or later stages: {', '.join(missing)}")
+            self.stages[stage.name] = stage
+
+    def keys(self, assumptions):
+        """
+        Input hash of every stage for the given assumptions.
+        """
+        keys = {}
+        for stage in self.stages.values():
+            field_parts = [f'{field}={fingerprint(getattr(assumptions, field))}' for field in stage.fields]
+            keys[stage.name] = digest(stage.name, *field_parts, *(keys[dep] for dep in stage.deps))
+        return keys
+
+    def run(self, assumptions, cache=None, computed=None):
+        """
+        Evaluate every stage.
+
+        Parameters:
+        - assumptions: Object the stage fields are read from.
+        - cache (StageCache, optional): Memo shared between runs.
+        - computed (list, optional): Receives the names of the stages that were recomputed.
+
+        Returns:
+        - dict: Stage name -> output.
+        """
+        keys = self.keys(assumptions) if cache is not None else None
+        outputs = {}
+        for stage in self.stages.values():
+            if cache is not None:
+                found, value = cache.get(keys[stage.name])
+                if found:
+                    outputs[stage.name] = value
+                    continue
+            outputs[stage.name] = stage.func(assumptions, *(outputs[dep] for dep in stage.deps))
+            if cache is not None:
+                cache.put(keys[stage.name], outputs[stage.name])
+            if computed is not None:
+                computed.append(stage.name)
+        return outputs
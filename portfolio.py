@@ -0,0 +1,166 @@
+import math
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from model import Assumptions, FinancialModel
+
+
+@dataclass
+class PortfolioResult:
+    """
+    Output of run_portfolio().
+
+    Attributes:
+    - sites (DataFrame): Long format, one row per site and month with 'Site', 'Date',
+      'Revenue', 'Expenses', 'Profit Loss', 'Net Cash Flow', 'HELOC Debt' and
+      'Cash On Hand' columns.
+    - consolidated (DataFrame): One row per month with the amounts summed over all
+      sites plus 'Period', 'HELOC Over Limit' and 'HELOC Headroom', see run_portfolio().
+    """
+    sites: pd.DataFrame
+    consolidated: pd.DataFrame
+
+
+def site_assumptions(sites):
+    """
+    Turn a sites table into (site name, Assumptions) pairs.
+
+    Parameters:
+    - sites (DataFrame or list): One row/dict per site. Columns are Assumptions fields
+      plus an optional 'Site' name; missing values keep the model defaults. A list may
+      also hold ready-made Assumptions objects.
+
+    Returns:
+    - list: (site name, Assumptions) tuples.
+
+    Raises:
+    - ValueError: If two sites have the same name.
+    """
+    if isinstance(sites, pd.DataFrame):
+        sites = sites.to_dict('records')
+
+    pairs = []
+    for i, site in enumerate(sites):
+        if isinstance(site, Assumptions):
+            pairs.append((f"Site {i + 1}", site))
+            continue
+        site = dict(site)
+        name = site.pop('Site', f"Site {i + 1}")
+        pairs.append((name, Assumptions.from_dict(site)))
+
+    names = pd.Series([name for name, _ in pairs])
+    duplicated = names[names.duplicated()].unique()
+    if len(duplicated):
+        raise ValueError(f"Site names must be unique; repeated: {', '.join(map(str, duplicated))}")
+    return pairs
+
+
+def evaluate_site(site):
+    """
+    Run the model for one site and reduce it to monthly totals.
+
+    Runs in the worker processes, so only the compact monthly frame travels back.
+
+    Parameters:
+    - site (tuple): (site name, Assumptions).
+
+    Returns:
+    - DataFrame: One row per month with 'Site', 'Date', 'Revenue', 'Expenses',
+      'Profit Loss' (net income), 'Net Cash Flow' (operating and investing, before
+      HELOC draws), 'HELOC Debt' and 'Cash On Hand' (as the site's model run has it,
+      so with the HELOC drawn up front or as needed) columns.
+    """
+    name, assumptions = site
+    result = FinancialModel(assumptions).run()
+
+    income = result.income_statement_df
+    cashflow = result.cashflow_statement_df
+    months = result.calendar.span(result.all_revenue_df['Date'], result.all_expenses_df['Date'])
+    monthly = pd.DataFrame({
+        'Revenue': income['Revenue'].values,
+        'Expenses': (income['Revenue'] - income['Net Income']).values,
+        'Profit Loss': income['Net Income'].values,
+        'Net Cash Flow': (cashflow['Operating Cash Flow'] + cashflow['Investing Cash Flow']).values,
+        'HELOC Debt': result.balance_sheet_df['HELOC Balance'].values,
+        'Cash On Hand': result.cashflow_df['Cash On Hand'].values,
+    }, index=result.calendar.month_ends[months])
+    monthly.index.name = 'Date'
+    monthly = monthly.reset_index()
+    monthly.insert(0, 'Site', name)
+    return monthly
+
+
+def run_portfolio(sites, starting_liquid=None, heloc_limit=None, max_workers=None, chunksize=None):
+    """
+    Evaluate every site across a process pool and consolidate the results.
+
+    Each site keeps its own timeline, lease and enrollment assumptions; the portfolio
+    shares one cash position and one HELOC.
+
+    Consolidated cash on hand is the sites' own cash on hand summed (each site holds its
+    starting cash before its timeline starts and its last balance after it ends), moved
+    by the difference between starting_liquid and the sites' liquid cash. Combined debt
+    is capped at heloc_limit: 'HELOC Over Limit' is what the sites would owe beyond it,
+    which is paid from cash instead, and sites that count their whole line as cash up
+    front (heloc_draws=False) count only the part of the shared line left undrawn.
+
+    Parameters:
+    - sites (DataFrame or list): Sites table, see site_assumptions().
+    - starting_liquid (float, optional): Shared liquid cash. Defaults to the sum over sites.
+    - heloc_limit (float, optional): Shared HELOC limit. Defaults to the sum over sites.
+    - max_workers (int, optional): Worker processes; 1 evaluates in-process.
+    - chunksize (int, optional): Sites sent to a worker at a time. By default sites are
+      split into ~4 chunks per worker to amortize pickling without starving workers.
+
+    Returns:
+    - PortfolioResult: Per-site and consolidated monthly frames.
+
+    Raises:
+    - ValueError: If two sites have the same name, before any site is run.
+    """
+    pairs = site_assumptions(sites)
+    if max_workers is None:
+        max_workers = min(os.cpu_count() or 1, len(pairs))
+
+    if max_workers <= 1:
+        monthly = [evaluate_site(pair) for pair in pairs]
+    else:
+        if chunksize is None:
+            chunksize = max(1, math.ceil(len(pairs) / (max_workers * 4)))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            monthly = list(pool.map(evaluate_site, pairs, chunksize=chunksize))
+
+    sites_df = pd.concat(monthly, ignore_index=True)
+
+    # Sites open at different times: debt carries forward, flows are zero outside a site's timeline
+    months = pd.DatetimeIndex(np.sort(sites_df['Date'].unique()))
+    debt = sites_df.pivot(index='Date', columns='Site', values='HELOC Debt').reindex(months).ffill().fillna(0)
+    consolidated = (sites_df.groupby('Date')[['Revenue', 'Expenses', 'Profit Loss', 'Net Cash Flow']].sum()
+                    .reindex(months, fill_value=0))
+    opening = pd.Series({name: a.starting_liquid if a.heloc_draws else a.starting_cash for name, a in pairs})
+    cash = sites_df.pivot(index='Date', columns='Site', values='Cash On Hand').reindex(months).ffill()
+    cash = cash.fillna(opening[cash.columns])
+
+    if starting_liquid is None:
+        starting_liquid = sum(a.starting_liquid for _, a in pairs)
+    if heloc_limit is None:
+        heloc_limit = sum(a.starting_heloc for _, a in pairs)
+
+    owed = debt.sum(axis=1)
+    consolidated['HELOC Debt'] = np.minimum(owed, heloc_limit)
+    consolidated['HELOC Over Limit'] = owed - consolidated['HELOC Debt']
+    consolidated['HELOC Headroom'] = heloc_limit - consolidated['HELOC Debt']
+    # The undrawn lines the up-front sites count as cash, beyond what the shared line has left
+    up_front = [name for name, a in pairs if not a.heloc_draws]
+    lines = pd.Series({name: a.starting_heloc for name, a in pairs})
+    counted = (lines[up_front] - debt[up_front]).sum(axis=1)
+    missing = np.maximum(counted - consolidated['HELOC Headroom'], 0)
+    consolidated['Cash On Hand'] = (cash.sum(axis=1) + starting_liquid - sum(a.starting_liquid for _, a in pairs)
+                                    - consolidated['HELOC Over Limit'] - missing)
+    consolidated.index.name = 'Date'
+    consolidated = consolidated.reset_index()
+    consolidated.insert(0, 'Period', consolidated['Date'].dt.strftime('%m-%Y'))
+    return PortfolioResult(sites=sites_df, consolidated=consolidated)
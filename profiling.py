@@ -0,0 +1,206 @@
+"""
+Opt-in per-stage instrumentation.
+
+Functions decorated with @profiled (and blocks wrapped in `with stage(...)`) are timed
+only while a Profiler is active; otherwise the wrapper costs one global lookup.
+
+    with Profiler() as prof:
+        FinancialModel().run()
+    print(prof.summary())
+    prof.to_chrome_trace("trace.json")   # open in chrome://tracing or ui.perfetto.dev
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+
+import pandas as pd
+
+# The active Profiler, or None when instrumentation is off
+_active = None
+
+
+@dataclass
+class StageRecord:
+    """
+    One timed call.
+
+    Attributes:
+    - name (str): Stage name.
+    - start (float): Seconds since the profiler started.
+    - wall (float): Wall-clock seconds.
+    - cpu (float): Process CPU seconds.
+    - rows_in (int): Rows of the DataFrame/Series/Ledger arguments, if any.
+    - rows_out (int): Rows of the result, if it has a length.
+    - alloc_bytes (int): Net bytes still allocated when the stage returns (tracemalloc).
+    - peak_bytes (int): Peak bytes allocated during the stage (tracemalloc).
+    - depth (int): Nesting level; 0 for top-level stages.
+    - thread (int): Thread id.
+    """
+    name: str
+    start: float
+    wall: float = 0.0
+    cpu: float = 0.0
+    rows_in: int = None
+    rows_out: int = None
+    alloc_bytes: int = None
+    peak_bytes: int = None
+    depth: int = 0
+    thread: int = 0
+
+
+def _rows(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)) or type(value).__name__ == 'Ledger':
+        return len(value)
+    return None
+
+
+def _rows_in(args, kwargs):
+    counts = [n for n in map(_rows, (*args, *kwargs.values())) if n is not None]
+    return sum(counts) if counts else None
+
+
+class Profiler:
+    """
+    Collects a StageRecord for every instrumented call while active.
+
+    Parameters:
+    - memory (bool): Track allocations with tracemalloc. Adds noticeable overhead to the
+      timings, so leave it off when only times matter.
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.records = []
+        self._stack = []
+        self._origin = None
+        self._started_tracemalloc = False
+        self._previous = None
+
+    def __enter__(self):
+        global _active
+        self._previous = _active
+        self._origin = time.perf_counter()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        _active = self
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active = self._previous
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return False
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Time a block as one stage; the yielded record's rows_out can be set by the caller.
+        """
+        record = StageRecord(name=name, start=time.perf_counter() - self._origin, rows_in=rows_in,
+                             depth=len(self._stack), thread=threading.get_ident())
+        # Each frame keeps the highest peak seen in its children, since reset_peak() is global
+        frame = {'child_peak': 0}
+        self._stack.append(frame)
+        if self.memory:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall = time.perf_counter() - wall
+            record.cpu = time.process_time() - cpu
+            self._stack.pop()
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, frame['child_peak'])
+                record.alloc_bytes = current - before
+                record.peak_bytes = peak - before
+                if self._stack:
+                    self._stack[-1]['child_peak'] = max(self._stack[-1]['child_peak'], peak)
+            self.records.append(record)
+
+    def to_frame(self):
+        """
+        All records in call order, one row per call.
+        """
+        return pd.DataFrame([asdict(r) for r in self.records]).sort_values('start', ignore_index=True)
+
+    def summary(self):
+        """
+        Totals per stage name, slowest first.
+        """
+        df = self.to_frame()
+        rows = lambda values: values.sum(min_count=1)
+        summary = df.groupby('name').agg(
+            calls=('wall', 'size'), wall=('wall', 'sum'), cpu=('cpu', 'sum'),
+            rows_in=('rows_in', rows), rows_out=('rows_out', rows), peak_bytes=('peak_bytes', 'max'))
+        return summary.sort_values('wall', ascending=False)
+
+    def to_json(self, path):
+        with open(path, 'w') as f:
+            json.dump([asdict(r) for r in self.records], f, indent=2)
+        return path
+
+    def to_chrome_trace(self, path):
+        """
+        Write the records in the Chrome trace event format (complete 'X' events, microseconds).
+        """
+        pid = os.getpid()
+        events = [{
+            'name': r.name,
+            'ph': 'X',
+            'ts': r.start * 1e6,
+            'dur': r.wall * 1e6,
+            'pid': pid,
+            'tid': r.thread,
+            'args': {k: v for k, v in (('cpu', r.cpu), ('rows_in', r.rows_in), ('rows_out', r.rows_out),
+                                       ('alloc_bytes', r.alloc_bytes), ('peak_bytes', r.peak_bytes))
+                     if v is not None},
+        } for r in self.records]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return path
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """
+    Time a block under the active Profiler; does nothing when none is active.
+    Yields the StageRecord, or None when disabled.
+    """
+    if _active is None:
+        yield None
+        return
+    with _active.stage(name, rows_in) as record:
+        yield record
+
+
+def profiled(func=None, *, name=None):
+    """
+    Decorator recording each call of func as a stage while a Profiler is active.
+    Rows in/out are taken from DataFrame, Series and Ledger arguments and results.
+    """
+    if func is None:
+        return functools.partial(profiled, name=name)
+    stage_name = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _active
+        if profiler is None:
+            return func(*args, **kwargs)
+        with profiler.stage(stage_name, _rows_in(args, kwargs)) as record:
+            result = func(*args, **kwargs)
+            record.rows_out = _rows(result)
+        return result
+
+    return wrapper
@@ -1,47 +1,53 @@
+import numpy as np
 import pandas as pd
-import random
-from dateutil.relativedelta import relativedelta
-from datetime import datetime
+from datetime import timedelta
 
+from ledger import append_item
+from periods import Calendar
+from profiling import profiled
+
+@profiled
 def add_revenue(df, name, date, amount):
     """
     Add a unique revenue to the dataframe.
     
     Args:
-    - df (pd.DataFrame): The dataframe to which the revenue should be added.
+    - df (pd.DataFrame or Ledger): The revenues to which the revenue should be added.
+      A Ledger is appended to in place.
     - name (str): Name of the revenue.
     - date (str or datetime): Date of the revenue.
     - amount (float): Amount of the revenue.
     
     Returns:
-    - pd.DataFrame: Updated dataframe with the new revenue.
+    - pd.DataFrame or Ledger: Updated revenues with the new revenue.
     """
-    new_revenue = pd.DataFrame({
-        'Date': [date],
-        'Name': [name],
-        'Amount': [amount]
-    })
-    return pd.concat([df, new_revenue], ignore_index=True)
+    return append_item(df, date, name, amount)
 
 
-def add_birthday_party(df, start_date, end_date, value):
-    # Convert dates to integer timestamps
-    start_timestamp = int(start_date.timestamp())
-    end_timestamp = int(end_date.timestamp())
-    
-    # Generate a random timestamp between the start and end dates
-    random_timestamp = random.randint(start_timestamp, end_timestamp)
-    
-    # Convert the random timestamp back to a datetime object
-    random_date = datetime.fromtimestamp(random_timestamp)
-    
-    add_revenue(df, "Birthday Party", random_date, value)
+@profiled
+def add_birthday_party(df, start_date, end_date, value, rng=None):
+    """
+    Add a birthday party on a random day between two dates. FinancialModel draws its
+    parties in bulk instead, see events.py.
 
-    return df
+    Args:
+    - df (pd.DataFrame or Ledger): The revenues to which the party should be added.
+    - start_date, end_date (datetime): First and last day the party can fall on.
+    - value (float): Revenue of the party.
+    - rng (np.random.Generator, optional): Generator to draw the day from.
+
+    Returns:
+    - pd.DataFrame or Ledger: Updated revenues with the party.
+    """
+    rng = rng or np.random.default_rng()
+    day = int(rng.integers(0, (end_date - start_date).days + 1))
+    return add_revenue(df, "Birthday Party", start_date + timedelta(days=day), value)
 
     
 # Revenue model definition
-def revenue_growth_df(initial_students, revenue_per_student, growth_rate, max_students, start_date, end_date):
+@profiled
+def revenue_growth_df(initial_students, revenue_per_student, growth_rate, max_students, start_date, end_date,
+                      calendar=None):
     """
     Generates a dataframe of recurring revenues based on the given parameters.
     
@@ -52,34 +58,31 @@ def revenue_growth_df(initial_students, revenue_per_student, growth_rate, max_st
     - max_students (int): The maximum number of students.
     - start_date (datetime): The starting date for the revenue generation.
     - end_date (datetime): The ending date for the revenue generation.
+    - calendar (periods.Calendar, optional): The run's calendar; built from the dates if not given.
     
     Returns:
     - DataFrame: A DataFrame containing the recurring revenues.
     """
+    calendar = calendar or Calendar(start_date, end_date)
+    offsets, dates = calendar.monthly_dates(start_date, end_date)
+
+    # Each month the students grow by growth_rate and are then capped at max_students, so
+    # after k months the count is initial * (1 + g)^k, capped at max_students * (1 + g)^(k - 1)
+    # when the count shrinks
+    k = np.arange(len(offsets))
+    cap = max_students * np.minimum(1, (1 + growth_rate) ** np.maximum(k - 1, 0))
+    students = np.minimum(initial_students * (1 + growth_rate) ** k, cap)
+    if len(students):
+        students[0] = initial_students
+
+    return pd.DataFrame({
+        'Date': dates,
+        'Name': "Enrollment Revenue",
+        'Amount': students * revenue_per_student,
+        'Student_Count': students,
+    })
 
-    # List to hold the data for each month
-    revenue_data = []
-    
-    current_students = initial_students
-    while start_date <= end_date:
-        monthly_revenue = current_students * revenue_per_student
-        revenue_data.append({'Date': start_date, 
-                             'Name': "Enrollment Revenue",
-                             'Amount': monthly_revenue,
-                             'Student_Count': current_students})
-                             
-        
-        # Calculate the number of students for the next month
-        current_students = min(current_students * (1 + growth_rate), max_students)
-        
-        # Increment the month
-        start_date += relativedelta(months=1)
-
-    # Convert the list of dictionaries into a DataFrame
-    revenue_df = pd.DataFrame(revenue_data)
-
-    return revenue_df
-
+@profiled
 def combine_revenue(recurring_revenue_df, unique_revenue_df):
     """
     Combines the unique and recurring revenues into a single DataFrame.
@@ -101,6 +104,7 @@ def combine_revenue(recurring_revenue_df, unique_revenue_df):
     return combined_revenues.sort_values(by='Date')
 import pandas as pd
 
+@profiled
 def pad_revenues(expenses_df, revenues_df):
     """
     Pad the revenues DataFrame with zeros for months when there's no revenue, ensuring it aligns with the expenses DataFrame.
@@ -128,7 +132,7 @@ def pad_revenues(expenses_df, revenues_df):
         # Create a dataframe with zeros for the missing months
         padding_df = pd.DataFrame({
             'Date': date_range,
-            'Revenue_Name': 'Enrollment Revenue',
+            'Name': 'Enrollment Revenue',
             'Amount': 0
         })
 
@@ -0,0 +1,526 @@
+"""
+Scenario files: assumptions as TOML (or YAML) with a timeline of relative milestones.
+
+    # sites/denver.toml
+    [timeline]
+    fran_start_date = 2024-01-15
+    sign_lease = "fran_start_date + 2 months"
+    grand_opening = "sign_lease + 13 weeks"
+    period_end = 2026-12-31
+
+    [revenue]
+    growth_rate = 0.08
+
+    [expenses]
+    sq_ft = 1800
+    interest_rate_schedule = { "grand_opening" = 9, "grand_opening + 12 months" = 7.5 }
+    tax_rate_schedule = { "2024-01-01" = 0.029, "2026-01-01" = 0.031 }
+
+    [[unique_expenses]]
+    date = "sign_lease + 2 weeks"
+    name = "Computer Equipment (instructional)"
+    amount = "inst_comp_cost"
+
+    [[assets]]
+    date = "grand_opening"
+    name = "Computer Equipment (instructional)"
+    amount = "inst_comp_cost"
+    useful_life = 24
+    method = "declining_balance"
+
+    a = load_scenario('sites/denver.toml')       # resolved Assumptions
+    scenarios = load_scenarios('sites/')          # {'denver': Assumptions, ...}, parsed in parallel
+    params = scenario_arrays(scenarios)           # {name: array} for monte_carlo.simulate()
+
+Keys are Assumptions fields, optionally grouped under the [timeline], [revenue],
+[expenses] and [cashflow] tables. Milestones are dates or '<milestone> +/- <n>
+days|weeks|months|years' expressions, in any order; milestones left out follow
+model.TIMELINE. Line-item, asset and rate-schedule dates may be expressions too, and
+amounts may name a numeric assumption such as 'rent'. Every problem is reported as a
+ValueError naming the file.
+
+Resolved scenarios are cached in memory by path, modification time and size, and by
+content hash in an optional cache directory shared between runs. YAML requires PyYAML
+(pip install pyyaml); it is only imported when a YAML file is read.
+"""
+import dataclasses
+import hashlib
+import math
+import os
+import pickle
+import re
+import tomllib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from events import Event
+from labor import StaffingConfig
+from model import Assumptions, TIMELINE
+from monte_carlo import SCENARIO_PARAMS
+from pipeline import digest
+from store import scenario_key
+
+# Tables whose keys are Assumptions fields, as grouped in the README
+SECTIONS = ('timeline', 'revenue', 'expenses', 'cashflow')
+EXTENSIONS = ('.toml', '.yaml', '.yml')
+LINE_ITEMS = ('recurring_expenses', 'unique_expenses', 'unique_revenue')
+# Optional keys of an [[assets]] entry besides date, name and amount
+ASSET_KEYS = {'useful_life': 'Useful_Life', 'method': 'Method', 'salvage': 'Salvage', 'factor': 'Factor',
+              'group': 'Group'}
+
+_FIELDS = {f.name: f for f in dataclasses.fields(Assumptions)}
+MILESTONES = tuple(name for name, f in _FIELDS.items() if f.type is datetime)
+
+_EXPRESSION = re.compile(r'^\s*([A-Za-z_]\w*)((?:\s*[+-]\s*\d+\s*[a-z]+)*)\s*$')
+_TERM = re.compile(r'([+-])\s*(\d+)\s*([a-z]+)')
+_UNITS = {'day': 'days', 'days': 'days', 'week': 'weeks', 'weeks': 'weeks', 'month': 'months', 'months': 'months',
+          'year': 'years', 'years': 'years'}
+
+# Files below this many cache misses are parsed in-process; a pool costs more to start
+PARALLEL_MIN_FILES = 256
+
+
+def _yaml():
+    try:
+        import yaml
+    except ImportError as e:
+        raise ImportError("YAML scenario files require PyYAML: pip install pyyaml") from e
+    return yaml
+
+
+@lru_cache(maxsize=4096)
+def parse_offset(text):
+    """
+    Split a '<milestone> +/- <n> <unit> ...' expression. Memoized, since the same
+    expressions recur across the files of a batch.
+
+    Returns:
+    - tuple: (milestone name, relativedelta), or None if text is not an expression.
+
+    Raises:
+    - ValueError: If a unit is not days, weeks, months or years.
+    """
+    match = _EXPRESSION.match(text)
+    if match is None:
+        return None
+    offset = relativedelta()
+    for sign, n, unit in _TERM.findall(match.group(2)):
+        if unit not in _UNITS:
+            raise ValueError(f"Unknown unit '{unit}' in '{text}'; use days, weeks, months or years")
+        offset += relativedelta(**{_UNITS[unit]: int(n) if sign == '+' else -int(n)})
+    return match.group(1), offset
+
+
+def _date(value, milestone, where):
+    """
+    A date value of a scenario file: a TOML/YAML date, an ISO string or an expression
+    relative to a milestone, looked up with milestone(name).
+    """
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        expression = parse_offset(value)
+        if expression is not None:
+            base, offset = expression
+            if base not in MILESTONES:
+                raise ValueError(f"{where}: unknown milestone '{base}'; choose from {', '.join(MILESTONES)}")
+            return milestone(base) + offset
+        try:
+            return pd.Timestamp(value).to_pydatetime()
+        except ValueError:
+            pass
+    raise ValueError(f"{where}: {value!r} is neither a date nor '<milestone> + <n> <unit>'")
+
+
+def _number(value, where, integer=False):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{where}: expected a number, got {value!r}")
+    if integer:
+        if not float(value).is_integer():
+            raise ValueError(f"{where}: expected a whole number, got {value!r}")
+        return int(value)
+    return value
+
+
+def _amount(value, assumptions, where):
+    """
+    A number, or the name of a numeric assumption such as 'rent' or 'inst_comp_cost'.
+    """
+    if isinstance(value, str):
+        try:
+            value = getattr(assumptions, value)
+        except (AttributeError, TypeError):
+            raise ValueError(f"{where}: unknown assumption '{value}'") from None
+    return _number(value, where)
+
+
+def _line_item(item, milestone, assumptions, dated, where, optional=()):
+    if not isinstance(item, dict):
+        raise ValueError(f"{where}: expected a table with name, amount{', date' if dated else ''}")
+    item = {str(key).lower(): value for key, value in item.items()}
+    keys = ('date', 'name', 'amount') if dated else ('name', 'amount')
+    missing = [key for key in keys if key not in item]
+    if missing:
+        raise ValueError(f"{where}: missing {', '.join(missing)}")
+    unknown = set(item) - set(keys) - set(optional)
+    if unknown:
+        raise ValueError(f"{where}: unknown keys {', '.join(sorted(unknown))}")
+    if not isinstance(item['name'], str):
+        raise ValueError(f"{where}.name: expected a string, got {item['name']!r}")
+
+    row = {'Name': item['name'], 'Amount': _amount(item['amount'], assumptions, f"{where}.amount")}
+    if dated:
+        row = {'Date': _date(item['date'], milestone, f"{where}.date"), **row}
+    return row
+
+
+def _asset(item, milestone, assumptions, where):
+    row = _line_item(item, milestone, assumptions, True, where, optional=ASSET_KEYS)
+    for key, value in item.items():
+        key = str(key).lower()
+        if key in ('useful_life', 'group'):
+            row[ASSET_KEYS[key]] = _number(value, f"{where}.{key}", integer=True)
+        elif key in ('salvage', 'factor'):
+            row[ASSET_KEYS[key]] = _amount(value, assumptions, f"{where}.{key}")
+        elif key == 'method':
+            row['Method'] = value
+    return row
+
+
+def _event(values, assumptions, where):
+    if not isinstance(values, dict):
+        raise ValueError(f"{where}: expected a table of Event fields")
+    values = dict(values)
+    if 'amount' in values:
+        values['amount'] = _amount(values['amount'], assumptions, f"{where}.amount")
+    if isinstance(values.get('months'), list):
+        values['months'] = tuple(values['months'])
+    try:
+        return Event(**values)
+    except TypeError as e:
+        raise ValueError(f"{where}: {e}") from None
+
+
+def resolve_document(document):
+    """
+    Validate a parsed scenario file and resolve it into Assumptions.
+
+    Parameters:
+    - document (dict): Parsed TOML/YAML, see the module docstring for the layout.
+
+    Returns:
+    - Assumptions: Resolved assumptions (milestones and line items filled in).
+
+    Raises:
+    - ValueError: On unknown keys or milestones, wrong types, circular milestones, or a
+      timeline that ends before the grand opening.
+    """
+    if not isinstance(document, dict):
+        raise ValueError("A scenario file must hold a table of assumptions")
+    values = {}
+    for key, value in document.items():
+        entries = value.items() if key in SECTIONS and isinstance(value, dict) else [(key, value)]
+        for name, entry in entries:
+            if name in values:
+                raise ValueError(f"'{name}' is set more than once")
+            values[name] = entry
+    unknown = set(values) - set(_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown assumptions: {', '.join(sorted(unknown))}")
+
+    # Milestones may refer to each other in any order; those left out follow TIMELINE
+    milestones = {}
+    resolving = []
+
+    def milestone(name):
+        if name in milestones:
+            return milestones[name]
+        if name in resolving:
+            raise ValueError(f"Circular timeline: {' -> '.join(resolving[resolving.index(name):] + [name])}")
+        resolving.append(name)
+        if values.get(name) is not None:
+            milestones[name] = _date(values[name], milestone, name)
+        elif name in TIMELINE:
+            base, offset = TIMELINE[name]
+            milestones[name] = milestone(base) + offset
+        else:
+            milestones[name] = _FIELDS[name].default
+        resolving.pop()
+        return milestones[name]
+
+    for name in MILESTONES:
+        milestone(name)
+
+    kwargs = dict(milestones)
+    for name, value in values.items():
+        kind = _FIELDS[name].type
+        if name in MILESTONES or name in LINE_ITEMS or name in ('events', 'assets') or value is None:
+            continue
+        if kind is bool:
+            if not isinstance(value, bool):
+                raise ValueError(f"{name}: expected true or false, got {value!r}")
+        elif kind in (int, float):
+            value = _number(value, name, integer=kind is int)
+        elif kind is StaffingConfig:
+            if not isinstance(value, dict):
+                raise ValueError(f"{name}: expected a table of StaffingConfig fields")
+            try:
+                value = StaffingConfig(**value)
+            except TypeError as e:
+                raise ValueError(f"{name}: {e}") from None
+        elif name.endswith('_rate_schedule'):
+            if not isinstance(value, dict):
+                raise ValueError(f"{name}: expected a table of date = rate")
+            value = {_date(when, milestone, f"{name} key"): _number(rate, f"{name}[{when}]")
+                     for when, rate in value.items()}
+        kwargs[name] = value
+
+    # Line-item amounts may name assumptions, so they resolve against the scalar fields
+    scalars = Assumptions(**kwargs)
+    for name in LINE_ITEMS:
+        if values.get(name) is not None:
+            if not isinstance(values[name], list):
+                raise ValueError(f"{name}: expected a list of line items")
+            kwargs[name] = [_line_item(item, milestone, scalars, name != 'recurring_expenses', f"{name}[{i}]")
+                            for i, item in enumerate(values[name])]
+    if values.get('events') is not None:
+        if not isinstance(values['events'], list):
+            raise ValueError("events: expected a list of events")
+        kwargs['events'] = [_event(e, scalars, f"events[{i}]") for i, e in enumerate(values['events'])]
+    if values.get('assets') is not None:
+        if not isinstance(values['assets'], list):
+            raise ValueError("assets: expected a list of assets")
+        kwargs['assets'] = [_asset(item, milestone, scalars, f"assets[{i}]") for i, item in enumerate(values['assets'])]
+
+    a = Assumptions(**kwargs).resolved()
+    if a.period_end < a.grand_opening:
+        raise ValueError(f"period_end {a.period_end:%Y-%m-%d} is before grand_opening {a.grand_opening:%Y-%m-%d}")
+    if a.useful_life <= 0:
+        raise ValueError(f"useful_life must be positive, got {a.useful_life}")
+    try:
+        a.asset_register  # validates the rows
+    except ValueError as e:
+        raise ValueError(f"assets: {e}") from None
+    return a
+
+
+def parse_scenario(data, path):
+    """
+    Parse the bytes of a scenario file; the format follows the extension of path.
+
+    Returns:
+    - dict: The parsed document.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.toml':
+        try:
+            return tomllib.loads(data.decode('utf-8'))
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(f"Invalid TOML: {e}") from None
+    if ext in ('.yaml', '.yml'):
+        yaml = _yaml()
+        try:
+            return yaml.safe_load(data)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML: {e}") from None
+    raise ValueError(f"Unsupported scenario file type '{ext}'; use {', '.join(EXTENSIONS)}")
+
+
+def _defaults_key():
+    # Resolved scenarios embed the model defaults, so cached ones are only valid while those hold
+    return scenario_key(Assumptions().resolved())
+
+
+class ScenarioCache:
+    """
+    Resolved scenarios keyed by path, modification time and size, backed by an optional
+    directory of pickles keyed by content hash so later runs skip parsing as well.
+
+    Parameters:
+    - directory (str, optional): Where to keep the pickles; memory only when None.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._entries = {}
+        self._defaults = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def stamp(path):
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def get(self, path, stamp):
+        entry = self._entries.get(os.path.abspath(path))
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, path, stamp, assumptions):
+        self._entries[os.path.abspath(path)] = (stamp, assumptions)
+
+    @property
+    def defaults(self):
+        if self._defaults is None:
+            self._defaults = _defaults_key()
+        return self._defaults
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+def _load_file(path, directory=None, defaults=None):
+    """
+    Read, parse and resolve one file, going through the content-hash pickles in
+    `directory` if given. Runs in the worker processes of load_scenarios().
+
+    Returns:
+    - Assumptions: The resolved scenario.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    pickled = None
+    if directory is not None:
+        key = digest(os.path.splitext(path)[1].lower(), hashlib.sha1(data).hexdigest(), defaults or _defaults_key())
+        pickled = os.path.join(directory, f"{key}.pkl")
+        if os.path.exists(pickled):
+            with open(pickled, 'rb') as f:
+                return pickle.load(f)
+
+    try:
+        a = resolve_document(parse_scenario(data, path))
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+
+    if pickled is not None:
+        os.makedirs(directory, exist_ok=True)
+        tmp = f"{pickled}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(a, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, pickled)
+    return a
+
+
+def _load_files(args):
+    paths, directory, defaults = args
+    return [_load_file(path, directory, defaults) for path in paths]
+
+
+# Shared by load_scenario() and load_scenarios() calls that do not pass their own cache
+_CACHE = ScenarioCache()
+
+
+def load_scenario(path, cache=None):
+    """
+    Load one scenario file.
+
+    Parameters:
+    - path (str): A .toml, .yaml or .yml file.
+    - cache (ScenarioCache, optional): Cache to go through; a process-wide one by default.
+
+    Returns:
+    - Assumptions: Resolved assumptions.
+
+    Raises:
+    - ValueError: If the file is invalid; the message starts with its path.
+    """
+    cache = _CACHE if cache is None else cache
+    stamp = cache.stamp(path)
+    a = cache.get(path, stamp)
+    if a is None:
+        a = _load_file(path, cache.directory, cache.defaults if cache.directory else None)
+        cache.put(path, stamp, a)
+    return a
+
+
+def scenario_paths(directory, recursive=False):
+    """
+    Scenario files in a directory, sorted by path.
+    """
+    if recursive:
+        paths = [os.path.join(root, name) for root, _, names in os.walk(directory) for name in names]
+    else:
+        paths = [entry.path for entry in os.scandir(directory) if entry.is_file()]
+    return sorted(path for path in paths if os.path.splitext(path)[1].lower() in EXTENSIONS)
+
+
+def load_scenarios(directory, recursive=False, cache=None, max_workers=None, chunksize=None):
+    """
+    Load every scenario file in a directory, parsing the files that are not cached across
+    a process pool.
+
+    Parameters:
+    - directory (str): Directory of .toml, .yaml and .yml files.
+    - recursive (bool): Include subdirectories.
+    - cache (ScenarioCache, optional): Cache to go through; a process-wide one by default.
+    - max_workers (int, optional): Worker processes; 1 parses in-process. By default a
+      pool is only started for PARALLEL_MIN_FILES or more cache misses.
+    - chunksize (int, optional): Files sent to a worker at a time; ~4 chunks per worker
+      by default.
+
+    Returns:
+    - dict: Scenario name (path relative to directory, without extension) -> Assumptions,
+      in path order.
+
+    Raises:
+    - ValueError: If a file is invalid, or two files share a name.
+    """
+    cache = _CACHE if cache is None else cache
+    paths = scenario_paths(directory, recursive)
+    names = [os.path.splitext(os.path.relpath(path, directory))[0] for path in paths]
+    if len(set(names)) < len(names):
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        raise ValueError(f"Scenario files with the same name: {', '.join(duplicates)}")
+
+    stamps = [cache.stamp(path) for path in paths]
+    loaded = [cache.get(path, stamp) for path, stamp in zip(paths, stamps)]
+    missing = [i for i, a in enumerate(loaded) if a is None]
+    defaults = cache.defaults if cache.directory else None
+
+    if max_workers is None:
+        max_workers = min(os.cpu_count() or 1, len(missing)) if len(missing) >= PARALLEL_MIN_FILES else 1
+    if max_workers <= 1:
+        results = [_load_file(paths[i], cache.directory, defaults) for i in missing]
+    else:
+        if chunksize is None:
+            chunksize = max(1, math.ceil(len(missing) / (max_workers * 4)))
+        chunks = [([paths[i] for i in missing[start:start + chunksize]], cache.directory, defaults)
+                  for start in range(0, len(missing), chunksize)]
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = [a for chunk in pool.map(_load_files, chunks) for a in chunk]
+
+    for i, a in zip(missing, results):
+        cache.put(paths[i], stamps[i], a)
+        loaded[i] = a
+    return dict(zip(names, loaded))
+
+
+def scenario_arrays(scenarios, names=SCENARIO_PARAMS):
+    """
+    Per-scenario parameters as arrays, e.g. to evaluate loaded files that differ only
+    in SCENARIO_PARAMS in one monte_carlo.simulate() pass.
+
+    Parameters:
+    - scenarios (dict or list): Assumptions, e.g. from load_scenarios().
+    - names (tuple): Numeric Assumptions fields or properties.
+
+    Returns:
+    - dict: Name -> array with one value per scenario.
+    """
+    scenarios = list(scenarios.values()) if isinstance(scenarios, dict) else list(scenarios)
+    return {name: np.array([getattr(a, name) for a in scenarios], dtype=float) for name in names}
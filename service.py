@@ -0,0 +1,275 @@
+"""
+HTTP/JSON scenario service.
+
+    python service.py --port 8080
+
+    POST /run                     {"assumptions": {"growth_rate": 0.08, ...}, "charts": ["cashflow"]}
+                                  -> {"key", "profit_loss": [...], "cashflow": [...], "charts": {name: url}}
+    GET  /charts/<key>/<chart>.<fmt>
+    GET  /health
+
+Model runs and chart renders go to a process pool, so the event loop never blocks on
+pandas or matplotlib. Results are cached by assumption hash, and identical requests that
+arrive while a run is in flight wait for that run instead of starting another.
+
+Requires aiohttp (pip install aiohttp); it is only imported when the app is created.
+"""
+import argparse
+import asyncio
+import json
+import numbers
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from model import Assumptions, CHARTS, FinancialModel
+from pipeline import StageCache, digest
+from store import scenario_key
+
+CHART_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml', 'pdf': 'application/pdf'}
+# Top-level keys of a POST /run body
+RUN_KEYS = ('assumptions', 'charts')
+# Keys every line item of each list field needs
+LINE_ITEM_KEYS = {
+    'recurring_expenses': ('Name', 'Amount'),
+    'unique_expenses': ('Date', 'Name', 'Amount'),
+    'unique_revenue': ('Date', 'Name', 'Amount'),
+    'assets': ('Date', 'Name', 'Amount'),
+}
+
+
+def _web():
+    try:
+        from aiohttp import web
+    except ImportError as e:
+        raise ImportError("The scenario service requires aiohttp: pip install aiohttp") from e
+    return web
+
+
+def evaluate(assumptions):
+    """
+    Run one scenario in a worker.
+
+    Returns:
+    - dict: 'frames' (profit_loss_df, cashflow_df, students_df) for rendering charts, and
+      the 'profit_loss' and 'cashflow' records pre-encoded as JSON bytes.
+    """
+    result = FinancialModel(assumptions).run()
+    return {
+        'frames': (result.profit_loss_df, result.cashflow_df, result.students_df),
+        'profit_loss': json.dumps(result.profit_loss_df.to_dict('records')).encode(),
+        'cashflow': json.dumps(result.cashflow_df.to_dict('records')).encode(),
+    }
+
+
+def check_line_items(assumptions):
+    """
+    Validate the line-item lists of a scenario before it goes to a worker, so a malformed
+    payload is a bad request instead of an error half-way through a run.
+
+    Raises:
+    - ValueError: On an item that is not an object, lacks a key, or has a name that is not
+      a string, an amount that is not a number or a date that does not parse.
+    """
+    for field, keys in LINE_ITEM_KEYS.items():
+        items = getattr(assumptions, field)
+        if items is None:
+            continue
+        if not isinstance(items, list):
+            raise ValueError(f"'{field}' must be a list of line items")
+        for i, item in enumerate(items):
+            where = f"{field}[{i}]"
+            if not isinstance(item, dict):
+                raise ValueError(f"{where} must be an object with {', '.join(keys)}")
+            missing = [k for k in keys if k not in item]
+            if missing:
+                raise ValueError(f"{where} is missing {', '.join(missing)}")
+            if not isinstance(item['Name'], str):
+                raise ValueError(f"{where}.Name must be a string")
+            if not isinstance(item['Amount'], numbers.Real) or isinstance(item['Amount'], bool):
+                raise ValueError(f"{where}.Amount must be a number")
+            if 'Date' in keys:
+                try:
+                    valid = not pd.isna(pd.Timestamp(item['Date']))
+                except (ValueError, TypeError):
+                    valid = False
+                if not valid:
+                    raise ValueError(f"{where}.Date is not a date: {item['Date']!r}")
+
+
+# One renderer per worker process and output format, so chart templates are reused
+_renderers = {}
+
+
+def render_chart(frames, chart, fmt, dpi):
+    """
+    Render one chart in a worker and return the file contents.
+    """
+    import visualize
+
+    renderer = _renderers.get((fmt, dpi))
+    if renderer is None:
+        renderer = _renderers[(fmt, dpi)] = visualize.ChartRenderer(dpi=dpi, fmt=fmt)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'chart.' + fmt)
+        visualize.render_charts(renderer, {chart: path}, *frames)
+        with open(path, 'rb') as f:
+            return f.read()
+
+
+class ScenarioService:
+    """
+    Evaluates scenarios on a process pool behind a content-addressed cache.
+
+    Parameters:
+    - max_workers (int, optional): Worker processes; defaults to the CPU count.
+    - cache_size (int): Scenario results kept in memory.
+    - chart_cache_size (int): Rendered charts kept in memory.
+    - dpi (int): Resolution of raster charts.
+    """
+
+    def __init__(self, max_workers=None, cache_size=256, chart_cache_size=64, dpi=150):
+        self.max_workers = max_workers
+        self.results = StageCache(maxsize=cache_size)
+        self.charts = StageCache(maxsize=chart_cache_size)
+        self.dpi = dpi
+        self._pool = None
+        self._pending = {}
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def _cached(self, cache, key, func, *args):
+        """
+        Return cache[key], computing func(*args) on the pool at most once per key.
+        """
+        found, value = cache.get(key)
+        if found:
+            return value
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = asyncio.ensure_future(self._compute(cache, key, func, *args))
+        # Shielded, so a waiter that is cancelled does not cancel the run the others wait for
+        return await asyncio.shield(pending)
+
+    async def _compute(self, cache, key, func, *args):
+        try:
+            value = await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+            cache.put(key, value)
+            return value
+        finally:
+            del self._pending[key]
+
+    async def run(self, values):
+        """
+        Evaluate the scenario described by a dict of Assumptions fields.
+
+        Returns:
+        - tuple: (scenario key, evaluate() output).
+
+        Raises:
+        - ValueError: If the payload holds unknown assumptions or malformed line items,
+          see check_line_items().
+        """
+        assumptions = Assumptions.from_dict(values)
+        check_line_items(assumptions)
+        key = scenario_key(assumptions.resolved())
+        entry = await self._cached(self.results, key, evaluate, assumptions)
+        return key, entry
+
+    async def chart(self, key, chart, fmt):
+        """
+        Chart file contents for a scenario that has been run, or None if it is not cached.
+        """
+        found, entry = self.results.get(key)
+        if not found:
+            return None
+        return await self._cached(self.charts, digest(key, chart, fmt), render_chart,
+                                  entry['frames'], chart, fmt, self.dpi)
+
+
+def create_app(service=None):
+    """
+    Build the aiohttp application around a ScenarioService.
+    """
+    web = _web()
+    service = service or ScenarioService()
+
+    async def run(request):
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            raise web.HTTPBadRequest(text="Request body must be JSON")
+        unknown = set(body) - set(RUN_KEYS) if isinstance(body, dict) else set()
+        if unknown:
+            raise web.HTTPBadRequest(text=f"Unknown keys: {', '.join(sorted(unknown))}; the body holds "
+                                          f"{', '.join(RUN_KEYS)}, with Assumptions fields under 'assumptions'")
+        values = body.get('assumptions', {}) if isinstance(body, dict) else None
+        charts = body.get('charts', []) if isinstance(body, dict) else []
+        if not isinstance(values, dict):
+            raise web.HTTPBadRequest(text="'assumptions' must be an object of Assumptions fields")
+        unknown = set(charts) - set(CHARTS)
+        if unknown:
+            raise web.HTTPBadRequest(text=f"Unknown charts: {', '.join(sorted(unknown))}; choose from {', '.join(CHARTS)}")
+        try:
+            key, entry = await service.run(values)
+        except (ValueError, TypeError) as e:
+            raise web.HTTPBadRequest(text=str(e))
+
+        # Stream the pre-encoded frames instead of building one large document
+        response = web.StreamResponse(headers={'Content-Type': 'application/json'})
+        await response.prepare(request)
+        await response.write(b'{"key": ' + json.dumps(key).encode())
+        await response.write(b', "profit_loss": ' + entry['profit_loss'])
+        await response.write(b', "cashflow": ' + entry['cashflow'])
+        urls = {chart: f"/charts/{key}/{chart}.png" for chart in charts}
+        await response.write(b', "charts": ' + json.dumps(urls).encode() + b'}')
+        await response.write_eof()
+        return response
+
+    async def chart(request):
+        name, _, fmt = request.match_info['chart'].rpartition('.')
+        if name not in CHARTS or fmt not in CHART_FORMATS:
+            raise web.HTTPNotFound(text=f"Unknown chart '{request.match_info['chart']}'")
+        content = await service.chart(request.match_info['key'], name, fmt)
+        if content is None:
+            raise web.HTTPNotFound(text="Unknown scenario; POST it to /run first")
+        return web.Response(body=content, content_type=CHART_FORMATS[fmt])
+
+    async def health(request):
+        return web.json_response({
+            'results': len(service.results),
+            'charts': len(service.charts),
+            'hits': service.results.hits,
+            'misses': service.results.misses,
+            'in_flight': len(service._pending),
+        })
+
+    async def shutdown(app):
+        service.close()
+
+    app = web.Application()
+    app.router.add_post('/run', run)
+    app.router.add_get('/charts/{key}/{chart}', chart)
+    app.router.add_get('/health', health)
+    app.on_cleanup.append(shutdown)
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve scenario runs over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    args = parser.parse_args()
+    _web().run_app(create_app(ScenarioService(max_workers=args.workers)), host=args.host, port=args.port)
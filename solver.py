@@ -0,0 +1,270 @@
+import numpy as np
+
+from model import Assumptions, FinancialModel
+from monte_carlo import SCENARIO_PARAMS
+from sweep import METRICS, evaluate_points, model_points, vector_engine_applies
+
+# Assumptions that enter the vector engine through their sum, starting_cash (and heloc_limit)
+CASH_PARAMS = ('starting_heloc', 'starting_liquid')
+# Dollar amounts closer than this to a bound or target count as on it; with heloc_draws a
+# fully drawn month ends at zero cash give or take float rounding (~1e-10)
+ATOL = 1e-6
+
+
+class Problem:
+    """
+    Batched evaluation of the headline metrics around a base case.
+
+    Parameters:
+    - assumptions (Assumptions, optional): Base case for every parameter not searched.
+    """
+
+    def __init__(self, assumptions=None):
+        self.assumptions = assumptions or Assumptions()
+        self.model = FinancialModel(self.assumptions)
+        self.vector = vector_engine_applies(self.model.assumptions)
+        self.inputs = self.model.scenario_inputs() if self.vector else None
+        self.evaluations = 0
+
+    def metrics(self, points):
+        """
+        Metrics for a batch of points.
+
+        Parameters:
+        - points (dict): Parameter name -> 1-D array. Names are SCENARIO_PARAMS plus
+          'starting_heloc' and 'starting_liquid'.
+
+        Returns:
+        - dict: Metric name -> array, see sweep.evaluate_points(). Assumptions the vector
+          engine does not model are evaluated with full model runs (sweep.model_points()).
+
+        Raises:
+        - ValueError: On an unknown name, or starting_cash together with its parts.
+        """
+        params, cash = {}, {}
+        for name, values in points.items():
+            values = np.atleast_1d(np.asarray(values, dtype=float))
+            if name in CASH_PARAMS:
+                cash[name] = values
+            elif name in SCENARIO_PARAMS:
+                params[name] = values
+            else:
+                raise ValueError(f"Cannot solve for '{name}'; choose from {', '.join(SCENARIO_PARAMS + CASH_PARAMS)}")
+        if cash and 'starting_cash' in params:
+            raise ValueError("starting_cash is starting_liquid + starting_heloc; solve for it or for its parts")
+        self.evaluations += len(next(iter(points.values())))
+
+        if not self.vector:
+            return model_points({**params, **cash}, self.assumptions)
+        if cash:
+            a = self.model.assumptions
+            params['starting_cash'] = cash.get('starting_liquid', a.starting_liquid) + cash.get('starting_heloc', a.starting_heloc)
+        if 'starting_heloc' in cash:
+            # The credit line also caps the debt interest accrues on
+            params['heloc_limit'] = cash['starting_heloc']
+        return evaluate_points(params, self.model.assumptions, self.inputs)
+
+
+def feasible(metrics, constraints, atol=ATOL):
+    """
+    Which points satisfy every constraint.
+
+    Parameters:
+    - metrics (dict): Metric name -> array.
+    - constraints (dict): Metric name -> (lower, upper); either bound may be None. A NaN
+      metric (e.g. never breaking even) fails any bound.
+    - atol (float): How far a metric may fall outside a bound and still satisfy it.
+
+    Returns:
+    - np.ndarray: Boolean mask.
+    """
+    ok = np.ones(len(next(iter(metrics.values()))), dtype=bool)
+    for name, (lower, upper) in constraints.items():
+        if name not in METRICS:
+            raise ValueError(f"Unknown metric '{name}'; choose from {', '.join(METRICS)}")
+        values = metrics[name]
+        if lower is not None:
+            ok &= values >= lower - atol
+        if upper is not None:
+            ok &= values <= upper + atol
+    return ok
+
+
+def _brent(f, a, b, xtol, ftol=ATOL, maxiter=100):
+    """
+    Root of f in [a, b] by Brent's method (inverse quadratic interpolation with a
+    bisection fallback). f(a) and f(b) must differ in sign, unless one is within ftol
+    of zero.
+    """
+    fa, fb = f(a), f(b)
+    if abs(fa) <= ftol:
+        return a
+    if abs(fb) <= ftol:
+        return b
+    if np.sign(fa) == np.sign(fb):
+        raise ValueError(f"The target is not bracketed: f({a:g})={fa:g} and f({b:g})={fb:g} have the same sign")
+
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(maxiter):
+        if np.sign(fb) == np.sign(fc):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        tol = 2 * np.finfo(float).eps * abs(b) + xtol / 2
+        m = (c - b) / 2
+        if abs(m) <= tol or abs(fb) <= ftol:
+            return b
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            # Secant (a == c) or inverse quadratic interpolation step
+            s = fb / fa
+            if a == c:
+                p, q = 2 * m * s, 1 - s
+            else:
+                q, r = fa / fc, fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+        a, fa = b, fb
+        b += d if abs(d) > tol else np.copysign(tol, m)
+        fb = f(b)
+    return b
+
+
+def goal_seek(param, metric, target, bounds, assumptions=None, xtol=1e-6):
+    """
+    Value of one parameter at which a metric hits a target, by Brent's method.
+
+    Use it for continuous metrics (min_cash, cumulative_profit); breakeven_month moves in
+    whole months, so search it with lowest_feasible() instead. A metric within ATOL of
+    the target counts as hitting it. Where the metric stays at the target over a range,
+    e.g. min_cash with heloc_draws once the line covers every shortfall, any value in the
+    range may be returned; lowest_feasible() finds its lower end.
+
+    Parameters:
+    - param (str): Parameter to solve for, see Problem.metrics().
+    - metric (str): One of sweep.METRICS.
+    - target (float): Value the metric should take.
+    - bounds (tuple): (low, high) bracket; the metric minus the target must change sign in
+      it, or be within ATOL of zero at one end.
+    - assumptions (Assumptions, optional): Base case.
+    - xtol (float): Absolute tolerance on the parameter.
+
+    Returns:
+    - float: The parameter value.
+
+    Raises:
+    - ValueError: If the target is not bracketed by bounds.
+
+    Example: the HELOC that makes the lowest monthly cash balance exactly zero
+        goal_seek('starting_heloc', 'min_cash', 0, (0, 500000))
+    """
+    problem = Problem(assumptions)
+    return _brent(lambda x: problem.metrics({param: [x]})[metric][0] - target, *bounds, xtol)
+
+
+def lowest_feasible(param, constraints, bounds, assumptions=None, highest=False, batch=64, xtol=1e-6):
+    """
+    Lowest (or highest) value of one parameter that satisfies every constraint.
+
+    The bracket is searched by batched k-section: each step evaluates `batch` points
+    across the bracket in one vectorized pass and keeps the interval where feasibility
+    switches, shrinking it by a factor of batch - 1. Feasibility is assumed to switch
+    once across bounds.
+
+    Parameters:
+    - param (str): Parameter to search, see Problem.metrics().
+    - constraints (dict): Metric name -> (lower, upper), see feasible().
+    - bounds (tuple): (low, high) search range.
+    - assumptions (Assumptions, optional): Base case.
+    - highest (bool): Find the highest feasible value instead, e.g. for interest_rate.
+    - batch (int): Points per vectorized pass.
+    - xtol (float): Absolute tolerance on the parameter.
+
+    Returns:
+    - float or None: The boundary value (feasible side), or None if no value in bounds
+      is feasible.
+
+    Example: the lowest price that keeps cash on hand non-negative every month
+        lowest_feasible('monthly_student_price', {'min_cash': (0, None)}, (100, 400))
+    """
+    problem = Problem(assumptions)
+    low, high = map(float, bounds)
+    while True:
+        grid = np.linspace(low, high, batch)
+        ok = feasible(problem.metrics({param: grid}), constraints)
+        if highest:
+            grid, ok = grid[::-1], ok[::-1]
+        if not ok.any():
+            return None
+        first = int(np.argmax(ok))
+        if first == 0 or abs(grid[first] - grid[first - 1]) <= xtol:
+            return float(grid[first])
+        low, high = sorted((grid[first - 1], grid[first]))
+
+
+def optimize(objective, bounds, constraints=None, assumptions=None, batch=4096, iterations=12, elite=0.05, seed=None):
+    """
+    Gradient-free search over several parameters (cross-entropy style).
+
+    Each iteration samples `batch` points in the current box, evaluates them in one
+    vectorized pass, and shrinks the box around the best feasible fraction `elite`.
+
+    Parameters:
+    - objective (str or callable): A metric name to maximize, or a function
+      f(points, metrics) -> array to minimize, e.g.
+      lambda p, m: p['monthly_student_price'] + p['starting_heloc'] / 1000.
+    - bounds (dict): Parameter name -> (low, high).
+    - constraints (dict, optional): Metric name -> (lower, upper), see feasible().
+    - assumptions (Assumptions, optional): Base case.
+    - batch (int): Points per iteration.
+    - iterations (int): Number of iterations.
+    - elite (float): Fraction of the batch the next box is fitted to.
+    - seed (int, optional): Seed for the NumPy Generator.
+
+    Returns:
+    - dict: The best feasible point's parameters and metrics, or None if no sampled point
+      was feasible.
+    """
+    if isinstance(objective, str):
+        metric = objective
+        objective = lambda points, metrics: -metrics[metric]
+
+    rng = np.random.default_rng(seed)
+    problem = Problem(assumptions)
+    names = list(bounds)
+    low = np.array([bounds[name][0] for name in names], dtype=float)
+    high = np.array([bounds[name][1] for name in names], dtype=float)
+    best, best_score = None, np.inf
+
+    for _ in range(iterations):
+        samples = rng.uniform(low, high, (batch, len(names)))
+        points = {name: samples[:, i] for i, name in enumerate(names)}
+        metrics = problem.metrics(points)
+        score = np.asarray(objective(points, metrics), dtype=float)
+        score = np.where(feasible(metrics, constraints or {}) & ~np.isnan(score), score, np.inf)
+
+        i = int(np.argmin(score))
+        if score[i] < best_score:
+            best_score = score[i]
+            best = {**{name: points[name][i] for name in names}, **{name: metrics[name][i] for name in METRICS}}
+
+        n_elite = max(2, int(batch * elite))
+        elites = samples[np.argsort(score)[:n_elite]]
+        elites = elites[np.isfinite(np.sort(score)[:n_elite])]
+        if len(elites) < 2:
+            continue  # nothing feasible yet; keep sampling the same box
+        spread = elites.max(axis=0) - elites.min(axis=0)
+        low = np.maximum(low, elites.min(axis=0) - 0.1 * spread)
+        high = np.minimum(high, elites.max(axis=0) + 0.1 * spread)
+    return best
@@ -0,0 +1,173 @@
+"""
+Three-statement accounting: income statement, balance sheet and indirect cashflow.
+
+    s = build_statements(result.all_revenue_df, result.all_expenses_df, result.debt_schedule_df,
+                         result.calendar, paid_in_capital=50000)
+    s.balance_sheet      # Cash, Deposits, Fixed Assets, Accumulated Depreciation, HELOC, equity
+
+Ledger rows are classified through the chart of accounts (see accounts.py): capex and
+deposits are capitalized on the balance sheet instead of being expensed, and depreciation
+is expensed but never paid, so it is added back to reach operating cash flow. Every
+statement is computed from the monthly totals by account type with array arithmetic over
+the last axis, so three_statements() evaluates many sites or scenarios at once.
+"""
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+from accounts import ACCOUNT_TYPES, CHART
+
+_TYPE = {name: i for i, name in enumerate(ACCOUNT_TYPES)}
+
+
+@dataclass
+class Statements:
+    """
+    Output of build_statements(); one row per month in each frame.
+    """
+    income_statement: pd.DataFrame
+    balance_sheet: pd.DataFrame
+    cashflow_statement: pd.DataFrame
+
+
+def type_totals(revenue_df, expenses_df, calendar, chart=CHART):
+    """
+    Monthly totals by account type of a revenue and an expense ledger.
+
+    Names not in the chart count as revenue in revenue_df and as operating expenses in
+    expenses_df.
+
+    Returns:
+    - np.ndarray: (len(ACCOUNT_TYPES) x len(calendar)) totals.
+    """
+    totals = np.zeros((len(ACCOUNT_TYPES), len(calendar)))
+    for df, default in ((revenue_df, 'revenue'), (expenses_df, 'opex')):
+        codes = chart.codes(df['Name'], default)
+        totals += chart.type_totals(codes, calendar.offset(df['Date']), df['Amount'].values, len(calendar))
+    return totals
+
+
+def operating_cash_flow(revenue_df, expenses_df, calendar, chart=CHART):
+    """
+    Cash in minus cash out per calendar month: revenue less every expense except
+    depreciation, capital outlays included.
+    """
+    t = type_totals(revenue_df, expenses_df, calendar, chart)
+    return t[_TYPE['revenue']] - (t.sum(axis=0) - t[_TYPE['revenue']] - t[_TYPE['depreciation']])
+
+
+def month_end_balance(debt_schedule_df, calendar):
+    """
+    A debt_schedule() 'Balance' on every calendar month: zero before the schedule starts,
+    carried forward after it ends.
+    """
+    balance = np.zeros(len(calendar))
+    if len(debt_schedule_df):
+        offsets = calendar.offset(debt_schedule_df.index)
+        inside = (offsets >= 0) & (offsets < len(calendar))
+        balance[offsets[inside]] = debt_schedule_df['Balance'].values[inside]
+        last = offsets[inside].max()
+        balance[last + 1:] = balance[last]
+    return balance
+
+
+def three_statements(totals, heloc_balance, paid_in_capital):
+    """
+    Income statement, balance sheet and cashflow lines from monthly totals by type.
+
+    Parameters:
+    - totals (np.ndarray): (..., len(ACCOUNT_TYPES), n_months) totals, see type_totals();
+      leading axes are e.g. sites or scenarios.
+    - heloc_balance (np.ndarray): (..., n_months) HELOC balance at each month end.
+    - paid_in_capital (float or np.ndarray): Liquid cash contributed before the first
+      month, broadcast against the leading axes.
+
+    Returns:
+    - dict: (..., n_months) arrays keyed by line name.
+    """
+    t = {name: totals[..., i, :] for name, i in _TYPE.items()}
+    gross_margin = t['revenue'] - t['cogs']
+    ebitda = gross_margin - t['opex']
+    ebit = ebitda - t['depreciation']
+    net_income = ebit - t['financing'] - t['tax']
+
+    operating = net_income + t['depreciation']
+    investing = 0.0 - (t['capex'] + t['deposit'])
+    financing = np.diff(heloc_balance, axis=-1, prepend=0)
+    paid_in_capital = np.asarray(paid_in_capital, dtype=float)[..., None]
+    cash = paid_in_capital + np.cumsum(operating + investing + financing, axis=-1)
+
+    fixed_assets = np.cumsum(t['capex'], axis=-1)
+    accumulated_depreciation = np.cumsum(t['depreciation'], axis=-1)
+    deposits = np.cumsum(t['deposit'], axis=-1)
+    retained_earnings = np.cumsum(net_income, axis=-1)
+    total_assets = cash + deposits + fixed_assets - accumulated_depreciation
+    return {
+        'Revenue': t['revenue'],
+        'COGS': t['cogs'],
+        'Gross Margin': gross_margin,
+        'Operating Expenses': t['opex'],
+        'EBITDA': ebitda,
+        'Depreciation': t['depreciation'],
+        'EBIT': ebit,
+        'Interest': t['financing'],
+        'Taxes': t['tax'],
+        'Net Income': net_income,
+
+        'Operating Cash Flow': operating,
+        'Capital Expenditures': 0.0 - t['capex'],
+        'Deposits Paid': 0.0 - t['deposit'],
+        'Investing Cash Flow': investing,
+        'HELOC Draws': financing,
+        'Net Change in Cash': operating + investing + financing,
+
+        'Cash': cash,
+        'Deposits': deposits,
+        'Fixed Assets': fixed_assets,
+        'Accumulated Depreciation': accumulated_depreciation,
+        'Net Fixed Assets': fixed_assets - accumulated_depreciation,
+        'Total Assets': total_assets,
+        'HELOC Balance': np.broadcast_to(heloc_balance, total_assets.shape),
+        'Paid-in Capital': np.broadcast_to(paid_in_capital, total_assets.shape),
+        'Retained Earnings': retained_earnings,
+        'Total Liabilities & Equity': heloc_balance + paid_in_capital + retained_earnings,
+    }
+
+
+INCOME_STATEMENT = ('Revenue', 'COGS', 'Gross Margin', 'Operating Expenses', 'EBITDA', 'Depreciation', 'EBIT',
+                    'Interest', 'Taxes', 'Net Income')
+CASHFLOW_STATEMENT = ('Net Income', 'Depreciation', 'Operating Cash Flow', 'Capital Expenditures', 'Deposits Paid',
+                      'Investing Cash Flow', 'HELOC Draws', 'Net Change in Cash', 'Cash')
+BALANCE_SHEET = ('Cash', 'Deposits', 'Fixed Assets', 'Accumulated Depreciation', 'Net Fixed Assets', 'Total Assets',
+                 'HELOC Balance', 'Paid-in Capital', 'Retained Earnings', 'Total Liabilities & Equity')
+
+
+def build_statements(revenue_df, expenses_df, debt_schedule_df, calendar, paid_in_capital, chart=CHART,
+                     months=None):
+    """
+    The three statements of one run, over the months from its first to its last line item.
+
+    Parameters:
+    - revenue_df (DataFrame): Date/Name/Amount revenues.
+    - expenses_df (DataFrame): Date/Name/Amount expenses, interest included.
+    - debt_schedule_df (DataFrame): Output of expenses.debt_schedule().
+    - calendar (periods.Calendar): Months of the run.
+    - paid_in_capital (float): Liquid cash on hand before the first month.
+    - chart (ChartOfAccounts): Chart to classify the line items with.
+    - months (slice, optional): Calendar months to report; the span of the line items by
+      default.
+
+    Returns:
+    - Statements: Frames with a 'Period' column and the lines of INCOME_STATEMENT,
+      BALANCE_SHEET and CASHFLOW_STATEMENT.
+    """
+    lines = three_statements(type_totals(revenue_df, expenses_df, calendar, chart),
+                             month_end_balance(debt_schedule_df, calendar), paid_in_capital)
+    if months is None:
+        months = calendar.span(revenue_df['Date'], expenses_df['Date'])
+
+    def frame(names):
+        return pd.DataFrame({'Period': calendar.labels[months], **{name: lines[name][months] for name in names}})
+
+    return Statements(income_statement=frame(INCOME_STATEMENT), balance_sheet=frame(BALANCE_SHEET),
+                      cashflow_statement=frame(CASHFLOW_STATEMENT))
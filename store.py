@@ -0,0 +1,278 @@
+"""
+Columnar on-disk archive of scenario runs.
+
+Each run is written once under its assumption hash. Runs written together form a batch,
+and each table of a batch is split into one file per year:
+
+    <root>/scenarios/<key>.json                  assumptions, for audit
+    <root>/<table>/year=<YYYY>/<batch>.parquet   expenses, revenue, profit_loss, cashflow and the statements
+
+Rows are sorted by 'Date' and 'Scenario' and every month is its own row group (record
+batch for 'arrow'), so a date range prunes whole year directories from the partition
+path and whole months from the row-group statistics before anything is decoded; scenario
+and line-item name filters are dataset predicates as well. Writing many scenarios per
+batch (write_batch()) keeps the file count at tables x years per batch instead of per
+scenario. The 'arrow' format stores uncompressed Arrow IPC files, which are memory-mapped
+and read without copying; Parquet files are smaller but have to be decoded.
+
+Requires pyarrow (pip install pyarrow); it is only imported when a store is used.
+"""
+import dataclasses
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from pipeline import fingerprint, digest
+
+# Table name -> ModelResult field
+TABLES = {
+    'expenses': 'all_expenses_df',
+    'revenue': 'all_revenue_df',
+    'profit_loss': 'profit_loss_df',
+    'cashflow': 'cashflow_df',
+    'income_statement': 'income_statement_df',
+    'balance_sheet': 'balance_sheet_df',
+    'cashflow_statement': 'cashflow_statement_df',
+}
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.fs
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("The results store requires pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def scenario_key(assumptions):
+    """
+    Hash of every assumption field; equal assumptions map to the same stored scenario.
+
+    Parameters:
+    - assumptions (Assumptions): Resolved assumptions, e.g. FinancialModel(...).assumptions.
+    """
+    return digest(*(f'{f.name}={fingerprint(getattr(assumptions, f.name))}'
+                    for f in dataclasses.fields(assumptions)))
+
+
+def _table_frame(table, df):
+    df = df.reset_index(drop=True)
+    # Categorical line-item names are stored as strings so every file has the same schema;
+    # Parquet dictionary-encodes them anyway
+    categorical = [name for name, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    if categorical:
+        df = df.astype({name: object for name in categorical})
+    if 'Date' not in df:
+        # Monthly frames are keyed by 'MM-YYYY' periods; add the month-end date to filter on
+        df.insert(0, 'Date', pd.to_datetime(df['Period'], format='%m-%Y') + pd.offsets.MonthEnd(0))
+    return df
+
+
+class ResultStore:
+    """
+    Partitioned, append-only store of ModelResult tables keyed by assumption hash.
+
+    Usage:
+        store = ResultStore("results")
+        key = store.write(model.assumptions, model.run())
+        keys = store.write_batch((m.assumptions, m.run()) for m in models)
+        june = store.read('profit_loss', start='2025-06-01', end='2025-06-30')
+
+    Parameters:
+    - root (str): Directory of the store; created if missing.
+    - fmt (str): 'parquet' (compressed) or 'arrow' (uncompressed IPC, zero-copy reads).
+    """
+
+    def __init__(self, root, fmt='parquet'):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown store format '{fmt}'; choose from {', '.join(FORMATS)}")
+        self.root = root
+        self.fmt = fmt
+        os.makedirs(os.path.join(root, 'scenarios'), exist_ok=True)
+
+    def _path(self, table, year, batch):
+        return os.path.join(self.root, table, f'year={year}', batch + FORMATS[self.fmt])
+
+    def _write_file(self, df, path):
+        """
+        Write the rows of one year, one row group (record batch) per month.
+        """
+        pa = _arrow()
+        arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+        months = df['Date'].dt.to_period('M').to_numpy()
+        bounds = np.concatenate([[0], np.flatnonzero(months[1:] != months[:-1]) + 1, [len(df)]])
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Dot-prefixed files are ignored by dataset discovery until renamed into place
+        tmp = os.path.join(os.path.dirname(path), '.' + os.path.basename(path))
+        if self.fmt == 'parquet':
+            writer = pa.parquet.ParquetWriter(tmp, arrow_table.schema)
+        else:
+            writer = pa.ipc.new_file(tmp, arrow_table.schema)
+        with writer:
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                writer.write_table(arrow_table.slice(start, stop - start))
+        os.replace(tmp, path)
+
+    def _discard(self, keys):
+        """
+        Rewrite the stored files holding rows of `keys` without them.
+        """
+        pa = _arrow()
+        is_stored = pa.dataset.field('Scenario').isin(keys)
+        for table in TABLES:
+            if not os.path.isdir(os.path.join(self.root, table)):
+                continue
+            for fragment in self.dataset(table).get_fragments():
+                columns = fragment.physical_schema.names
+                if not fragment.count_rows(filter=is_stored):
+                    continue
+                kept = fragment.to_table(columns=columns, filter=~is_stored)
+                if kept.num_rows:
+                    self._write_file(kept.to_pandas(), fragment.path)
+                else:
+                    os.remove(fragment.path)
+
+    def __contains__(self, key):
+        return os.path.exists(os.path.join(self.root, 'scenarios', key + '.json'))
+
+    def scenarios(self):
+        """
+        Keys of every stored scenario.
+        """
+        return sorted(name[:-len('.json')] for name in os.listdir(os.path.join(self.root, 'scenarios'))
+                      if name.endswith('.json'))
+
+    def assumptions(self, key):
+        """
+        The stored assumptions of a scenario as a dict (dates as ISO strings).
+        """
+        with open(os.path.join(self.root, 'scenarios', key + '.json')) as f:
+            return json.load(f)
+
+    def write(self, assumptions, result, overwrite=False):
+        """
+        Archive one run, as a batch of one; see write_batch().
+
+        Returns:
+        - str: The scenario key.
+        """
+        return self.write_batch([(assumptions, result)], overwrite)[0]
+
+    def write_batch(self, runs, overwrite=False):
+        """
+        Archive several runs into one set of files per table and year. Runs are
+        content-addressed, so already stored scenarios are skipped unless overwrite is set.
+
+        Parameters:
+        - runs (iterable): (assumptions, result) pairs: resolved Assumptions and the
+          ModelResult of FinancialModel.run().
+        - overwrite (bool): Rewrite the scenarios that are already stored; their rows are
+          removed from the batches they were written with.
+
+        Returns:
+        - list: The scenario key of every run, in order.
+        """
+        _arrow()
+        runs = [(scenario_key(assumptions), assumptions, result) for assumptions, result in runs]
+        keys = [key for key, _, _ in runs]
+        new = {}
+        for key, assumptions, result in runs:
+            if key not in new and (overwrite or key not in self):
+                new[key] = (assumptions, result)
+        if not new:
+            return keys
+        if overwrite:
+            self._discard([key for key in new if key in self])
+
+        # Named after its scenarios, so retrying an interrupted batch replaces its files
+        batch = digest(*sorted(new))
+        for table, field in TABLES.items():
+            frames = []
+            for key, (_, result) in new.items():
+                df = _table_frame(table, getattr(result, field))
+                df.insert(0, 'Scenario', key)
+                frames.append(df)
+            df = pd.concat(frames, ignore_index=True).sort_values(['Date', 'Scenario'], kind='stable')
+            for year, rows in df.groupby(df['Date'].dt.year, sort=True):
+                self._write_file(rows.reset_index(drop=True), self._path(table, year, batch))
+
+        # The JSON marks a scenario complete, so it is written last
+        for key, (assumptions, _) in new.items():
+            path = os.path.join(self.root, 'scenarios', key + '.json')
+            with open(path + '.tmp', 'w') as f:
+                json.dump(dataclasses.asdict(assumptions), f, indent=2, default=str)
+            os.replace(path + '.tmp', path)
+        return keys
+
+    def dataset(self, table):
+        """
+        The pyarrow Dataset of one table, backed by memory-mapped files.
+        """
+        pa = _arrow()
+        if table not in TABLES:
+            raise ValueError(f"Unknown table '{table}'; choose from {', '.join(TABLES)}")
+        path = os.path.join(self.root, table)
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"No '{table}' data stored in {self.root}")
+        return pa.dataset.dataset(path, format='parquet' if self.fmt == 'parquet' else 'ipc',
+                                  partitioning=pa.dataset.partitioning(pa.schema([('year', pa.int32())]), flavor='hive'),
+                                  filesystem=pa.fs.LocalFileSystem(use_mmap=True))
+
+    def _filter(self, scenarios=None, start=None, end=None, names=None):
+        pa = _arrow()
+        field = pa.dataset.field
+        conditions = []
+        if scenarios is not None:
+            scenarios = [scenarios] if isinstance(scenarios, str) else list(scenarios)
+            conditions.append(field('Scenario').isin(scenarios))
+        # The year conditions prune whole directories before any file is opened
+        if start is not None:
+            conditions.append(field('year') >= pd.Timestamp(start).year)
+            conditions.append(field('Date') >= pd.Timestamp(start))
+        if end is not None:
+            conditions.append(field('year') <= pd.Timestamp(end).year)
+            conditions.append(field('Date') <= pd.Timestamp(end))
+        if names is not None:
+            conditions.append(field('Name').isin([names] if isinstance(names, str) else list(names)))
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def scan(self, table, scenarios=None, start=None, end=None, names=None, columns=None, batch_size=65536):
+        """
+        Stream the matching rows as pyarrow RecordBatches, so aggregates over many
+        scenarios run in bounded memory. Arguments are as for read().
+        """
+        return self.dataset(table).to_batches(columns=columns, filter=self._filter(scenarios, start, end, names),
+                                              batch_size=batch_size)
+
+    def read(self, table, scenarios=None, start=None, end=None, names=None, columns=None, as_arrow=False):
+        """
+        Load the rows of one table matching every given filter.
+
+        Parameters:
+        - table (str): One of TABLES.
+        - scenarios (str or list, optional): Scenario key(s) to load.
+        - start, end (str or datetime, optional): Inclusive 'Date' range.
+        - names (str or list, optional): Line-item names ('expenses' and 'revenue' only).
+        - columns (list, optional): Columns to load; all by default.
+        - as_arrow (bool): Return the pyarrow Table instead of a DataFrame.
+
+        Returns:
+        - DataFrame or pyarrow.Table: Matching rows, with a 'Scenario' column.
+        """
+        arrow_table = self.dataset(table).to_table(columns=columns, filter=self._filter(scenarios, start, end, names))
+        if as_arrow:
+            return arrow_table
+        df = arrow_table.to_pandas()
+        return df.drop(columns='year', errors='ignore')
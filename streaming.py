@@ -0,0 +1,353 @@
+"""
+Streaming simulation for long horizons and daily granularity.
+
+stream() yields one PeriodTotals per month or per day and keeps only rolling state
+(cash, debt, the current month's line items) plus one depreciation and rate entry per
+month, so memory does not grow with the number of periods.
+Subscribers consume the stream as it is produced:
+
+    a = Assumptions(period_end=datetime(2044, 12, 31))
+    yearly, path = run_stream(stream(a, freq='D'), Aggregator('Y'), CSVWriter('daily.csv'))
+"""
+import csv
+from collections import deque
+from dataclasses import dataclass, asdict
+
+import numpy as np
+import pandas as pd
+
+from accounts import CHART
+from events import event_frame
+from expenses import interest_payment
+from labor import labor_costs
+from model import Assumptions
+from periods import Calendar
+from revenue import revenue_growth_df
+from schedules import monthly_depreciation, rate_table, tax_and_royalty
+
+# PeriodTotals field -> column name in the frames built by subscribers
+COLUMNS = {
+    'date': 'Date',
+    'revenue': 'Revenue',
+    'expenses': 'Expenses',
+    'interest': 'Interest',
+    'profit_loss': 'Profit Loss',
+    'cash': 'Cash On Hand',
+    'debt': 'HELOC Debt',
+    'students': 'Student_Count',
+}
+
+
+@dataclass
+class PeriodTotals:
+    """
+    Totals for one day or month of a stream().
+
+    Attributes:
+    - date (pd.Timestamp): Last day of the period.
+    - revenue (float): All revenue dated in the period.
+    - expenses (float): All expenses dated in the period, interest and depreciation
+      included; capex and deposits are capitalized and not part of it.
+    - interest (float): The interest payment part of expenses.
+    - profit_loss (float): revenue - expenses.
+    - cash (float): Cash on hand at the end of the period.
+    - debt (float): HELOC balance as of the latest month end.
+    - students (float): Enrollment in the period's month.
+    """
+    date: pd.Timestamp
+    revenue: float = 0.0
+    expenses: float = 0.0
+    interest: float = 0.0
+    profit_loss: float = 0.0
+    cash: float = 0.0
+    debt: float = 0.0
+    students: float = 0.0
+
+    def row(self):
+        return {COLUMNS[name]: value for name, value in asdict(self).items()}
+
+
+def _unique_items(a, seed):
+    """
+    One-off (date, revenue, expense, outlay, financed) items sorted by date. expense is the
+    profit/loss effect and outlay the cash paid; they differ for capital outlays.
+    """
+    items = []
+    # Line items not in the chart are accounts of this run only
+    with CHART.scoped():
+        for e in a.unique_expenses:
+            capital = CHART.type_of(e['Name']) in ('capex', 'deposit')
+            items.append((pd.Timestamp(e['Date']).normalize(), 0.0, 0.0 if capital else e['Amount'], e['Amount'], True))
+    items += [(pd.Timestamp(r['Date']).normalize(), r['Amount'], 0.0, 0.0, False) for r in a.unique_revenue]
+
+    # Random events (birthday parties) between the grand opening and the end of the model
+    events = event_frame(a.events, a.grand_opening, a.period_end, a.seed if seed is None else seed)
+    items += [(date, amount, 0.0, 0.0, False) for date, amount in zip(events['Date'], events['Amount'])]
+    return sorted(items, key=lambda item: item[0])
+
+
+def _month_items(a, month, unique, cursor, opening_month, depreciation, tax_rate, royalty_rate, billing_date,
+                 students):
+    """
+    Line items dated in `month` as (date, revenue, expense, outlay, financed) tuples and
+    the advanced cursor into `unique`. depreciation, the rates, the enrollment billing date
+    (NaT if none) and the student count are those of `month`.
+    """
+    month_end = month.to_timestamp(how='end').normalize()
+    period_end = pd.Timestamp(a.period_end)
+    items = []
+    while cursor < len(unique) and unique[cursor][0] <= month_end:
+        items.append(unique[cursor])
+        cursor += 1
+
+    if (month - opening_month).n >= 0 and month_end <= period_end:
+        # Recurring operating expenses, financed by the HELOC
+        for e in a.recurring_line_items:
+            items.append((month_end, 0.0, e['Amount'], e['Amount'], True))
+    if depreciation:
+        # Depreciation is expensed but never paid
+        items.append((month_end, 0.0, depreciation, 0.0, False))
+
+    if not pd.isna(billing_date):
+        enrollment = students * a.monthly_student_price
+        tax, royalty = tax_and_royalty(enrollment, tax_rate, royalty_rate)
+        labor = float(labor_costs(students, a.hourly_rate, a.staffing).total)
+        costs = labor + tax + royalty
+        items.append((billing_date.normalize(), enrollment, costs, costs, False))
+    return items, cursor
+
+
+def stream(assumptions=None, freq='M', seed=None):
+    """
+    Simulate the model one period at a time.
+
+    Follows FinancialModel's dating: recurring expenses and depreciation at month end,
+    enrollment revenue, labor, tax and royalty on the grand opening's day of the month
+    (clipped as in periods.Calendar.monthly_dates()), and the interest accrued on the month-end HELOC balance paid on the 1st of the next
+    month. Random events such as birthday parties are drawn as in FinancialModel, from
+    `seed` if given.
+
+    Parameters:
+    - assumptions (Assumptions, optional): Scenario to run; period_end sets the horizon.
+    - freq (str): 'M' for monthly or 'D' for daily periods.
+    - seed (int, optional): Seed of the event draws; assumptions.seed when omitted.
+
+    Yields:
+    - PeriodTotals: One per period, in date order.
+    """
+    if freq not in ('M', 'D'):
+        raise ValueError(f"freq must be 'M' or 'D', not '{freq}'")
+    a = (assumptions or Assumptions()).resolved()
+
+    unique = _unique_items(a, seed)
+    opening_month = pd.Period(a.grand_opening, freq='M')
+    first_month = min(pd.Period(unique[0][0], freq='M'), opening_month) if unique else opening_month
+    last_month = pd.Period(a.period_end, freq='M')
+
+    # Per-month depreciation, rates and enrollment, one entry per month whatever the period frequency
+    calendar = Calendar(first_month.start_time, last_month.start_time)
+    with CHART.scoped():
+        depreciation = monthly_depreciation(a.asset_register, calendar, a.period_end)
+    tax_rates, royalty_rates = rate_table(a.tax_rates, calendar), rate_table(a.royalty_rates, calendar)
+    interest_rates = rate_table(a.interest_rate if a.interest_rate_schedule is None else a.interest_rate_schedule,
+                                calendar)
+    enrollment = revenue_growth_df(a.go_student_count, a.monthly_student_price, a.growth_rate, a.ss_student_count,
+                                   a.grand_opening, a.period_end, calendar)
+    enrolled = calendar.offset(enrollment['Date'])
+    billing_dates = pd.Series(pd.NaT, index=range(len(calendar)), dtype='datetime64[ns]')
+    billing_dates[enrolled] = enrollment['Date'].values
+    student_counts = np.zeros(len(calendar))
+    student_counts[enrolled] = enrollment['Student_Count']
+
+    cursor = 0
+    cumulative_cash = 0.0       # revenue less cash paid out, since the start
+    owed = 0.0                  # HELOC balance at the last month end
+    liquid = a.starting_liquid  # heloc_draws: cash on hand before drawing
+    interest_due = 0.0          # accrued last month, paid on the 1st
+    recent_draws = deque(maxlen=a.amortization_months or 1)
+    horizon_end = pd.Timestamp(a.period_end).normalize()
+
+    def cash_on_hand():
+        if a.heloc_draws:
+            # Only the liquid cash is on hand up front; the HELOC adds whatever has been drawn
+            return a.starting_liquid + cumulative_cash + owed
+        return a.starting_cash + cumulative_cash
+
+    month = first_month
+    while month <= last_month:
+        offset = (month - first_month).n
+        students = student_counts[offset]
+        items, cursor = _month_items(a, month, unique, cursor, opening_month, depreciation[offset], tax_rates[offset],
+                                     royalty_rates[offset], billing_dates[offset], students)
+        month_start = month.to_timestamp(how='start')
+        last_day = min(month.to_timestamp(how='end').normalize(), horizon_end)
+        if interest_due:
+            items.append((month_start, 0.0, interest_due, interest_due, False))
+        interest_paid = interest_due
+
+        if freq == 'M':
+            revenue = sum(item[1] for item in items)
+            expenses = sum(item[2] for item in items)
+            cumulative_cash += revenue - sum(item[3] for item in items)
+        else:
+            by_day = {}
+            for date, revenue, expense, outlay, _ in items:
+                day = by_day.setdefault(date, [0.0, 0.0, 0.0])
+                day[0] += revenue
+                day[1] += expense
+                day[2] += outlay
+            for day in pd.date_range(month_start, last_day, freq='D'):
+                revenue, expenses, outlays = by_day.get(day, (0.0, 0.0, 0.0))
+                cumulative_cash += revenue - outlays
+                if day == last_day:
+                    break  # emitted after the month-end debt update below
+                yield PeriodTotals(day, revenue, expenses, interest_paid if day == month_start else 0.0,
+                                   revenue - expenses, cash_on_hand(), owed, students)
+
+        # Month-end HELOC balance, mirroring expenses.debt_schedule()
+        if a.heloc_draws:
+            liquid += sum(item[1] - item[3] for item in items)
+            if liquid < 0:
+                draw = min(-liquid, max(a.starting_heloc - owed, 0.0))
+                owed += draw
+                liquid += draw
+            else:
+                paydown = min(liquid, owed)
+                owed -= paydown
+                liquid -= paydown
+        else:
+            draws = sum(item[3] for item in items if item[4])
+            if a.amortization_months:
+                # Each draw is repaid in equal installments over the following months
+                owed -= sum(recent_draws) / a.amortization_months
+            # Up to the credit line; the rest is paid from cash
+            draws = min(draws, max(a.starting_heloc - owed, 0.0))
+            if a.amortization_months:
+                recent_draws.append(draws)
+            owed += draws
+        interest_due = interest_payment(owed, interest_rates[offset])
+
+        yield PeriodTotals(last_day, revenue, expenses, interest_paid if freq == 'M' or last_day == month_start else 0.0,
+                           revenue - expenses, cash_on_hand(), owed, students)
+        month += 1
+
+
+def run_stream(periods, *subscribers):
+    """
+    Feed every period to each subscriber, then collect their results. Subscribers with a
+    close() method are closed afterwards, also when the stream raises.
+
+    Parameters:
+    - periods (iterable): PeriodTotals, e.g. from stream().
+    - subscribers: Objects with update(period) and result() methods.
+
+    Returns:
+    - tuple: Each subscriber's result(), in order.
+    """
+    try:
+        for period in periods:
+            for subscriber in subscribers:
+                subscriber.update(period)
+        return tuple(subscriber.result() for subscriber in subscribers)
+    finally:
+        for subscriber in subscribers:
+            if hasattr(subscriber, 'close'):
+                subscriber.close()
+
+
+class Aggregator:
+    """
+    Rolls periods up into calendar buckets, keeping one row of totals per bucket.
+
+    Parameters:
+    - freq (str): Pandas period frequency of the buckets, e.g. 'M', 'Q' or 'Y'.
+    """
+
+    def __init__(self, freq='Y'):
+        self.freq = freq
+        self._rows = {}
+
+    def update(self, period):
+        bucket = period.date.to_period(self.freq)
+        row = self._rows.get(bucket)
+        if row is None:
+            row = self._rows[bucket] = {'Revenue': 0.0, 'Expenses': 0.0, 'Interest': 0.0, 'Profit Loss': 0.0,
+                                        'Min Cash': period.cash}
+        row['Revenue'] += period.revenue
+        row['Expenses'] += period.expenses
+        row['Interest'] += period.interest
+        row['Profit Loss'] += period.profit_loss
+        row['Min Cash'] = min(row['Min Cash'], period.cash)
+        row['Cash On Hand'] = period.cash
+        row['HELOC Debt'] = period.debt
+
+    def result(self):
+        """
+        DataFrame with one row per bucket: flows summed, cash and debt at the bucket end.
+        """
+        df = pd.DataFrame.from_dict(self._rows, orient='index')
+        df.index.name = 'Period'
+        return df.reset_index()
+
+
+class CSVWriter:
+    """
+    Appends each period to a CSV file as it arrives. The file is closed by result(),
+    close() or leaving a with block:
+
+        with CSVWriter('daily.csv') as writer:
+            for period in stream(a, freq='D'):
+                writer.update(period)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._writer = None
+
+    def update(self, period):
+        if self._writer is None:
+            self._file = open(self.path, 'w', newline='')
+            self._writer = csv.DictWriter(self._file, fieldnames=list(COLUMNS.values()))
+            self._writer.writeheader()
+        row = period.row()
+        row['Date'] = period.date.strftime('%Y-%m-%d')
+        self._writer.writerow(row)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    def result(self):
+        self.close()
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Collector:
+    """
+    Keeps every `every`-th period, e.g. to plot a long daily stream at a coarser resolution.
+    """
+
+    def __init__(self, every=1):
+        self.every = every
+        self._count = 0
+        self._rows = []
+
+    def update(self, period):
+        if self._count % self.every == 0:
+            self._rows.append(period.row())
+        self._count += 1
+
+    def result(self):
+        """
+        DataFrame of the kept periods with a 'Period' (MM-YYYY) column, as visualize expects.
+        """
+        df = pd.DataFrame(self._rows, columns=list(COLUMNS.values()))
+        df.insert(0, 'Period', df['Date'].dt.strftime('%m-%Y'))
+        return df
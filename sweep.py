@@ -0,0 +1,187 @@
+import dataclasses
+import numpy as np
+import pandas as pd
+
+from model import Assumptions, FinancialModel
+from monte_carlo import SCENARIO_PARAMS, simulate, scenario_metrics
+from pipeline import StageCache
+
+METRICS = ('min_cash', 'breakeven_month', 'cumulative_profit')
+
+
+def _check_params(names, extra=()):
+    unknown = set(names) - set(SCENARIO_PARAMS) - set(extra)
+    if unknown:
+        raise ValueError(f"Cannot sweep {', '.join(sorted(unknown))}; sweepable: {', '.join(SCENARIO_PARAMS)}")
+
+
+def vector_engine_applies(assumptions):
+    """
+    Whether monte_carlo.simulate() models these assumptions. It models an up-front,
+    interest-only HELOC at a fixed rate, so HELOC draws, amortization and a variable
+    interest rate need full FinancialModel runs.
+    """
+    a = assumptions
+    return not a.heloc_draws and a.amortization_months is None and a.interest_rate_schedule is None
+
+
+def result_metrics(result, assumptions):
+    """
+    Headline metrics of a FinancialModel run, as monte_carlo.scenario_metrics() defines them.
+    """
+    profit_loss = result.profit_loss_df['Profit Loss'].to_numpy(dtype=float)
+    operating = profit_loss[result.calendar.offset_of(assumptions.grand_opening):] >= 0
+    return {
+        'min_cash': result.cashflow_df['Cash On Hand'].min(),
+        'breakeven_month': operating.argmax() if operating.any() else np.nan,
+        'cumulative_profit': profit_loss.sum(),
+    }
+
+
+def model_points(points, assumptions=None, cache=None):
+    """
+    Evaluate the headline metrics for a batch of points with one FinancialModel run each.
+
+    This is what evaluate_points() does when the vector engine does not apply; it is
+    slower by orders of magnitude, but handles every model option.
+
+    Parameters:
+    - points (dict): Assumptions field name -> 1-D array, all of the same length.
+      'starting_cash' sets starting_liquid, keeping starting_heloc; 'heloc_limit' sets
+      starting_heloc, keeping starting_cash, as in monte_carlo.simulate().
+    - assumptions (Assumptions, optional): Base case. Fields it leaves None are derived
+      from each point, e.g. the rent line items from sq_ft.
+    - cache (pipeline.StageCache, optional): Shared by the runs; a new one by default, so
+      stages a parameter does not reach are computed once.
+
+    Returns:
+    - dict: Metric name -> array, as evaluate_points().
+    """
+    assumptions = assumptions or Assumptions()
+    cache = StageCache() if cache is None else cache
+    n_points = len(next(iter(points.values()))) if points else 1
+    metrics = {name: np.empty(n_points) for name in METRICS}
+    for i in range(n_points):
+        changes = {name: np.asarray(values)[i].item() for name, values in points.items()}
+        if 'heloc_limit' in changes:
+            changes.setdefault('starting_cash', assumptions.starting_cash)
+            changes['starting_heloc'] = changes.pop('heloc_limit')
+        if 'starting_cash' in changes:
+            heloc = changes.get('starting_heloc', assumptions.starting_heloc)
+            changes['starting_liquid'] = changes.pop('starting_cash') - heloc
+        model = FinancialModel(dataclasses.replace(assumptions, **changes), cache)
+        point_metrics = result_metrics(model.run(), model.assumptions)
+        for name in METRICS:
+            metrics[name][i] = point_metrics[name]
+    return metrics
+
+
+def evaluate_points(points, assumptions=None, inputs=None, chunk_size=50000):
+    """
+    Evaluate the headline metrics for a batch of parameter points.
+
+    Parameters not present in `points` take their value from `assumptions`. Points are
+    simulated in chunks of `chunk_size` so memory stays bounded for very large batches.
+    Assumptions the vector engine does not model (see vector_engine_applies()) are
+    evaluated with model_points() instead.
+
+    Parameters:
+    - points (dict): Parameter name -> 1-D array, all of the same length: names in
+      SCENARIO_PARAMS, and 'heloc_limit' (see monte_carlo.simulate()).
+    - assumptions (Assumptions, optional): Base case; defaults to Assumptions().
+    - inputs (ScenarioInputs, optional): Prebuilt inputs for `assumptions`.
+    - chunk_size (int): Points simulated per vectorized pass.
+
+    Returns:
+    - dict: Metric name -> array, see monte_carlo.scenario_metrics().
+    """
+    _check_params(points, extra=('heloc_limit',))
+    model = FinancialModel(assumptions or Assumptions())
+    if not vector_engine_applies(model.assumptions):
+        return model_points(points, assumptions)
+    if inputs is None:
+        inputs = model.scenario_inputs()
+    # sq_ft only when it varies; the inputs hold the rent of the base case as given
+    base = {name: getattr(model.assumptions, name) for name in SCENARIO_PARAMS if name != 'sq_ft'}
+
+    n_points = len(next(iter(points.values()))) if points else 1
+    metrics = {name: np.empty(n_points) for name in METRICS}
+    for start in range(0, n_points, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        params = dict(base)
+        params.update({name: np.asarray(values)[chunk] for name, values in points.items()})
+        chunk_metrics = scenario_metrics(simulate(inputs, **params), inputs)
+        for name in METRICS:
+            metrics[name][chunk] = chunk_metrics[name]
+    return metrics
+
+
+def sweep(grid, assumptions=None, chunk_size=50000):
+    """
+    Evaluate the model over the Cartesian product of parameter values.
+
+    Parameters:
+    - grid (dict): Parameter name -> sequence of values, e.g.
+      {'monthly_student_price': range(175, 276, 5), 'growth_rate': np.linspace(0.05, 0.15, 21)}.
+      Any name in monte_carlo.SCENARIO_PARAMS can be swept.
+    - assumptions (Assumptions, optional): Base case for the parameters not swept.
+    - chunk_size (int): Points simulated per vectorized pass.
+
+    Returns:
+    - DataFrame: Long format, one row per grid point with the swept parameters followed
+      by 'min_cash', 'breakeven_month' and 'cumulative_profit'.
+    """
+    _check_params(grid)
+    names = list(grid)
+    axes = [np.asarray(grid[name], dtype=float) for name in names]
+    mesh = np.meshgrid(*axes, indexing='ij')
+    points = {name: values.ravel() for name, values in zip(names, mesh)}
+
+    sweep_df = pd.DataFrame(points)
+    for name, values in evaluate_points(points, assumptions, chunk_size=chunk_size).items():
+        sweep_df[name] = values
+    return sweep_df
+
+
+def to_array(sweep_df, grid, metric):
+    """
+    Reshape one metric of a sweep() result into an array with one axis per swept parameter.
+    """
+    return sweep_df[metric].values.reshape([len(values) for values in grid.values()])
+
+
+def tornado(ranges, assumptions=None, metric='min_cash'):
+    """
+    One-at-a-time sensitivity of a metric to each parameter, for a tornado chart.
+
+    Parameters:
+    - ranges (dict): Parameter name -> (low, high).
+    - assumptions (Assumptions, optional): Base case.
+    - metric (str): One of METRICS.
+
+    Returns:
+    - DataFrame: One row per parameter with 'Parameter', 'Low', 'High', 'Base',
+      'Metric Low', 'Metric High' and 'Swing', sorted by decreasing swing.
+    """
+    _check_params(ranges)
+    model = FinancialModel(assumptions or Assumptions())
+    names = list(ranges)
+    base = {name: getattr(model.assumptions, name) for name in names}
+
+    # Row 0 is the base case, then a low and a high row per parameter, all in one batch
+    points = {name: np.full(1 + 2 * len(names), float(base[name])) for name in names}
+    for i, name in enumerate(names):
+        points[name][1 + 2 * i] = ranges[name][0]
+        points[name][2 + 2 * i] = ranges[name][1]
+    values = evaluate_points(points, assumptions)[metric]
+
+    tornado_df = pd.DataFrame({
+        'Parameter': names,
+        'Low': [ranges[name][0] for name in names],
+        'High': [ranges[name][1] for name in names],
+        'Base': values[0],
+        'Metric Low': values[1::2],
+        'Metric High': values[2::2],
+    })
+    tornado_df['Swing'] = (tornado_df['Metric High'] - tornado_df['Metric Low']).abs()
+    return tornado_df.sort_values('Swing', ascending=False).reset_index(drop=True)
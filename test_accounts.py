@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from accounts import ACCOUNT_TYPES, CHART, Account, ChartOfAccounts
+from model import Assumptions, FinancialModel
+
+
+def test_codes_and_totals():
+    chart = ChartOfAccounts()
+    names = pd.Categorical(['Rent', 'Signage', 'Rent', 'Enrollment Revenue'])
+    codes = chart.codes(names)
+    assert [chart[code].name for code in codes] == list(names)
+    assert chart.codes(np.array(list(names), dtype=object)).tolist() == codes.tolist()
+
+    totals = chart.monthly_totals(codes, np.array([0, 0, 1, 5]), np.array([1.0, 2.0, 3.0, 4.0]), 2)
+    assert totals[chart.code('Rent')].tolist() == [1.0, 3.0]
+    assert totals.sum() == 6.0
+    by_type = chart.type_totals(codes, np.array([0, 0, 1, 1]), np.array([1.0, 2.0, 3.0, 4.0]), 2)
+    np.testing.assert_array_equal(by_type, chart.by_type(chart.monthly_totals(codes, np.array([0, 0, 1, 1]),
+                                                                              np.array([1.0, 2.0, 3.0, 4.0]), 2)))
+    assert by_type[ACCOUNT_TYPES.index('capex')].tolist() == [2.0, 0.0]
+
+
+def test_new_names_are_numbered_within_their_type():
+    chart = ChartOfAccounts()
+    assert chart[chart.code('Cafe Sales', 'revenue')] == Account(4120, 'Cafe Sales', 'revenue')
+    assert chart.type_of('Cafe Sales') == 'revenue'
+    with pytest.raises(ValueError, match='already in the chart'):
+        chart.add(Account(6999, 'Rent', 'opex'))
+    with pytest.raises(ValueError, match='Unknown account type'):
+        chart.add(Account(6999, 'Other', 'misc'))
+
+
+def test_categorical_has_only_the_present_accounts():
+    chart = ChartOfAccounts()
+    names = chart.categorical(chart.codes(['Signage', 'Rent', 'Signage']))
+    assert list(names) == ['Signage', 'Rent', 'Signage']
+    assert sorted(names.categories) == ['Rent', 'Signage']
+
+
+def test_runs_do_not_grow_the_chart():
+    size = len(CHART)
+    a = Assumptions().resolved()
+    a.recurring_expenses = a.recurring_expenses + [{'Name': 'Ad-hoc Line', 'Amount': 100}]
+    result = FinancialModel(a).run()
+    FinancialModel(a).scenario_inputs()
+    assert len(CHART) == size
+    assert (result.all_expenses_df['Name'] == 'Ad-hoc Line').any()
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from accounts import CHART
+from actuals import Actuals, ActualsFormat, plan_vs_actual, read_actuals, reforecast
+from model import Assumptions, FinancialModel
+
+
+def test_reforecast_keeps_closed_months_without_actuals(tmp_path):
+    forecast = FinancialModel().run()
+    in_january = {name: df[df['Date'].dt.to_period('M') == '2025-01']
+                  for name, df in (('revenue', forecast.all_revenue_df), ('expenses', forecast.all_expenses_df))}
+    path = tmp_path / 'bank.csv'
+    pd.concat([in_january['revenue'], in_january['expenses'].assign(Amount=-in_january['expenses']['Amount'])]
+              ).to_csv(path, index=False)
+    actuals = Actuals()
+    actuals.ingest(str(path), fmt=ActualsFormat(signed=True))
+    actuals.close('2025-01')
+
+    result = reforecast(Assumptions(), actuals)
+    pd.testing.assert_series_equal(result.cashflow_df['Period'], forecast.cashflow_df['Period'])
+    np.testing.assert_allclose(result.cashflow_df['Cash On Hand'], forecast.cashflow_df['Cash On Hand'], atol=1e-6)
+    variances = plan_vs_actual(forecast, actuals)
+    assert set(variances['Period']) == {'01-2025'}
+    assert variances['Variance'].abs().max() < 1e-6
+
+
+def test_signed_exports_classify_new_names_by_net_flow(tmp_path):
+    path = tmp_path / 'bank.csv'
+    path.write_text("Date,Name,Amount\n"
+                    "2025-01-03,Office Depot,-100\n"
+                    "2025-01-09,Office Depot,20\n"
+                    "2025-01-11,Cafe Sales,30\n"
+                    "2025-01-12,Cafe Sales,-5\n")
+    revenue_df, expenses_df = read_actuals(str(path), ActualsFormat(signed=True), chunksize=1)
+    assert set(revenue_df['Name']) == {'Cafe Sales'}
+    assert expenses_df['Amount'].tolist() == [100.0, -20.0]
+    assert 'Office Depot' not in CHART
+
+
+def test_exports_are_summed_by_day_and_mapped(tmp_path):
+    path = tmp_path / 'bank.csv'
+    path.write_text("Posted,Category,Amount\n"
+                    '2025-01-03,LANDLORD LLC,"$1,200.50"\n'
+                    "2025-01-03,LANDLORD LLC,(0.50)\n"
+                    "2025-01-04,Utilities,80\n")
+    fmt = ActualsFormat(date='Posted', name='Category', names={'LANDLORD LLC': 'Rent'})
+    revenue_df, expenses_df = read_actuals(str(path), fmt, chunksize=2)
+    assert revenue_df.empty
+    assert expenses_df[['Name', 'Amount']].values.tolist() == [['Rent', 1200.0], ['Utilities', 80.0]]
+
+    path.write_text("Posted,Category,Amount\n2025-01-03,,10\n")
+    with pytest.raises(ValueError, match='missing Category'):
+        read_actuals(str(path), fmt)
+
+
+def test_reingesting_replaces_only_changed_months(tmp_path):
+    path = tmp_path / 'bank.csv'
+    path.write_text("Date,Name,Amount\n2025-01-03,Rent,1000\n2025-02-03,Rent,1000\n")
+    actuals = Actuals('2025-02')
+    assert actuals.ingest(str(path)) == [pd.Period('2025-01'), pd.Period('2025-02')]
+    assert actuals.ingest(str(path)) == []
+    key = actuals.key
+
+    # A corrected export replaces February instead of adding to it
+    path.write_text("Date,Name,Amount\n2025-01-03,Rent,1000\n2025-02-03,Rent,1100.5\n")
+    assert actuals.ingest(str(path)) == [pd.Period('2025-02')]
+    assert actuals.frames()[1]['Amount'].tolist() == [1000.0, 1100.5]
+    assert actuals.key != key
+
+    actuals.save(str(tmp_path / 'actuals.pkl'))
+    loaded = Actuals.load(str(tmp_path / 'actuals.pkl'))
+    assert loaded.key == actuals.key
+    pd.testing.assert_frame_equal(loaded.frames()[1], actuals.frames()[1])
@@ -0,0 +1,17 @@
+import pandas as pd
+import pytest
+
+from codewiz import main
+
+
+@pytest.mark.parametrize('setting', ['heloc_draws=true', 'amortization_months=24'])
+def test_mc_rejects_what_the_vector_engine_does_not_model(setting):
+    with pytest.raises(SystemExit, match='unset heloc_draws'):
+        main(['mc', '--scenarios', '10', '--set', setting])
+
+
+def test_mc_writes_bands(tmp_path):
+    path = tmp_path / 'bands.csv'
+    assert main(['mc', '--scenarios', '50', '--seed', '1', '--range', 'growth_rate=0.05:0.15',
+                 '--output', str(path)]) == 0
+    assert len(pd.read_csv(path))
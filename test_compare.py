@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from compare import attribute, changed_inputs, compare, line_item_deltas
+from model import Assumptions
+from pipeline import StageCache
+
+
+@pytest.mark.parametrize('heloc_draws', [False, True])
+def test_shapley_values_add_up_to_the_change(heloc_draws):
+    other = Assumptions(sq_ft=1800, growth_rate=0.08, hourly_rate=32, heloc_draws=heloc_draws)
+    comparison = compare(Assumptions(), other, cache=StageCache())
+    deltas = comparison.metrics_df.set_index('Metric')['Delta']
+    for metric in ('min_cash', 'cumulative_profit'):
+        assert comparison.attribution_df[f'{metric} Shapley'].sum() == pytest.approx(deltas[metric], rel=1e-9, abs=1e-6)
+
+
+def test_one_change_is_all_of_the_delta():
+    attribution = attribute(Assumptions(), Assumptions(growth_rate=0.08)).set_index('Input')
+    assert list(attribution.index) == ['growth_rate']
+    assert attribution.loc['growth_rate', 'min_cash OAT'] == \
+        pytest.approx(attribution.loc['growth_rate', 'min_cash Shapley'])
+
+
+def test_derived_fields_are_not_changes():
+    base = Assumptions()
+    assert changed_inputs(base, base.resolved()) == []
+    assert changed_inputs(base, Assumptions(sq_ft=1800)) == ['sq_ft']
+
+
+def test_line_item_deltas():
+    base = pd.DataFrame({'Date': [datetime(2024, 1, 5), datetime(2024, 2, 5)], 'Name': ['Rent', 'Rent'],
+                         'Amount': [100.0, 100.0]})
+    other = pd.DataFrame({'Date': [datetime(2024, 1, 20), datetime(2024, 2, 5)], 'Name': ['Rent', 'Internet'],
+                          'Amount': [100.0, 50.0]})
+    deltas = line_item_deltas(base, other)
+    assert deltas.to_dict('records') == [
+        {'Period': '02-2024', 'Name': 'Internet', 'Base': 0.0, 'Other': 50.0, 'Delta': 50.0},
+        {'Period': '02-2024', 'Name': 'Rent', 'Base': 100.0, 'Other': 0.0, 'Delta': -100.0},
+    ]
+    assert len(line_item_deltas(base, other, changed_only=False)) == 3
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from enrollment import EnrollmentConfig, revenue_frame, simulate_enrollment
+from labor import StaffingConfig, labor_costs
+
+MONTHS = pd.period_range('2024-01', '2026-12', freq='M').to_timestamp(how='end').normalize()
+
+
+def test_capacity_follows_the_staffing_config():
+    staffing = StaffingConfig(nights_per_week=6)
+    config = EnrollmentConfig(staffing=staffing)
+    assert config.capacity == staffing.capacity() == 144
+    # At capacity every session that can be scheduled is full; one more student is not seated
+    full = labor_costs(np.array([config.capacity, config.capacity + 1]), 30, staffing)
+    assert (full.sessions == staffing.sessions_per_night * staffing.nights_per_week).all()
+    assert EnrollmentConfig(teachers_per_session=2).capacity == 60
+
+
+def test_paths_are_seeded_and_capped():
+    config = EnrollmentConfig(acquisition=40, teachers_per_session=2)
+    students = simulate_enrollment(config, MONTHS, open_offset=5, n_paths=200, seed=1)
+    np.testing.assert_array_equal(students, simulate_enrollment(config, MONTHS, open_offset=5, n_paths=200, seed=1))
+    assert (students[:, :5] == 0).all()
+    assert (students[:, 5] == config.initial_students).all()
+    assert students.max() == config.capacity
+
+
+def test_revenue_frame():
+    students = simulate_enrollment(EnrollmentConfig(), MONTHS, open_offset=2, n_paths=1, seed=1)[0]
+    df = revenue_frame(students, MONTHS, 225, open_offset=2, billing_day=15)
+    assert len(df) == len(MONTHS) - 2
+    assert (df['Date'].dt.day == 15).all()
+    np.testing.assert_allclose(df['Amount'], students[2:] * 225)
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from events import SCENARIO_BLOCK, Event, event_counts, event_frame, event_revenue
+from model import Assumptions
+from periods import Calendar
+
+EVENTS = [Event('Birthday Party', 300, 0.2), Event('Summer Camp', 4500, 1, months=(6, 8), day=1, poisson=False)]
+CALENDAR = Calendar('2024-01-01', '2026-12-31')
+
+
+def test_draws_do_not_depend_on_chunking():
+    full = event_revenue(EVENTS, '2024-06-14', '2026-12-31', CALENDAR, scenarios=1000, seed=1)
+    part = event_revenue(EVENTS, '2024-06-14', '2026-12-31', CALENDAR, scenarios=range(300, 700), seed=1)
+    np.testing.assert_array_equal(full[300:700], part)
+    _, counts = event_counts(EVENTS, '2024-06-14', '2026-12-31', scenarios=[SCENARIO_BLOCK + 3], seed=1)
+    np.testing.assert_array_equal(np.array([300, 4500]) @ counts[0], full[SCENARIO_BLOCK + 3][CALENDAR.offset_of('2024-06-14'):])
+
+
+def test_frame_matches_the_revenue_row():
+    full = event_revenue(EVENTS, '2024-06-14', '2026-12-31', CALENDAR, scenarios=1000, seed=1)
+    df = event_frame(EVENTS, '2024-06-14', '2026-12-31', seed=1, scenario=300)
+    assert df['Date'].is_monotonic_increasing
+    np.testing.assert_allclose(CALENDAR.monthly_sum(df['Date'], df['Amount']), full[300])
+
+
+def test_fixed_events_fall_inside_the_window():
+    df = event_frame(EVENTS[1:], '2024-06-14', '2026-12-31')
+    assert df['Date'].dt.strftime('%Y-%m-%d').tolist() == ['2024-08-01', '2025-06-01', '2025-08-01',
+                                                         '2026-06-01', '2026-08-01']
+
+
+@pytest.mark.parametrize('period_end', [datetime(2026, 12, 31), datetime(2030, 12, 31)])
+def test_camps_follow_the_timeline(period_end):
+    a = Assumptions(period_end=period_end).resolved()
+    dates = [camp['Date'] for camp in a.unique_revenue]
+    assert len(dates) == len(set(dates))
+    assert all(a.grand_opening <= date <= a.period_end and date.month in (6, 8) for date in dates)
+    assert dates[-1].year == period_end.year
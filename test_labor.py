@@ -0,0 +1,33 @@
+import numpy as np
+
+from labor import PAYROLL_TAX_RATE, StaffingConfig, labor_costs
+from model import FinancialModel
+
+
+def test_labor_costs_of_one_month():
+    costs = labor_costs(20, 25)
+    # 40 weekly seats fill 3 sessions of 13-14 students, each staffed by 4 teachers
+    assert (costs.sessions, costs.teachers, costs.hours) == (3, 4, 48)
+    assert costs.total == 48 * 25 * (1 + PAYROLL_TAX_RATE)
+    assert labor_costs(0, 25).total == 0
+
+
+def test_labor_costs_broadcast_over_scenarios():
+    students = np.array([[0, 10, 55, 200], [7, 16, 33, 120]])
+    hourly_rate = np.array([[20], [30]])
+    config = StaffingConfig(session_hours=1.5, director_salary=1000)
+    matrix = labor_costs(students, hourly_rate, config).total
+    for i, j in np.ndindex(students.shape):
+        assert matrix[i, j] == labor_costs(students[i, j], hourly_rate[i, 0], config).total
+    # Sessions stop at what can be scheduled
+    assert labor_costs(1000, 25).sessions == config.sessions_per_night * config.nights_per_week
+
+
+def test_payroll_tax_on_recurring_salaries():
+    model = FinancialModel()
+    result = model.run()
+    payroll_tax = result.base_expenses_df[result.base_expenses_df['Name'] == 'Payroll Tax']['Amount']
+    salaries = sum(e['Amount'] for e in model.assumptions.recurring_expenses
+                   if e['Name'] in ('Director Salary', 'Coach Labor'))
+    assert len(payroll_tax)
+    np.testing.assert_allclose(payroll_tax, salaries * PAYROLL_TAX_RATE)
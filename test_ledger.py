@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from accounts import CHART
+from expenses import add_expense
+from ledger import Ledger
+from revenue import add_revenue
+
+
+def test_grows_from_any_capacity():
+    ledger = Ledger(capacity=0)
+    for day in range(1, 11):
+        ledger.append(f'2024-01-{day:02d}', 'Rent', day)
+    assert len(ledger) == 10
+    assert ledger.amounts.sum() == 55
+
+
+def test_to_frame_sorts_and_keeps_only_the_names_used():
+    ledger = Ledger().extend(['2024-02-01', '2024-01-01', '2024-01-01'], ['Rent', 'Signage', 'Rent'], [3.0, 1.0, 2.0])
+    df = ledger.to_frame()
+    assert df['Name'].tolist() == ['Signage', 'Rent', 'Rent']
+    assert df['Amount'].tolist() == [1.0, 2.0, 3.0]
+    assert sorted(df['Name'].cat.categories) == ['Rent', 'Signage']
+    assert len(df.groupby('Name', observed=False).size()) == 2
+
+
+def test_from_frame_round_trip():
+    df = pd.DataFrame({'Date': pd.to_datetime(['2024-01-01', '2024-02-01']), 'Name': ['Rent', 'Internet'],
+                       'Amount': [1.0, 2.0]})
+    pd.testing.assert_frame_equal(Ledger.from_frame(df).to_frame().astype({'Name': object}), df)
+    np.testing.assert_array_equal(Ledger.from_frame(df).codes, CHART.codes(df['Name']))
+
+
+def test_add_to_a_frame_inserts_in_date_order():
+    df = pd.DataFrame({'Date': ['2024-03-01', '2024-01-01'], 'Name': ['Rent', 'Rent'], 'Amount': [3.0, 1.0]})
+    df = add_expense(df, 'Internet', '2024-03-01', 4.0)
+    df = add_revenue(df, 'Summer Camp', '2024-02-01', 2.0)
+    assert df['Amount'].tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert pd.api.types.is_datetime64_dtype(df['Date'])
+
+
+def test_add_to_a_ledger_appends_in_place():
+    ledger = Ledger()
+    assert add_expense(ledger, 'Rent', '2024-01-01', 1.0) is ledger
+    assert len(ledger) == 1
+
+
+def test_rejects_missing_names():
+    with pytest.raises(ValueError, match='strings'):
+        Ledger().extend(['2024-01-01'], [None], [1.0])
@@ -0,0 +1,11 @@
+import pytest
+
+from model import Assumptions, FinancialModel
+
+
+def test_max_students_sets_the_steady_state():
+    assert Assumptions().resolved().ss_student_count == 384
+    assert Assumptions(max_students=500, go_student_count=450).resolved().ss_student_count == 400
+    assert Assumptions(max_students=500, ss_student_count=420).resolved().ss_student_count == 420
+    students = FinancialModel(Assumptions(max_students=300)).run().students_df['Student_Count']
+    assert students.max() == pytest.approx(240)
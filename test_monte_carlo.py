@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from model import Assumptions, FinancialModel
+from monte_carlo import SCENARIO_PARAMS, run_monte_carlo, sample_uniform, simulate
+from sweep import evaluate_points, result_metrics
+
+
+@pytest.fixture(scope='module')
+def default_run():
+    model = FinancialModel()
+    return model, model.run()
+
+
+def test_vector_engine_matches_model(default_run):
+    model, result = default_run
+    a = model.assumptions
+    inputs = model.scenario_inputs()
+    results = simulate(inputs, a.growth_rate, a.monthly_student_price, a.hourly_rate, a.interest_rate)
+    cash = result.cashflow_df['Cash On Hand'].to_numpy()
+    profit_loss = result.profit_loss_df['Profit Loss'].to_numpy()
+    np.testing.assert_allclose(results['cash'][0, -len(cash):], cash, rtol=1e-10, atol=1e-6)
+    np.testing.assert_allclose(results['profit_loss'][0, -len(profit_loss):], profit_loss, rtol=1e-10, atol=1e-6)
+
+    points = {'sq_ft': [1800.0], 'growth_rate': [0.08], 'starting_cash': [200000.0]}
+    vector = evaluate_points(points)
+    expected_model = FinancialModel(Assumptions(sq_ft=1800, growth_rate=0.08, starting_liquid=200000 - a.starting_heloc))
+    expected = result_metrics(expected_model.run(), expected_model.assumptions)
+    for name in ('min_cash', 'cumulative_profit'):
+        assert vector[name][0] == pytest.approx(expected[name], rel=1e-9)
+
+
+def test_scenarios_are_independent(default_run):
+    model, _ = default_run
+    a = model.assumptions
+    inputs = model.scenario_inputs()
+    params = sample_uniform(20, {'growth_rate': (0.05, 0.15), 'monthly_student_price': (175, 275),
+                                 'hourly_rate': a.hourly_rate, 'interest_rate': a.interest_rate}, seed=7)
+    batch = simulate(inputs, **params)
+    for i in (0, 13):
+        one = simulate(inputs, **{name: values[i] for name, values in params.items()})
+        np.testing.assert_allclose(batch['cash'][i], one['cash'][0], rtol=1e-12)
+
+
+def test_bands_are_ordered(default_run):
+    model, _ = default_run
+    a = model.assumptions
+    params = sample_uniform(500, {**{name: float(getattr(a, name)) for name in SCENARIO_PARAMS},
+                                  'growth_rate': (0.05, 0.15)}, seed=1)
+    bands = run_monte_carlo(model.scenario_inputs(), params)['cash']
+    values = bands[['P5', 'P25', 'P50', 'P75', 'P95']].to_numpy()
+    assert (np.diff(values, axis=1) >= 0).all()
+    assert sample_uniform(3, {'growth_rate': (0, 1)}, seed=1)['growth_rate'].tolist() == \
+        sample_uniform(3, {'growth_rate': (0, 1)}, seed=1)['growth_rate'].tolist()
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from model import Assumptions, FinancialModel
+from portfolio import run_portfolio
+
+
+@pytest.mark.parametrize('heloc_draws', [False, True])
+def test_one_site_consolidates_to_its_own_cash(heloc_draws):
+    consolidated = run_portfolio([{'Site': 'A', 'heloc_draws': heloc_draws}], max_workers=1).consolidated
+    result = FinancialModel(Assumptions(heloc_draws=heloc_draws)).run()
+    np.testing.assert_allclose(consolidated['Cash On Hand'], result.cashflow_df['Cash On Hand'], atol=1e-6)
+    assert (consolidated['HELOC Over Limit'] == 0).all()
+
+
+def test_debt_is_capped_at_the_shared_line():
+    sites = [{'Site': 'A'}, {'Site': 'B', 'heloc_draws': True}]
+    full = run_portfolio(sites, max_workers=1).consolidated
+    limit = full['HELOC Debt'].max() / 2
+    shared = run_portfolio(sites, heloc_limit=limit, max_workers=1).consolidated
+    assert shared['HELOC Debt'].max() == pytest.approx(limit)
+    assert (shared['HELOC Headroom'] >= 0).all()
+    np.testing.assert_allclose(shared['HELOC Debt'] + shared['HELOC Over Limit'], full['HELOC Debt'])
+    # What the sites would owe beyond the line is paid from cash
+    assert (shared['Cash On Hand'] <= full['Cash On Hand'] + 1e-6).all()
+    peak = full['HELOC Debt'].idxmax()
+    assert shared['Cash On Hand'][peak] == pytest.approx(full['Cash On Hand'][peak] - limit)
+
+
+def test_starting_liquid_moves_cash():
+    sites = [{'Site': 'A'}, {'Site': 'B', 'sq_ft': 1800}]
+    full = run_portfolio(sites, max_workers=1).consolidated
+    shared = run_portfolio(sites, starting_liquid=100000, max_workers=1).consolidated
+    liquid = 2 * Assumptions().starting_liquid
+    np.testing.assert_allclose(shared['Cash On Hand'], full['Cash On Hand'] + 100000 - liquid)
+
+
+def test_portfolio_rejects_duplicate_sites():
+    with pytest.raises(ValueError, match='repeated: A'):
+        run_portfolio([{'Site': 'A'}, {'Site': 'A', 'sq_ft': 1800}], max_workers=1)
@@ -0,0 +1,74 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from scenario_files import ScenarioCache, load_scenario, load_scenarios, resolve_document, scenario_arrays
+
+DENVER = """
+[timeline]
+fran_start_date = 2024-01-15
+sign_lease = "fran_start_date + 2 months"
+grand_opening = "sign_lease + 13 weeks"
+period_end = 2026-12-31
+
+[revenue]
+growth_rate = 0.08
+
+[expenses]
+sq_ft = 1800
+interest_rate_schedule = { "grand_opening" = 9, "grand_opening + 12 months" = 7.5 }
+
+[[unique_expenses]]
+date = "sign_lease + 2 weeks"
+name = "Computer Equipment (instructional)"
+amount = "inst_comp_cost"
+"""
+
+
+def test_milestones_and_amounts_resolve(tmp_path):
+    path = tmp_path / 'denver.toml'
+    path.write_text(DENVER)
+    a = load_scenario(str(path), ScenarioCache())
+    assert (a.sign_lease, a.grand_opening) == (datetime(2024, 3, 15), datetime(2024, 6, 14))
+    assert a.interest_rate_schedule == {datetime(2024, 6, 14): 9, datetime(2025, 6, 14): 7.5}
+    assert a.unique_expenses == [{'Date': datetime(2024, 3, 29), 'Name': 'Computer Equipment (instructional)',
+                                  'Amount': a.inst_comp_cost}]
+    assert (a.growth_rate, a.sq_ft) == (0.08, 1800)
+
+
+@pytest.mark.parametrize('document, message', [
+    ({'revenue': {'growth': 0.1}}, 'Unknown assumptions: growth'),
+    ({'growth_rate': 0.1, 'revenue': {'growth_rate': 0.2}}, 'set more than once'),
+    ({'timeline': {'grand_opening': 'lease + 2 weeks'}}, "unknown milestone 'lease'"),
+    ({'timeline': {'grand_opening': 'sign_lease + 2 fortnights'}}, "Unknown unit 'fortnights'"),
+    ({'growth_rate': 'fast'}, 'expected a number'),
+])
+def test_invalid_documents(document, message):
+    with pytest.raises(ValueError, match=message):
+        resolve_document(document)
+
+
+def test_directory_loads_are_cached(tmp_path):
+    for name, growth_rate in (('a', 0.05), ('b', 0.1)):
+        (tmp_path / f'{name}.toml').write_text(f"growth_rate = {growth_rate}\n")
+    (tmp_path / 'notes.txt').write_text("not a scenario")
+
+    cache = ScenarioCache(str(tmp_path / 'cache'))
+    scenarios = load_scenarios(str(tmp_path), cache=cache, max_workers=1)
+    assert list(scenarios) == ['a', 'b'] and cache.misses == 2
+    assert load_scenarios(str(tmp_path), cache=cache, max_workers=1) == scenarios
+    assert cache.hits == 2
+    assert len(os.listdir(tmp_path / 'cache')) == 2
+
+    # A fresh cache reads the pickles instead of parsing again
+    assert load_scenarios(str(tmp_path), cache=ScenarioCache(str(tmp_path / 'cache')), max_workers=1) == scenarios
+    np.testing.assert_array_equal(scenario_arrays(scenarios, ('growth_rate',))['growth_rate'], [0.05, 0.1])
+
+
+def test_errors_name_the_file(tmp_path):
+    path = tmp_path / 'broken.toml'
+    path.write_text("growth = 0.1\n")
+    with pytest.raises(ValueError, match='broken.toml: Unknown assumptions'):
+        load_scenario(str(path), ScenarioCache())
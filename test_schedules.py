@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from model import Assumptions, FinancialModel
+from periods import Calendar
+from schedules import AssetRegister, depreciation_schedule, monthly_depreciation, rate_table, tax_and_royalty
+
+
+def test_assets_depreciate_to_their_salvage_value():
+    register = AssetRegister.from_records([
+        {'Date': '2024-06-14', 'Name': 'Signage', 'Amount': 12000, 'Useful_Life': 24},
+        {'Date': '2024-09-01', 'Name': 'Computers', 'Amount': 17500, 'Useful_Life': 36,
+         'Method': 'declining_balance', 'Salvage': 1000, 'Group': 1},
+    ])
+    calendar = Calendar('2024-01-01', '2028-12-31')
+    schedule = depreciation_schedule(register, calendar)
+    np.testing.assert_allclose(schedule.sum(axis=1), [12000, 16500])
+    assert (schedule[0, 5:29] == 500).all() and schedule[0, :5].sum() == 0
+    # Declining balance front-loads the charges, then goes straight line
+    charges = schedule[1, 8:44]
+    assert (np.diff(charges) <= 1e-9).all() and charges[0] == pytest.approx(17500 * 2 / 36)
+    np.testing.assert_allclose(monthly_depreciation(register, calendar, by_group=True), schedule)
+    # Months after the end of the run are left out
+    assert depreciation_schedule(register, calendar, end='2024-12-31').sum() == pytest.approx(schedule[:, :12].sum())
+
+
+def test_invalid_registers():
+    with pytest.raises(ValueError, match='Unknown depreciation method'):
+        AssetRegister.from_records([{'Date': '2024-06-14', 'Name': 'Signage', 'Amount': 1, 'Method': 'sum_of_years'}])
+    with pytest.raises(ValueError, match='Salvage'):
+        AssetRegister.from_records([{'Date': '2024-06-14', 'Name': 'Signage', 'Amount': 1, 'Salvage': 2}])
+
+
+def test_rate_table():
+    calendar = Calendar('2024-01-01', '2026-12-31')
+    rates = rate_table({'2026-01-01': 0.031, '2024-06-15': 0.029}, calendar)
+    assert rates.tolist() == [0.029] * 24 + [0.031] * 12
+    assert rate_table(7.5, calendar).tolist() == [7.5] * 36
+    tax, royalty = tax_and_royalty(np.array([1000.0]), rates[:1], 0.07)
+    assert (tax[0], royalty[0]) == pytest.approx((29, 971 * 0.07))
+
+
+def test_assets_must_match_capex():
+    with pytest.raises(ValueError, match='Assets do not match'):
+        FinancialModel(Assumptions(assets=[{'Date': '2024-06-14', 'Name': 'Signage', 'Amount': 12500}])).run()
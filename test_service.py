@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+
+from model import Assumptions
+from pipeline import StageCache
+from service import ScenarioService, check_line_items
+
+
+def with_client(requests):
+    test_utils = pytest.importorskip('aiohttp.test_utils')
+    from service import create_app
+
+    async def run():
+        app = create_app(ScenarioService(max_workers=1))
+        async with test_utils.TestClient(test_utils.TestServer(app)) as client:
+            return await requests(client)
+
+    return asyncio.run(run())
+
+
+def test_service_validates_line_items():
+    with pytest.raises(ValueError, match='missing Date'):
+        check_line_items(Assumptions(unique_expenses=[{'Name': 'Signage', 'Amount': 12500}]))
+
+
+def test_service_rejects_unknown_body_keys():
+    async def post(client):
+        response = await client.post('/run', json={'growth_rate': 0.08})
+        return response.status
+
+    assert with_client(post) == 400
+
+
+def test_repeated_runs_hit_the_cache():
+    async def post(client):
+        bodies = []
+        for _ in range(2):
+            response = await client.post('/run', json={'assumptions': {'growth_rate': 0.08}})
+            assert response.status == 200
+            bodies.append(await response.json())
+        health = await (await client.get('/health')).json()
+        return bodies, health
+
+    (first, second), health = with_client(post)
+    assert first == second and len(first['profit_loss']) == len(first['cashflow']) == 36
+    assert (health['results'], health['hits'], health['misses']) == (1, 1, 1)
+
+
+def test_cancelled_waiter_does_not_cancel_a_coalesced_run():
+    async def run():
+        service = ScenarioService(max_workers=1)
+        cache = StageCache()
+        try:
+            first = asyncio.ensure_future(service._cached(cache, 'key', time.sleep, 0.3))
+            second = asyncio.ensure_future(service._cached(cache, 'key', time.sleep, 0.3))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            await second
+            return 'key' in cache, service._pending
+        finally:
+            service.close()
+
+    assert asyncio.run(run()) == (True, {})
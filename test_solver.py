@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from model import Assumptions, FinancialModel
+from solver import Problem, feasible, goal_seek, lowest_feasible
+from sweep import result_metrics
+
+
+def model_metrics(assumptions):
+    model = FinancialModel(assumptions)
+    return result_metrics(model.run(), model.assumptions)
+
+
+def test_problem_sums_the_cash_parameters():
+    metrics = Problem().metrics({'starting_heloc': [0.0, 50000.0], 'starting_liquid': [0.0, 10000.0]})
+    for i, (heloc, liquid) in enumerate(((0, 0), (50000, 10000))):
+        expected = model_metrics(Assumptions(starting_heloc=heloc, starting_liquid=liquid))
+        assert metrics['min_cash'][i] == pytest.approx(expected['min_cash'], rel=1e-9)
+
+
+def test_problem_rejects_starting_cash_with_its_parts():
+    with pytest.raises(ValueError, match='starting_cash'):
+        Problem().metrics({'starting_cash': [1.0], 'starting_heloc': [1.0]})
+
+
+def test_feasible_absorbs_rounding():
+    metrics = {'min_cash': np.array([-1.2e-10, -1.0])}
+    assert feasible(metrics, {'min_cash': (0, None)}).tolist() == [True, False]
+
+
+def test_goal_seek_hits_the_target():
+    heloc = goal_seek('starting_heloc', 'min_cash', 0, (0, 500000))
+    assert model_metrics(Assumptions(starting_heloc=heloc))['min_cash'] == pytest.approx(0, abs=1e-3)
+
+
+def test_solves_with_heloc_draws():
+    # A drawn-down month ends at zero cash give or take float rounding
+    a = Assumptions(heloc_draws=True)
+    heloc = lowest_feasible('starting_heloc', {'min_cash': (0, None)}, (0, 500000), a)
+    assert heloc is not None
+    assert model_metrics(Assumptions(heloc_draws=True, starting_heloc=heloc))['min_cash'] >= -1e-6
+    assert model_metrics(Assumptions(heloc_draws=True, starting_heloc=heloc - 1))['min_cash'] < 0
+    heloc = goal_seek('starting_heloc', 'min_cash', 0, (0, 500000), a)
+    assert model_metrics(Assumptions(heloc_draws=True, starting_heloc=heloc))['min_cash'] == pytest.approx(0, abs=1e-6)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from model import Assumptions, FinancialModel
+from sweep import result_metrics
+
+
+@pytest.fixture(scope='module')
+def default_run():
+    model = FinancialModel()
+    return model, model.run()
+
+
+def test_default_run_unchanged(default_run):
+    model, result = default_run
+    metrics = result_metrics(result, model.assumptions)
+    assert metrics['min_cash'] == pytest.approx(-11524.016126825183, rel=1e-9)
+    assert metrics['breakeven_month'] == 11
+    assert metrics['cumulative_profit'] == pytest.approx(564539.0374225207, rel=1e-9)
+    assert result.cashflow_df['Cash On Hand'].iloc[-1] == pytest.approx(713697.3707558542, rel=1e-9)
+
+
+@pytest.mark.parametrize('heloc_draws', [False, True])
+def test_balance_sheet_balances(heloc_draws):
+    statements = FinancialModel(Assumptions(heloc_draws=heloc_draws)).run().statements
+    balance_sheet = statements.balance_sheet
+    np.testing.assert_allclose(balance_sheet['Total Assets'], balance_sheet['Total Liabilities & Equity'], atol=1e-6)
+    assert (balance_sheet['Net Fixed Assets'] >= -1e-6).all()
+
+    # Indirect method: the three sections add up to the change in balance-sheet cash
+    cashflow = statements.cashflow_statement
+    np.testing.assert_allclose(cashflow['Operating Cash Flow'] + cashflow['Investing Cash Flow'] + cashflow['HELOC Draws'],
+                               cashflow['Net Change in Cash'], atol=1e-6)
+    np.testing.assert_allclose(cashflow['Cash'], balance_sheet['Cash'], atol=1e-6)
+    np.testing.assert_allclose(np.diff(balance_sheet['Cash']), cashflow['Net Change in Cash'][1:], atol=1e-6)
+
+
+def test_capex_is_depreciated_not_expensed(default_run):
+    _, result = default_run
+    statements = result.statements
+    capex = -statements.cashflow_statement['Capital Expenditures'].sum()
+    assert statements.balance_sheet['Fixed Assets'].iloc[-1] == pytest.approx(capex)
+    assert statements.income_statement['Depreciation'].sum() == \
+        pytest.approx(statements.balance_sheet['Accumulated Depreciation'].iloc[-1])
+
+
+def test_heloc_capped_at_credit_line(default_run):
+    model, result = default_run
+    balance = result.statements.balance_sheet['HELOC Balance']
+    assert balance.max() == pytest.approx(model.assumptions.starting_heloc)
+    # Once the line is used up, balance-sheet cash is the cash on hand
+    drawn = (balance >= model.assumptions.starting_heloc - 1e-6).to_numpy()
+    np.testing.assert_allclose(result.statements.balance_sheet['Cash'][drawn],
+                               result.cashflow_df['Cash On Hand'][drawn], rtol=1e-12)
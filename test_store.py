@@ -0,0 +1,66 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from model import Assumptions, FinancialModel
+from store import ResultStore, scenario_key
+
+
+@pytest.fixture(scope='module')
+def runs():
+    models = [FinancialModel(), FinancialModel(Assumptions(sq_ft=1800))]
+    return [(model.assumptions, model.run()) for model in models]
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+def test_batch_round_trip(runs, tmp_path, fmt):
+    store = ResultStore(str(tmp_path), fmt=fmt)
+    keys = store.write_batch(runs)
+    assert keys == [scenario_key(a) for a, _ in runs] and store.scenarios() == sorted(keys)
+
+    # One file per table and year for the whole batch
+    years = sorted(os.listdir(tmp_path / 'profit_loss'))
+    assert years == ['year=2024', 'year=2025', 'year=2026']
+    assert all(len(glob.glob(str(tmp_path / 'profit_loss' / year / '*'))) == 1 for year in years)
+
+    for key, (_, result) in zip(keys, runs):
+        stored = store.read('expenses', scenarios=key)
+        expected = result.all_expenses_df.sort_values('Date', kind='stable')
+        np.testing.assert_allclose(stored['Amount'], expected['Amount'])
+        assert stored['Name'].tolist() == expected['Name'].astype(str).tolist()
+
+
+def test_filters_prune_dates_and_names(runs, tmp_path):
+    store = ResultStore(str(tmp_path))
+    keys = store.write_batch(runs)
+    june = store.read('profit_loss', start='2025-06-01', end='2025-06-30')
+    assert sorted(june['Scenario']) == sorted(keys)
+    assert set(june['Date']) == {pd.Timestamp('2025-06-30')}
+
+    rent = store.read('expenses', scenarios=keys[1], names='Rent', start='2025-01-01')
+    assert set(rent['Name']) == {'Rent'} and (rent['Date'] >= '2025-01-01').all()
+    assert sum(batch.num_rows for batch in store.scan('expenses', scenarios=keys[1], names='Rent',
+                                                      start='2025-01-01')) == len(rent)
+
+
+def test_overwrite_replaces_rows(runs, tmp_path):
+    store = ResultStore(str(tmp_path))
+    keys = store.write_batch(runs)
+    rows = len(store.read('cashflow'))
+    assert store.write(*runs[0]) == keys[0]
+    assert len(store.read('cashflow')) == rows
+    store.write(*runs[0], overwrite=True)
+    assert len(store.read('cashflow')) == rows
+    assert len(store.read('cashflow', scenarios=keys[1])) == rows // 2
+
+
+def test_unknown_format_and_table(tmp_path):
+    with pytest.raises(ValueError, match='Unknown store format'):
+        ResultStore(str(tmp_path), fmt='csv')
+    with pytest.raises(ValueError, match='Unknown table'):
+        ResultStore(str(tmp_path)).read('ledger')
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from accounts import CHART
+from model import Assumptions, FinancialModel
+from streaming import Aggregator, Collector, CSVWriter, run_stream, stream
+
+
+def streamed(a, freq='M'):
+    return pd.DataFrame([period.row() for period in stream(a, freq)])
+
+
+@pytest.mark.parametrize('changes', [
+    {},
+    {'heloc_draws': True},
+    {'heloc_draws': True, 'starting_heloc': 10000},
+    {'amortization_months': 24},
+    {'amortization_months': 6, 'starting_heloc': 30000},
+    {'interest_rate_schedule': {'2024-01-01': 20}},
+    {'go_student_count': 500},
+    {'grand_opening': datetime(2024, 5, 31)},
+])
+def test_matches_model(changes):
+    a = Assumptions(**changes)
+    result = FinancialModel(a).run()
+    monthly = streamed(a)
+    cash = result.cashflow_df['Cash On Hand'].to_numpy()
+    np.testing.assert_allclose(monthly['Cash On Hand'].to_numpy()[-len(cash):], cash, rtol=1e-10, atol=1e-6)
+    np.testing.assert_allclose(monthly['Student_Count'].to_numpy()[-len(cash):], result.students_df['Student_Count'])
+
+
+def test_daily_rolls_up_to_monthly():
+    a = Assumptions()
+    monthly, daily = streamed(a), streamed(a, 'D')
+    assert len(daily) == (daily['Date'].iloc[-1] - daily['Date'].iloc[0]).days + 1
+    by_month = daily.groupby(daily['Date'].dt.to_period('M'))
+    np.testing.assert_allclose(by_month['Profit Loss'].sum(), monthly['Profit Loss'], atol=1e-6)
+    np.testing.assert_allclose(by_month['Cash On Hand'].last(), monthly['Cash On Hand'], atol=1e-6)
+
+
+def test_subscribers(tmp_path):
+    yearly, path, collected = run_stream(stream(), Aggregator('Y'), CSVWriter(tmp_path / 'monthly.csv'), Collector(12))
+    monthly = streamed(Assumptions())
+    np.testing.assert_allclose(yearly['Revenue'].sum(), monthly['Revenue'].sum())
+    assert yearly['Cash On Hand'].iloc[-1] == pytest.approx(monthly['Cash On Hand'].iloc[-1])
+    assert len(pd.read_csv(path)) == len(monthly)
+    assert len(collected) == -(-len(monthly) // 12)
+
+
+def test_csv_writer_closed_when_the_stream_raises(tmp_path):
+    def failing():
+        yield from stream(Assumptions(period_end=datetime(2024, 12, 31)))
+        raise RuntimeError('stream failed')
+
+    writer = CSVWriter(tmp_path / 'monthly.csv')
+    with pytest.raises(RuntimeError):
+        run_stream(failing(), writer)
+    assert writer._file.closed
+
+
+def test_ad_hoc_accounts_do_not_leak():
+    size = len(CHART)
+    a = Assumptions().resolved()
+    a.unique_expenses = a.unique_expenses + [{'Date': datetime(2024, 7, 1), 'Name': 'Ad-hoc Fee', 'Amount': 250}]
+    list(stream(a))
+    assert len(CHART) == size
+
+
+def test_rejects_unknown_frequency():
+    with pytest.raises(ValueError, match='freq'):
+        next(stream(freq='W'))
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from model import Assumptions, FinancialModel
+from sweep import evaluate_points, model_points, result_metrics, sweep, to_array, tornado
+
+EXPLICIT_RENT = [{'Name': 'Rent', 'Amount': 1000}, {'Name': 'Utilities', 'Amount': 150}]
+# Modes the vector engine does not model, so evaluate_points() runs the full model
+MODEL_ONLY = [
+    {'heloc_draws': True},
+    {'amortization_months': 24},
+    {'interest_rate_schedule': {'2024-01-01': 20}},
+]
+
+
+@pytest.mark.parametrize('points', [{'growth_rate': [0.1, 0.2]}, {'sq_ft': [1500.0, 1800.0]}])
+@pytest.mark.parametrize('recurring_expenses', [None, EXPLICIT_RENT])
+def test_vector_engine_matches_model_points(points, recurring_expenses):
+    # An explicit rent stays as given whatever sq_ft is; the derived rent follows it
+    a = Assumptions(recurring_expenses=recurring_expenses)
+    vector, model = evaluate_points(points, a), model_points(points, a)
+    for name in ('min_cash', 'cumulative_profit'):
+        np.testing.assert_allclose(vector[name], model[name], rtol=1e-9)
+
+
+@pytest.mark.parametrize('changes', MODEL_ONLY)
+def test_non_vector_modes_fall_back_to_the_model(changes):
+    a = Assumptions(**changes)
+    batch = evaluate_points({'growth_rate': [a.growth_rate, 0.2]}, a)
+    for i, growth_rate in enumerate((a.growth_rate, 0.2)):
+        model = FinancialModel(Assumptions(**changes, growth_rate=growth_rate))
+        expected = result_metrics(model.run(), model.assumptions)
+        assert batch['min_cash'][i] == pytest.approx(expected['min_cash'], rel=1e-9, abs=1e-6)
+        assert batch['cumulative_profit'][i] == pytest.approx(expected['cumulative_profit'], rel=1e-9)
+
+
+def test_sweep_grid():
+    grid = {'monthly_student_price': [200, 250], 'growth_rate': [0.05, 0.1, 0.15]}
+    sweep_df = sweep(grid)
+    assert len(sweep_df) == 6
+    cumulative_profit = to_array(sweep_df, grid, 'cumulative_profit')
+    assert cumulative_profit.shape == (2, 3)
+    assert (np.diff(cumulative_profit, axis=0) > 0).all()
+
+
+def test_tornado_sorted_by_swing():
+    tornado_df = tornado({'growth_rate': (0.05, 0.15), 'hourly_rate': (29, 31)})
+    assert tornado_df['Parameter'].tolist() == ['growth_rate', 'hourly_rate']
+    assert tornado_df['Swing'].is_monotonic_decreasing
+
+
+def test_unknown_parameter():
+    with pytest.raises(ValueError, match='Cannot sweep'):
+        sweep({'camp_revenue': [1, 2]})
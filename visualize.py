@@ -1,7 +1,19 @@
-import matplotlib.pyplot as plt
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import matplotlib.colors as mcolors
 import matplotlib.ticker as mticker
+from matplotlib.figure import Figure
+
+from profiling import profiled, stage
 
+@profiled
 def plot_profit_loss(profit_loss_df):
+    # pyplot (and its GUI backend) is only needed to show charts interactively
+    import matplotlib.pyplot as plt
+
     # Generate a list of colors based on the 'Profit Loss' values
     colors = ['red' if value < 0 else 'blue' for value in profit_loss_df['Profit Loss']]
 
@@ -19,21 +31,10 @@ def plot_profit_loss(profit_loss_df):
     plt.show()
 
 
-def save_profit_loss(profit_loss_df, filename="profit_loss.png"):
-    plt.figure(figsize=(15, 7))
-    colors = ['red' if value < 0 else 'blue' for value in profit_loss_df['Profit Loss']]
-    plt.bar(profit_loss_df['Period'], profit_loss_df['Profit Loss'], color=colors)
-    plt.title('Monthly Profit/Loss')
-    plt.xlabel('Period (MM-YYYY)')
-    plt.ylabel('Profit/Loss ($)')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.grid(axis='y')
-    plt.savefig(filename, dpi=300)  # Save the figure to a file
-    plt.close()
-
-
+@profiled
 def plot_cashflow(cashflow_df):
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(15, 7))
     
     # Plotting the cash flow using a line chart
@@ -57,94 +58,303 @@ def plot_cashflow(cashflow_df):
     plt.grid(axis='y')
     plt.show()
 
-def save_cashflow(cashflow_df, filename="cashflow.png"):
-    plt.figure(figsize=(15, 7))
-    plt.plot(cashflow_df['Period'], cashflow_df['Cash On Hand'], color='blue', marker='o', linestyle='-')
-    plt.fill_between(cashflow_df['Period'], cashflow_df['Cash On Hand'], where=(cashflow_df['Cash On Hand'] >= 0), 
-                     color='blue', alpha=0.2, interpolate=True)
-    plt.fill_between(cashflow_df['Period'], cashflow_df['Cash On Hand'], where=(cashflow_df['Cash On Hand'] < 0), 
-                     color='red', alpha=0.2, interpolate=True)
+class ChartRenderer:
+    """
+    Renders the standard charts onto reusable figure templates.
 
-    # Find and annotate the minimum data point
-    min_value = cashflow_df['Cash On Hand'].min()
-    min_date = cashflow_df[cashflow_df['Cash On Hand'] == min_value]['Period'].iloc[0]
-    plt.annotate(f"{min_value}$", 
-                 (min_date, min_value), 
-                 textcoords="offset points", 
-                 xytext=(-10,-10), 
-                 ha='center', 
-                 fontsize=9, 
-                 arrowprops=dict(arrowstyle="->"))
+    The first render of a chart builds its figure, axes and artists. Later renders with
+    the same number of periods only update the artists' data in place, which skips figure
+    construction and layout. Figures are pyplot-free, so renderers can live in worker
+    processes and nothing is left open between calls.
 
-    plt.title('Cash Flow Over Time')
-    plt.xlabel('Period (MM-YYYY)')
-    plt.ylabel('Cash On Hand ($)')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.grid(axis='y')
-    plt.savefig(filename, dpi=300)  # Save the figure to a file
-    plt.close()
+    Parameters:
+    - dpi (int): Resolution of raster output.
+    - fmt (str, optional): Output format ('png', 'svg', 'pdf', ...); inferred from the
+      file extension when None.
+    """
 
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
+    def __init__(self, dpi=300, fmt=None):
+        self.dpi = dpi
+        self.fmt = fmt
+        self._templates = {}
 
-def save_profit_loss_with_students(profit_loss_df, students_df, filename):
-    fig, ax1 = plt.subplots(figsize=(12, 7))
-    
-    # Plotting profit/loss as a bar chart
-    colors = ['blue' if value >= 0 else 'red' for value in profit_loss_df['Profit Loss']]
-    ax1.bar(profit_loss_df['Period'], profit_loss_df['Profit Loss'], color=colors, label='Profit/Loss')
-    ax1.set_xlabel('Period')
-    ax1.set_ylabel('Profit/Loss')
-    ax1.tick_params(axis='y')
-    ax1.legend(loc='upper left')
-
-    # Creating a second y-axis for the student count as a line
-    ax2 = ax1.twinx()
-    ax2.plot(students_df['Period'], students_df['Student_Count'], color='purple', linestyle='-', label='Student Count')
-    ax2.set_ylabel('Student Count', color='purple')
-    ax2.tick_params(axis='y', labelcolor='purple')
-    ax2.legend(loc='upper right')
-
-    # Adjusting the x-axis labels for better visibility
-    plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha='right')
-
-    # Set title and layout
-    plt.title("Profit/Loss with Student Count")
-    fig.tight_layout()
+    def _template(self, chart, n_periods, build):
+        template = self._templates.get(chart)
+        if template is None or template['n_periods'] != n_periods:
+            template = build(n_periods)
+            template['n_periods'] = n_periods
+            template['laid_out'] = False
+            self._templates[chart] = template
+        return template
+
+    def _save(self, template, filename, dpi):
+        fig = template['fig']
+        if not template['laid_out']:
+            with stage('tight_layout'):
+                fig.tight_layout()
+            template['laid_out'] = True
+        with stage('savefig'):
+            fig.savefig(filename, dpi=dpi or self.dpi, format=self.fmt)
+        return filename
+
+    @staticmethod
+    def _set_periods(ax, periods, **label_kwargs):
+        ax.set_xticks(np.arange(len(periods)))
+        ax.set_xticklabels(periods, **label_kwargs)
+
+    @staticmethod
+    def _rescale(*axes):
+        for ax in axes:
+            ax.relim()
+            ax.autoscale_view()
+
+    @staticmethod
+    def _student_positions(periods, students_df):
+        positions = pd.Index(periods).get_indexer(students_df['Period'])
+        found = positions >= 0
+        return positions[found], students_df['Student_Count'].values[found]
+
+    @staticmethod
+    def _update_bars(bars, values):
+        for bar, value in zip(bars, values):
+            bar.set_height(value)
+            bar.set_color('red' if value < 0 else 'blue')
+
+    @profiled
+    def profit_loss(self, profit_loss_df, filename, dpi=None):
+        def build(n):
+            fig = Figure(figsize=(15, 7))
+            ax = fig.add_subplot()
+            bars = ax.bar(np.arange(n), np.zeros(n))
+            ax.set_title('Monthly Profit/Loss')
+            ax.set_xlabel('Period (MM-YYYY)')
+            ax.set_ylabel('Profit/Loss ($)')
+            ax.grid(axis='y')
+            return {'fig': fig, 'ax': ax, 'bars': bars}
+
+        t = self._template('profit_loss', len(profit_loss_df), build)
+        self._update_bars(t['bars'], profit_loss_df['Profit Loss'].values)
+        self._set_periods(t['ax'], profit_loss_df['Period'], rotation=45)
+        self._rescale(t['ax'])
+        return self._save(t, filename, dpi)
+
+    @profiled
+    def cashflow(self, cashflow_df, filename, dpi=None):
+        def build(n):
+            fig = Figure(figsize=(15, 7))
+            ax = fig.add_subplot()
+            line, = ax.plot(np.arange(n), np.zeros(n), color='blue', marker='o', linestyle='-')
+            annotation = ax.annotate("", (0, 0), textcoords="offset points", xytext=(-10, -10),
+                                     ha='center', fontsize=9, arrowprops=dict(arrowstyle="->"))
+            ax.set_title('Cash Flow Over Time')
+            ax.set_xlabel('Period (MM-YYYY)')
+            ax.set_ylabel('Cash On Hand ($)')
+            ax.grid(axis='y')
+            return {'fig': fig, 'ax': ax, 'line': line, 'annotation': annotation, 'fills': []}
+
+        t = self._template('cashflow', len(cashflow_df), build)
+        x = np.arange(len(cashflow_df))
+        cash = cashflow_df['Cash On Hand'].values
+        t['line'].set_data(x, cash)
+
+        # Fill collections can't be reshaped in place; swap them
+        for fill in t['fills']:
+            fill.remove()
+        t['fills'] = [
+            t['ax'].fill_between(x, cash, where=(cash >= 0), color='blue', alpha=0.2, interpolate=True),
+            t['ax'].fill_between(x, cash, where=(cash < 0), color='red', alpha=0.2, interpolate=True),
+        ]
+
+        # Annotate the minimum data point
+        min_index = int(np.argmin(cash))
+        t['annotation'].xy = (min_index, cash[min_index])
+        t['annotation'].set_text(f"{cash[min_index]}$")
 
-    plt.savefig(filename, dpi=300)
-    plt.close()
+        self._set_periods(t['ax'], cashflow_df['Period'], rotation=45)
+        self._rescale(t['ax'])
+        return self._save(t, filename, dpi)
 
+    @profiled
+    def profit_loss_with_students(self, profit_loss_df, students_df, filename, dpi=None):
+        def build(n):
+            fig = Figure(figsize=(12, 7))
+            ax1 = fig.add_subplot()
+            bars = ax1.bar(np.arange(n), np.zeros(n), label='Profit/Loss')
+            ax1.set_xlabel('Period')
+            ax1.set_ylabel('Profit/Loss')
+            ax1.legend(loc='upper left')
 
-def save_cashflow_with_students(cashflow_df, students_df, filename):
-    fig, ax1 = plt.subplots(figsize=(12, 7))
+            # Creating a second y-axis for the student count as a line
+            ax2 = ax1.twinx()
+            students, = ax2.plot([], [], color='purple', linestyle='-', label='Student Count')
+            ax2.set_ylabel('Student Count', color='purple')
+            ax2.tick_params(axis='y', labelcolor='purple')
+            ax2.legend(loc='upper right')
 
-    # Plotting the cashflow as a line
-    ax1.plot(cashflow_df['Period'], cashflow_df['Cash On Hand'], color='blue', label='Cashflow')
-    ax1.set_xlabel('Period')
-    ax1.set_ylabel('Cashflow')
-    ax1.tick_params(axis='y')
-    ax1.legend(loc='upper left')
+            ax1.set_title("Profit/Loss with Student Count")
+            return {'fig': fig, 'ax1': ax1, 'ax2': ax2, 'bars': bars, 'students': students}
 
-    # Creating a second y-axis for the student count as a line
-    ax2 = ax1.twinx()
-    ax2.plot(students_df['Period'], students_df['Student_Count'], color='purple', label='Student Count')
-    ax2.set_ylabel('Student Count', color='purple')
-    ax2.tick_params(axis='y', labelcolor='purple')
-    ax2.legend(loc='upper right')
+        t = self._template('profit_loss_students', len(profit_loss_df), build)
+        self._update_bars(t['bars'], profit_loss_df['Profit Loss'].values)
+        t['students'].set_data(*self._student_positions(profit_loss_df['Period'], students_df))
+        self._set_periods(t['ax1'], profit_loss_df['Period'], rotation=45, ha='right')
+        self._rescale(t['ax1'], t['ax2'])
+        return self._save(t, filename, dpi)
 
-    # Adjusting the x-axis labels for better visibility
-    plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha='right')
+    @profiled
+    def cashflow_with_students(self, cashflow_df, students_df, filename, dpi=None):
+        def build(n):
+            fig = Figure(figsize=(12, 7))
+            ax1 = fig.add_subplot()
+            cash, = ax1.plot([], [], color='blue', label='Cashflow')
+            ax1.set_xlabel('Period')
+            ax1.set_ylabel('Cashflow')
+            ax1.legend(loc='upper left')
 
-    # Resetting the y-axis major formatter to default
-    ax1.yaxis.set_major_formatter(mticker.ScalarFormatter())
-    ax2.yaxis.set_major_formatter(mticker.ScalarFormatter())
+            # Creating a second y-axis for the student count as a line
+            ax2 = ax1.twinx()
+            students, = ax2.plot([], [], color='purple', label='Student Count')
+            ax2.set_ylabel('Student Count', color='purple')
+            ax2.tick_params(axis='y', labelcolor='purple')
+            ax2.legend(loc='upper right')
 
-    # Set title and layout
-    plt.title("Cashflow with Student Count")
+            ax1.yaxis.set_major_formatter(mticker.ScalarFormatter())
+            ax2.yaxis.set_major_formatter(mticker.ScalarFormatter())
+
+            ax1.set_title("Cashflow with Student Count")
+            return {'fig': fig, 'ax1': ax1, 'ax2': ax2, 'cash': cash, 'students': students}
+
+        t = self._template('cashflow_students', len(cashflow_df), build)
+        t['cash'].set_data(np.arange(len(cashflow_df)), cashflow_df['Cash On Hand'].values)
+        t['students'].set_data(*self._student_positions(cashflow_df['Period'], students_df))
+        self._set_periods(t['ax1'], cashflow_df['Period'], rotation=45, ha='right')
+        self._rescale(t['ax1'], t['ax2'])
+        return self._save(t, filename, dpi)
+
+
+@profiled
+def render_charts(renderer, files, profit_loss_df, cashflow_df, students_df):
+    """
+    Render a set of charts for one scenario.
+
+    Parameters:
+    - renderer (ChartRenderer): Renderer whose templates are reused.
+    - files (dict): Chart name ('profit_loss', 'profit_loss_students', 'cashflow',
+      'cashflow_students') -> output filename. Charts not listed are skipped.
+    - profit_loss_df, cashflow_df, students_df (DataFrame): Frames from the model run.
+
+    Returns:
+    - list: Paths of the written files.
+    """
+    writers = {
+        'profit_loss': lambda path: renderer.profit_loss(profit_loss_df, path),
+        'profit_loss_students': lambda path: renderer.profit_loss_with_students(profit_loss_df, students_df, path),
+        'cashflow': lambda path: renderer.cashflow(cashflow_df, path),
+        'cashflow_students': lambda path: renderer.cashflow_with_students(cashflow_df, students_df, path),
+    }
+    return [writers[chart](path) for chart, path in files.items()]
+
+
+# One renderer per worker process, so templates are reused across the jobs it receives
+_worker_renderer = None
+
+
+def _init_worker(dpi, fmt):
+    global _worker_renderer
+    _worker_renderer = ChartRenderer(dpi=dpi, fmt=fmt)
+
+
+def _render_job(job):
+    return render_charts(_worker_renderer, *job)
+
+
+@profiled
+def render_batch(jobs, dpi=300, fmt=None, max_workers=None):
+    """
+    Render the charts of many scenarios across a process pool.
+
+    Parameters:
+    - jobs (list): (files, profit_loss_df, cashflow_df, students_df) tuples, see render_charts().
+    - dpi (int): Resolution of raster output.
+    - fmt (str, optional): Output format; inferred from the file extensions when None.
+    - max_workers (int, optional): Worker processes; 1 renders in-process.
+
+    Returns:
+    - list: Paths written for each job.
+    """
+    if max_workers is None:
+        max_workers = min(os.cpu_count() or 1, len(jobs))
+    if max_workers <= 1:
+        renderer = ChartRenderer(dpi=dpi, fmt=fmt)
+        return [render_charts(renderer, *job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(dpi, fmt)) as pool:
+        return list(pool.map(_render_job, jobs))
+
+
+# Shared renderer behind the save_* functions
+_renderer = ChartRenderer()
+
+
+@profiled
+def save_profit_loss(profit_loss_df, filename="profit_loss.png", dpi=300):
+    _renderer.profit_loss(profit_loss_df, filename, dpi=dpi)
+
+
+@profiled
+def save_cashflow(cashflow_df, filename="cashflow.png", dpi=300):
+    _renderer.cashflow(cashflow_df, filename, dpi=dpi)
+
+
+@profiled
+def save_profit_loss_with_students(profit_loss_df, students_df, filename, dpi=300):
+    _renderer.profit_loss_with_students(profit_loss_df, students_df, filename, dpi=dpi)
+
+
+@profiled
+def save_cashflow_with_students(cashflow_df, students_df, filename, dpi=300):
+    _renderer.cashflow_with_students(cashflow_df, students_df, filename, dpi=dpi)
+
+
+@profiled
+def save_tornado(tornado_df, filename="tornado.png", metric="Min Cash", dpi=300):
+    fig = Figure(figsize=(10, 1 + 0.6 * len(tornado_df)))
+    ax = fig.subplots()
+
+    # Widest swing on top
+    rows = tornado_df.iloc[::-1]
+    base = rows['Base'].iloc[0]
+    labels = [f"{p} ({lo:g} / {hi:g})" for p, lo, hi in zip(rows['Parameter'], rows['Low'], rows['High'])]
+    ax.barh(labels, rows['Metric Low'] - base, left=base, color='red', alpha=0.7, label='Low')
+    ax.barh(labels, rows['Metric High'] - base, left=base, color='blue', alpha=0.7, label='High')
+    ax.axvline(base, color='black', linewidth=1)
+
+    ax.set_title(f"Sensitivity of {metric}")
+    ax.set_xlabel(metric)
+    ax.legend(loc='lower right')
+    ax.grid(axis='x', linestyle='--', alpha=0.7)
     fig.tight_layout()
 
-    plt.savefig(filename, dpi=300)
-    plt.close()
+    fig.savefig(filename, dpi=dpi)
+
+
+@profiled
+def save_heatmap(sweep_df, x, y, metric, filename="heatmap.png", dpi=300):
+    # Average over any other swept parameters
+    table = sweep_df.pivot_table(index=y, columns=x, values=metric, aggfunc='mean')
+
+    # Center the colors on zero so red always means negative
+    low, high = table.values.min(), table.values.max()
+    norm = mcolors.TwoSlopeNorm(vcenter=0, vmin=low, vmax=high) if low < 0 < high else None
+
+    fig = Figure(figsize=(12, 7))
+    ax = fig.subplots()
+    image = ax.imshow(table.values, origin='lower', aspect='auto', cmap='RdBu', norm=norm,
+                      extent=(table.columns.min(), table.columns.max(), table.index.min(), table.index.max()))
+    fig.colorbar(image, ax=ax, label=metric)
+
+    ax.set_title(f"{metric} by {x} and {y}")
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    fig.tight_layout()
 
+    fig.savefig(filename, dpi=dpi)